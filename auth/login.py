@@ -1,8 +1,11 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                             QLineEdit, QPushButton, QMessageBox)
 from PyQt5.QtCore import Qt
+from auth.permissions import permission_resolver
+from auth.session import session_manager
+from controllers.user_controller import UserController
 from database.models import User, session
-from utils.security import check_password
+from utils.query_executor import query_executor
 
 class LoginDialog(QDialog):
     def __init__(self):
@@ -38,9 +41,9 @@ class LoginDialog(QDialog):
         layout.addLayout(password_layout)
         
         # Login button
-        login_btn = QPushButton("Login")
-        login_btn.clicked.connect(self.authenticate)
-        layout.addWidget(login_btn)
+        self.login_btn = QPushButton("Login")
+        self.login_btn.clicked.connect(self.authenticate)
+        layout.addWidget(self.login_btn)
         
         self.setLayout(layout)
     
@@ -48,10 +51,32 @@ class LoginDialog(QDialog):
         username = self.username_input.text()
         password = self.password_input.text()
         
-        user = session.query(User).filter(User.username == username).first()
-        
-        if user and check_password(user.password_hash, password):
-            self.current_user = user
-            self.accept()
-        else:
+        # Key derivation takes a noticeable moment, so it runs off the GUI thread
+        self.login_btn.setEnabled(False)
+        self.login_btn.setText("Signing in...")
+        query_executor.submit(
+            "login",
+            lambda db_session: UserController(db_session).authenticate(username, password),
+            on_result=self.onAuthenticated,
+            on_error=self.onAuthenticationError
+        )
+    
+    def onAuthenticated(self, user_id):
+        self.resetLoginButton()
+        if user_id is None:
             QMessageBox.warning(self, "Login Failed", "Invalid username or password")
+            return
+        
+        self.current_user = session.query(User).filter(User.id == user_id).first()
+        session_manager.login(self.current_user)
+        # Load the grants once so every later check is a set lookup
+        permission_resolver.grants(user_id)
+        self.accept()
+    
+    def onAuthenticationError(self, error):
+        self.resetLoginButton()
+        QMessageBox.critical(self, "Error", f"Login failed:\n{error}")
+    
+    def resetLoginButton(self):
+        self.login_btn.setEnabled(True)
+        self.login_btn.setText("Login")
@@ -0,0 +1,128 @@
+import functools
+import threading
+from sqlalchemy import event, inspect, select
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.orm import Session
+from database.models import Permission, User, session, user_permission_association
+from auth.session import session_manager
+
+ACTIONS = ('can_view', 'can_add', 'can_edit', 'can_delete')
+
+PERMISSION_TABLES = frozenset((Permission.__table__, User.__table__, user_permission_association))
+
+class PermissionDenied(Exception):
+    def __init__(self, module, action):
+        super().__init__(f"Permission denied: {action} on {module}")
+        self.module = module
+        self.action = action
+
+class PermissionResolver:
+    """Caches each user's granted ``(module, action)`` pairs in a frozenset.
+
+    The first check for a user runs one query; every later check is a set
+    lookup. Entries are dropped when a session that changed permissions or
+    assignments commits or rolls back. Grants whose load overlapped such a
+    drop are returned but not cached.
+    """
+
+    def __init__(self, db_session=None):
+        self.session = db_session or session
+        self._grants = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def grants(self, user_id):
+        grants = self._grants.get(user_id)
+        if grants is None:
+            generation = self._generation
+            grants = self._load(user_id)
+            with self._lock:
+                if generation == self._generation:
+                    self._grants[user_id] = grants
+        return grants
+
+    def has_permission(self, user_id, module, action):
+        return (module, action) in self.grants(user_id)
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._grants.clear()
+            else:
+                self._grants.pop(user_id, None)
+
+    def _load(self, user_id):
+        rows = self.session.execute(
+            select(Permission.module, *[getattr(Permission, action) for action in ACTIONS]).join(
+                user_permission_association, user_permission_association.c.permission_id == Permission.id
+            ).join(
+                User, User.id == user_permission_association.c.user_id
+            ).where(
+                user_permission_association.c.user_id == user_id,
+                User.is_active == True
+            )
+        )
+        return frozenset(
+            (module, action)
+            for module, *flags in rows
+            for action, granted in zip(ACTIONS, flags) if granted
+        )
+
+# Shared resolver for all screens and controllers
+permission_resolver = PermissionResolver()
+
+def current_user_can(module, action):
+    """Check the logged-in user. Without one (init_db, command line tools,
+    benchmarks) everything is allowed."""
+    user_id = session_manager.current_user_id
+    return user_id is None or permission_resolver.has_permission(user_id, module, action)
+
+def require_permission(module, action):
+    """Decorate a write method so it raises PermissionDenied for users lacking the grant."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not current_user_can(module, action):
+                raise PermissionDenied(module, action)
+            return method(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Writes only mark the session with the users whose grants they change (None
+# for everyone); the cache is dropped once they are committed or rolled back,
+# so grants read back before a rollback do not outlive it
+
+def _mark_stale(writing_session, user_id=None):
+    writing_session.info.setdefault('permissions_stale', set()).add(user_id)
+
+@event.listens_for(Session, 'after_flush')
+def _mark_after_flush(flush_session, flush_context):
+    for instance in (*flush_session.new, *flush_session.dirty, *flush_session.deleted):
+        if isinstance(instance, Permission):
+            _mark_stale(flush_session)
+            return
+        if isinstance(instance, User):
+            state = inspect(instance)
+            if (instance in flush_session.deleted or state.attrs.permissions.history.has_changes()
+                    or state.attrs.is_active.history.has_changes()):
+                _mark_stale(flush_session, instance.id)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_after_bulk_write(orm_execute_state):
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_select or isinstance(statement, TextClause):
+        return
+    table = getattr(statement, 'table', None)
+    if table is not None and table in PERMISSION_TABLES:
+        _mark_stale(orm_execute_state.session)
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _invalidate_after_transaction(ended_session):
+    user_ids = ended_session.info.pop('permissions_stale', ())
+    if None in user_ids:
+        permission_resolver.invalidate()
+        return
+    for user_id in user_ids:
+        permission_resolver.invalidate(user_id)
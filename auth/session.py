@@ -4,10 +4,13 @@ from database.models import User, session
 class SessionManager:
     def __init__(self):
         self.current_user = None
+        # Plain id, safe to read from worker threads
+        self.current_user_id = None
         self.session_expiry = None
     
     def login(self, user):
         self.current_user = user
+        self.current_user_id = user.id
         # Set session expiry to 1 hour from now
         self.session_expiry = datetime.now() + timedelta(hours=1)
     
@@ -18,6 +21,7 @@ class SessionManager:
     
     def logout(self):
         self.current_user = None
+        self.current_user_id = None
         self.session_expiry = None
 
 # Global session manager
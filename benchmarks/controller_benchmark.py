@@ -0,0 +1,197 @@
+"""Time the public controller read paths on synthetic estates of increasing size.
+
+    python -m benchmarks.controller_benchmark --scales 1000,10000,100000 --output results.json
+    python -m benchmarks.controller_benchmark --scales 1000 --compare results.json
+
+Each scale is the number of generated addresses (see utils.data_generator).
+Results are written as JSON so runs can be compared for regressions.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+def controller_benchmarks(db_session):
+    from controllers.address_controller import AddressController
+    from controllers.resident_controller import ALLOTTED, ResidentController
+    from controllers.financial_controller import FinancialController
+    from controllers.complaint_controller import ComplaintController
+    from controllers.user_controller import UserController
+    from services.dashboard_service import DashboardService
+
+    addresses = AddressController(db_session)
+    residents = ResidentController(db_session)
+    financials = FinancialController(db_session)
+    complaints = ComplaintController(db_session)
+    users = UserController(db_session)
+    dashboard = DashboardService(db_session)
+
+    def allot_and_remove():
+        # Leaves the allotment as it found it so rounds stay comparable
+        residents.allot_address_to_resident(1, 2)
+        residents.remove_address_from_resident(1, 2)
+    
+    def bulk_allot_and_release():
+        # Releases only what it allotted, so pre-existing allotments survive
+        rows = [(resident_id, resident_id + 1, None) for resident_id in range(1, 201)]
+        outcomes = residents.bulk_allot_addresses(rows)
+        residents.bulk_release_addresses([row for row, outcome in zip(rows, outcomes) if outcome == ALLOTTED])
+
+    return [
+        ("AddressController.get_all_addresses", addresses.get_all_addresses),
+        ("AddressController.get_address_by_id", lambda: addresses.get_address_by_id(7)),
+        ("AddressController.filter_addresses", lambda: addresses.filter_addresses({'block': 'C', 'number': '1'})),
+        ("AddressController.get_address_rows", addresses.get_address_rows),
+        ("AddressController.get_total_addresses", addresses.get_total_addresses),
+        ("AddressController.get_addresses_by_category", addresses.get_addresses_by_category),
+        ("AddressController.get_addresses_by_block", addresses.get_addresses_by_block),
+        ("AddressController.get_floors_by_address", lambda: addresses.get_floors_by_address(7)),
+        ("AddressController.get_vacant_floor_rows(block)", lambda: addresses.get_vacant_floor_rows(block='C')),
+        ("AddressController.get_free_floors", addresses.get_free_floors),
+        ("ResidentController.get_all_residents", residents.get_all_residents),
+        ("ResidentController.get_resident_by_id", lambda: residents.get_resident_by_id(7)),
+        ("ResidentController.get_total_residents", residents.get_total_residents),
+        ("ResidentController.filter_residents", lambda: residents.filter_residents({'name': 'sara'})),
+        ("ResidentController.get_resident_rows", lambda: residents.get_resident_rows({}, after_id=100, limit=200)),
+        ("ResidentController.search_resident_rows", lambda: residents.search_resident_rows("ali kh")),
+        ("ResidentController.get_residents_by_address", lambda: residents.get_residents_by_address(7)),
+        ("ResidentController.get_residents_by_floor", lambda: residents.get_residents_by_floor(7)),
+        ("ResidentController.allot_and_remove_address", allot_and_remove),
+        ("ResidentController.bulk_allot_and_release(200)", bulk_allot_and_release),
+        ("FinancialController.get_total_pending_dues", financials.get_total_pending_dues),
+        ("FinancialController.get_recent_financial_records", financials.get_recent_financial_records),
+        ("ComplaintController.get_pending_complaints_count", complaints.get_pending_complaints_count),
+        ("ComplaintController.get_recent_complaints", complaints.get_recent_complaints),
+        ("ComplaintController.get_complaint_queue", complaints.get_complaint_queue),
+        ("ComplaintController.get_complaint_queue(block)", lambda: complaints.get_complaint_queue(block='C')),
+        ("ComplaintController.get_sla_breaches", complaints.get_sla_breaches),
+        ("UserController.get_all_users", users.get_all_users),
+        ("UserController.get_user_by_username", lambda: users.get_user_by_username("admin")),
+        ("DashboardService.build_snapshot", dashboard.build_snapshot),
+    ]
+
+def run_benchmark(db_session, benchmark, min_rounds, max_rounds, max_time):
+    """Call ``benchmark`` repeatedly and summarise the timings in seconds."""
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_rounds or (len(timings) < max_rounds and time.perf_counter() - started < max_time):
+        # Start every round with an empty identity map
+        db_session.expunge_all()
+        round_started = time.perf_counter()
+        benchmark()
+        timings.append(time.perf_counter() - round_started)
+
+    return {
+        'rounds': len(timings),
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.mean(timings),
+        'median': statistics.median(timings),
+        'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+def build_database(url, addresses, months, seed):
+    from sqlalchemy.orm import sessionmaker
+    from database.connection import create_app_engine
+    from database.migrations import create_missing_indexes
+    from database.models import Base, User
+    from database.search import ensure_resident_search_index
+    from utils.data_generator import generate_estate
+
+    engine = create_app_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        create_missing_indexes(connection)
+        ensure_resident_search_index(connection)
+        connection.execute(User.__table__.insert(), {
+            'username': 'admin', 'password_hash': 'benchmark', 'full_name': 'Administrator'
+        })
+        counts = generate_estate(connection, addresses=addresses, months=months, seed=seed)
+    return engine, sessionmaker(bind=engine)(), counts
+
+def run_scale(addresses, args, workdir):
+    url = f"sqlite:///{os.path.join(workdir, f'estate-{addresses}.db')}"
+    started = time.perf_counter()
+    engine, db_session, counts = build_database(url, addresses, args.months, args.seed)
+    print(f"\n== {addresses} addresses ({', '.join(f'{t}={c}' for t, c in counts.items())}) "
+          f"generated in {time.perf_counter() - started:.1f}s")
+
+    results = {}
+    for name, benchmark in controller_benchmarks(db_session):
+        if args.filter and args.filter not in name:
+            continue
+        stats = run_benchmark(db_session, benchmark, args.min_rounds, args.max_rounds, args.max_time)
+        results[name] = stats
+        print(f"{name:<55} median {stats['median'] * 1000:10.2f} ms  ({stats['rounds']} rounds)")
+
+    db_session.close()
+    engine.dispose()
+    return {'rows': counts, 'benchmarks': results}
+
+def compare(current, baseline_path, threshold):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    print(f"\nComparison against {baseline_path} (regression threshold {threshold:.0%}):")
+    regressions = 0
+    for scale, scale_results in current['scales'].items():
+        previous = baseline['scales'].get(scale, {}).get('benchmarks', {})
+        for name, stats in scale_results['benchmarks'].items():
+            if name not in previous:
+                continue
+            # The fastest round is the least noisy figure to compare
+            change = stats['min'] / previous[name]['min'] - 1
+            marker = "REGRESSION" if change > threshold else ""
+            regressions += bool(marker)
+            print(f"{scale:>7} {name:<55} {change:+8.1%} {marker}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1000,10000,100000",
+                        help="comma-separated address counts")
+    parser.add_argument("--months", type=int, default=6, help="months of dues to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--max-rounds", type=int, default=50)
+    parser.add_argument("--max-time", type=float, default=2.0,
+                        help="seconds to spend per benchmark after the minimum rounds")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="sms-benchmark-")
+    results = {
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform()},
+        'commit': _git_commit(),
+        'settings': {'months': args.months, 'seed': args.seed},
+        'scales': {}
+    }
+    for addresses in (int(scale) for scale in args.scales.split(",")):
+        results['scales'][str(addresses)] = run_scale(addresses, args, workdir)
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        raise SystemExit(1)
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare query plans and timings of the hot controller queries with and
+without the model-declared indexes on a synthetic estate.
+
+    python -m benchmarks.index_benchmark --addresses 20000
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+def controller_queries():
+    from controllers.address_controller import AddressController
+    from controllers.resident_controller import ResidentController
+    from controllers.financial_controller import FinancialController
+    from controllers.complaint_controller import ComplaintController
+
+    addresses = AddressController()
+    residents = ResidentController()
+    financials = FinancialController()
+    complaints = ComplaintController()
+
+    return [
+        ("get_floors_by_address", lambda: addresses.get_floors_by_address(77)),
+        ("get_addresses_by_category", addresses.get_addresses_by_category),
+        ("get_addresses_by_block", addresses.get_addresses_by_block),
+        ("get_total_residents", residents.get_total_residents),
+        ("get_resident_rows", lambda: residents.get_resident_rows({}, after_id=500, limit=200)),
+        ("get_residents_by_address", lambda: residents.get_residents_by_address(77)),
+        ("get_residents_by_floor", lambda: residents.get_residents_by_floor(77)),
+        ("get_total_pending_dues", financials.get_total_pending_dues),
+        ("get_recent_financial_records", lambda: financials.get_recent_financial_records(5)),
+        ("get_pending_complaints_count", complaints.get_pending_complaints_count),
+        ("get_recent_complaints", lambda: complaints.get_recent_complaints(5)),
+    ]
+
+def measure(engine, db_session, queries, repeat):
+    from sqlalchemy import event
+
+    results = {}
+    for name, query in queries:
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        query()
+        event.remove(engine, "before_cursor_execute", capture)
+
+        timings = []
+        for _ in range(repeat):
+            db_session.expire_all()
+            started = time.perf_counter()
+            query()
+            timings.append(time.perf_counter() - started)
+
+        plans = []
+        with engine.connect() as connection:
+            for statement, parameters in statements:
+                rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                plans.append("; ".join(row[-1] for row in rows))
+
+        results[name] = {'median_ms': statistics.median(timings) * 1000, 'plan': " | ".join(plans)}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--addresses", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="sms-index-benchmark-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+
+    # Imported only now so the engine binds to the benchmark database
+    from sqlalchemy import text
+    from database.connection import engine, session
+    from database.migrations import create_missing_indexes, drop_declared_indexes
+    from init_db import init_db
+    from utils.data_generator import generate_estate
+
+    init_db()
+    with engine.begin() as connection:
+        counts = generate_estate(connection, addresses=args.addresses)
+        drop_declared_indexes(connection)
+        connection.execute(text("ANALYZE"))
+    print("Generated:", ", ".join(f"{table}={count}" for table, count in counts.items()))
+
+    queries = controller_queries()
+    before = measure(engine, session, queries, args.repeat)
+    with engine.begin() as connection:
+        create_missing_indexes(connection)
+    after = measure(engine, session, queries, args.repeat)
+
+    for name, _ in queries:
+        speedup = before[name]['median_ms'] / max(after[name]['median_ms'], 1e-6)
+        print(f"\n{name}: {before[name]['median_ms']:.2f} ms -> {after[name]['median_ms']:.2f} ms ({speedup:.1f}x)")
+        print(f"  before: {before[name]['plan']}")
+        print(f"  after:  {after[name]['plan']}")
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({'rows': counts, 'before': before, 'after': after}, output, indent=2)
+
+if __name__ == "__main__":
+    main()
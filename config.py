@@ -1,7 +1,27 @@
 import os
 
 # Database configuration
-DATABASE_URL = "sqlite:///property_management.db"
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///property_management.db")
+
+# Connection pool settings (ignored for in-memory SQLite)
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+DB_POOL_TIMEOUT = 30  # seconds
+DB_POOL_RECYCLE = 3600  # seconds
+
+# PRAGMAs applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # readers no longer block the writer
+    "synchronous": "NORMAL",  # safe with WAL, avoids an fsync per commit
+    "cache_size": -64000,  # negative values are KiB, i.e. 64 MB page cache
+    "mmap_size": 268435456,  # 256 MB memory-mapped I/O
+    "busy_timeout": 5000,  # milliseconds to wait on a locked database
+}
+
+# Query profiling: recent statements kept in memory, slower ones also logged
+QUERY_PROFILING = os.environ.get("QUERY_PROFILING", "1") != "0"
+QUERY_PROFILE_BUFFER_SIZE = 500  # statements
+SLOW_QUERY_THRESHOLD_MS = int(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200))
 
 # Application settings
 APP_NAME = "Property Management System"
@@ -11,6 +31,27 @@ VERSION = "1.0.0"
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-here")
 SESSION_TIMEOUT = 3600  # seconds
 
+# Password hashing, stored with every hash so existing ones keep verifying after a change
+PASSWORD_HASH_ALGORITHM = os.environ.get("PASSWORD_HASH_ALGORITHM", "pbkdf2_sha256")  # or "scrypt"
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", 100000))
+PASSWORD_SCRYPT_N = 2 ** 14  # CPU/memory cost, 16 MB with r=8
+PASSWORD_SCRYPT_R = 8
+PASSWORD_SCRYPT_P = 1
+
 # UI settings
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800
+
+# Live filtering: wait for a pause in typing before querying (a result that fits
+# in one page is narrowed by further keystrokes without a query)
+LIVE_SEARCH_DEBOUNCE = 200  # milliseconds
+
+# Build the screens that were not opened yet in the background after first paint
+MODULE_WARMUP = True
+MODULE_WARMUP_DELAY = 500  # milliseconds after first paint
+
+# Complaint settings
+COMPLAINT_SLA_HOURS = int(os.environ.get("COMPLAINT_SLA_HOURS", 72))  # to resolve a complaint
+
+# Dashboard settings
+DASHBOARD_CACHE_TTL = 60  # seconds
@@ -1,16 +1,79 @@
-from database.models import Address, session
+# Imported for its session events, which keep the floor occupancy index current
+import database.occupancy
+from auth.permissions import require_permission
+from database.connection import commit
+from database.counters import read_breakdown, read_counter
+from database.models import Address, Block, FloorOccupancy, session
+from database.pagination import DEFAULT_PAGE_SIZE, paginate
 from sqlalchemy import func
+from sqlalchemy.orm import selectinload
 
 class AddressController:
-    def __init__(self):
-        self.session = session
+    def __init__(self, db_session=None):
+        self.session = db_session or session
     
-    def get_all_addresses(self):
-        return self.session.query(Address).all()
+    def get_all_addresses(self, with_floors=False):
+        query = self.session.query(Address)
+        if with_floors:
+            # One extra IN query for every address's floors instead of one per address
+            query = query.options(selectinload(Address.floors))
+        return query.order_by(Address.id).all()
+    
+    def filter_addresses(self, filters):
+        return self._apply_filters(self.session.query(Address), filters).order_by(Address.id).all()
+    
+    def get_address_page(self, filters=None, page_size=DEFAULT_PAGE_SIZE, token=None, with_floors=False,
+                         with_total=False):
+        """Keyset-paginated ``get_all_addresses``/``filter_addresses``, ordered by id."""
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        query = self._apply_filters(self.session.query(Address), filters)
+        if with_floors:
+            query = query.options(selectinload(Address.floors))
+        
+        count = None
+        if with_total:
+            # Unfiltered totals come from the summary counters instead of a scan
+            count = (lambda: query.order_by(None).count()) if filters else self.get_total_addresses
+        return paginate(query, [Address.id], page_size, token, count)
+    
+    def get_address_rows(self, filters=None):
+        """Return plain (id, category, number, row, block, total_floors) rows."""
+        query = self.session.query(
+            Address.id, Address.category, Address.number, Address.row, Address.block, Address.total_floors
+        )
+        rows = self._apply_filters(query, filters or {}).order_by(Address.id)
+        return [
+            (address_id, category.value, number, row, block.value, total_floors)
+            for address_id, category, number, row, block, total_floors in rows
+        ]
+    
+    def get_address_export_query(self, filters=None):
+        """Column query of every address matching ``filters``, for streaming exports."""
+        query = self.session.query(
+            Address.id, Address.category, Address.number, Address.row, Address.block, Address.total_floors
+        )
+        return self._apply_filters(query, filters or {}).order_by(Address.id)
+    
+    def _apply_filters(self, query, filters):
+        from database.models import Category, Block
+        
+        if 'category' in filters and filters['category']:
+            query = query.filter(Address.category == Category[filters['category']])
+        
+        if 'block' in filters and filters['block']:
+            query = query.filter(Address.block == Block[filters['block']])
+        
+        if 'number' in filters and filters['number']:
+            query = query.filter(Address.number.ilike(f"%{filters['number']}%"))
+        
+        return query
     
     def get_address_by_id(self, address_id):
-        return self.session.query(Address).filter(Address.id == address_id).first()
+        return self.session.query(Address).options(
+            selectinload(Address.floors)
+        ).filter(Address.id == address_id).first()
     
+    @require_permission('address_management', 'can_add')
     def add_address(self, address_data):
         from database.models import Category, Block
         
@@ -22,9 +85,21 @@ class AddressController:
             total_floors=address_data['total_floors']
         )
         self.session.add(address)
-        self.session.commit()
+        commit(self.session)
         return address
     
+    @require_permission('address_management', 'can_add')
+    def bulk_add_addresses(self, records):
+        """Insert already-validated address records in a single transaction."""
+        try:
+            self.session.execute(Address.__table__.insert(), records)
+        except Exception:
+            self.session.rollback()
+            raise
+        commit(self.session)
+        return len(records)
+    
+    @require_permission('address_management', 'can_edit')
     def update_address(self, address_id, address_data):
         from database.models import Category, Block
         
@@ -35,35 +110,83 @@ class AddressController:
             address.row = address_data['row']
             address.block = Block[address_data['block']]
             address.total_floors = address_data['total_floors']
-            self.session.commit()
+            commit(self.session)
         return address
     
+    @require_permission('address_management', 'can_delete')
     def delete_address(self, address_id):
         address = self.get_address_by_id(address_id)
         if address:
             self.session.delete(address)
-            self.session.commit()
+            commit(self.session)
         return address
     
     def get_total_addresses(self):
-        return self.session.query(Address).count()
+        return read_counter(self.session, 'addresses.total')
     
     def get_addresses_by_category(self):
-        result = self.session.query(Address.category, func.count(Address.id)).group_by(Address.category).all()
-        return {category.value: count for category, count in result}
+        from database.models import Category
+        return read_breakdown(self.session, 'addresses.category.', Category)
     
     def get_addresses_by_block(self):
-        result = self.session.query(Address.block, func.count(Address.id)).group_by(Address.block).all()
-        return {block.value: count for block, count in result}
+        from database.models import Block
+        return read_breakdown(self.session, 'addresses.block.', Block)
     
     def get_floors_by_address(self, address_id):
         from database.models import Floor
-        return self.session.query(Floor).filter(Floor.address_id == address_id).all()
+        return self.session.query(Floor).filter(Floor.address_id == address_id).order_by(Floor.floor_number).all()
     
     def get_floor_by_id(self, floor_id):
         from database.models import Floor
         return self.session.query(Floor).filter(Floor.id == floor_id).first()
     
+    # Occupancy, read from the floor occupancy index kept by database.occupancy
+    
+    def get_vacant_floor_rows(self, address_id=None, block=None):
+        """Return plain (floor_id, address_id, number, block, floor_number) rows of floors without active residents."""
+        query = self.session.query(
+            FloorOccupancy.floor_id, FloorOccupancy.address_id, Address.number, FloorOccupancy.block,
+            FloorOccupancy.floor_number
+        ).join(
+            Address, FloorOccupancy.address_id == Address.id
+        ).filter(
+            FloorOccupancy.active_residents == 0
+        )
+        
+        if address_id:
+            query = query.filter(FloorOccupancy.address_id == address_id)
+        if block:
+            query = query.filter(FloorOccupancy.block == Block[block])
+        
+        rows = query.order_by(FloorOccupancy.block, Address.number, FloorOccupancy.floor_number)
+        return [
+            (floor_id, row_address_id, number, row_block.value, floor_number)
+            for floor_id, row_address_id, number, row_block, floor_number in rows
+        ]
+    
+    def get_free_floors(self):
+        """Return ``{address_id: [(floor_number, floor_id), ...]}`` for the floors without active residents."""
+        rows = self.session.query(
+            FloorOccupancy.address_id, FloorOccupancy.floor_number, FloorOccupancy.floor_id
+        ).filter(
+            FloorOccupancy.active_residents == 0
+        ).order_by(FloorOccupancy.address_id, FloorOccupancy.floor_number)
+        
+        free_floors = {}
+        for address_id, floor_number, floor_id in rows:
+            free_floors.setdefault(address_id, []).append((floor_number, floor_id))
+        return free_floors
+    
+    def get_vacant_floors_by_block(self):
+        rows = self.session.query(
+            FloorOccupancy.block, func.count()
+        ).filter(
+            FloorOccupancy.active_residents == 0
+        ).group_by(FloorOccupancy.block)
+        counts = dict(rows.all())
+        return {block.value: counts[block] for block in Block if counts.get(block)}
+    
+    @require_permission('address_management', 'can_edit')
     def add_floor(self, address_id, floor_data):
         from database.models import Floor
         
@@ -78,9 +201,10 @@ class AddressController:
             shop_count=floor_data['shop_count']
         )
         self.session.add(floor)
-        self.session.commit()
+        commit(self.session)
         return floor
     
+    @require_permission('address_management', 'can_edit')
     def update_floor(self, floor_id, floor_data):
         floor = self.get_floor_by_id(floor_id)
         if floor:
@@ -91,19 +215,21 @@ class AddressController:
             floor.is_shop = floor_data['is_shop']
             floor.is_vacant = floor_data['is_vacant']
             floor.shop_count = floor_data['shop_count']
-            self.session.commit()
+            commit(self.session)
         return floor
     
+    @require_permission('address_management', 'can_edit')
     def delete_floor(self, floor_id):
         floor = self.get_floor_by_id(floor_id)
         if floor:
             self.session.delete(floor)
-            self.session.commit()
+            commit(self.session)
         return floor
     
+    @require_permission('address_management', 'can_edit')
     def update_shop_count(self, floor_id, shop_count):
         floor = self.get_floor_by_id(floor_id)
         if floor:
             floor.shop_count = shop_count
-            self.session.commit()
+            commit(self.session)
         return floor
@@ -1,16 +1,121 @@
-from database.models import Complaint, session
-from sqlalchemy import and_
+import datetime
+from auth.permissions import require_permission
+from config import COMPLAINT_SLA_HOURS
+from database.connection import commit
+from database.counters import read_breakdown, read_counters
+from database.models import Address, Block, Complaint, ComplaintStatus, Resident, session
+from database.pagination import DEFAULT_PAGE_SIZE, paginate
+from sqlalchemy import and_, func
+from sqlalchemy.orm import joinedload
+
+OPEN_STATUSES = (ComplaintStatus.PENDING, ComplaintStatus.IN_PROGRESS)
+CLOSED_STATUSES = (ComplaintStatus.RESOLVED, ComplaintStatus.CLOSED)
+
+# Columns of a queue row, in display order
+QUEUE_COLUMNS = (
+    Complaint.id,
+    Complaint.status,
+    Complaint.created_at,
+    Complaint.title,
+    Resident.name,
+    Address.number,
+    Address.block,
+    Complaint.resolved_at
+)
 
 class ComplaintController:
-    def __init__(self):
-        self.session = session
+    def __init__(self, db_session=None):
+        self.session = db_session or session
     
     def get_pending_complaints_count(self):
-        return self.session.query(Complaint).filter(
-            Complaint.status.in_(['PENDING', 'IN_PROGRESS'])
-        ).count()
+        counters = read_counters(self.session, 'complaints.status.')
+        return sum(counters.get(f"complaints.status.{status.name}", 0) for status in OPEN_STATUSES)
+    
+    def get_status_counts(self):
+        """Return ``{status value: count}`` from the summary counters, without scanning complaints."""
+        return read_breakdown(self.session, 'complaints.status.', ComplaintStatus)
     
     def get_recent_complaints(self, limit=5):
-        return self.session.query(Complaint).order_by(
+        return self.session.query(Complaint).options(
+            joinedload(Complaint.resident), joinedload(Complaint.address)
+        ).order_by(
             Complaint.created_at.desc()
         ).limit(limit).all()
+    
+    def get_complaint_queue(self, statuses=OPEN_STATUSES, address_id=None, block=None, overdue_only=False,
+                            as_of=None, page_size=DEFAULT_PAGE_SIZE, token=None, with_total=False):
+        """Return one keyset ``Page`` of complaints ordered by (status, created_at, id).
+        
+        Rows are plain ``(id, status, created_at, title, resident, address, block,
+        resolved_at, sla_due, breached)`` tuples. Each page is a range seek on
+        the (status, created_at) index, so paging stays fast however many closed
+        complaints the table holds. ``overdue_only`` keeps open complaints past
+        their SLA, which is the same index range cut at the SLA cutoff.
+        """
+        as_of = as_of or datetime.datetime.utcnow()
+        query = self.session.query(*QUEUE_COLUMNS).outerjoin(
+            Resident, Complaint.resident_id == Resident.id
+        ).join(
+            Address, Complaint.address_id == Address.id
+        )
+        
+        if statuses:
+            query = query.filter(Complaint.status.in_(statuses))
+        if address_id:
+            query = query.filter(Complaint.address_id == address_id)
+        if block:
+            query = query.filter(Address.block == Block[block])
+        if overdue_only:
+            query = query.filter(Complaint.status.in_(OPEN_STATUSES), Complaint.created_at < sla_cutoff(as_of))
+        
+        count = (lambda: query.order_by(None).count()) if with_total else None
+        return paginate(query, [Complaint.status, Complaint.created_at, Complaint.id], page_size, token, count,
+                        transform=lambda row: _queue_row(row, as_of))
+    
+    def get_sla_breaches(self, as_of=None, by='status'):
+        """Count open complaints past their SLA per status or per block in one grouped query."""
+        group = {'status': Complaint.status, 'block': Address.block}[by]
+        query = self.session.query(group, func.count(Complaint.id)).filter(
+            Complaint.status.in_(OPEN_STATUSES),
+            Complaint.created_at < sla_cutoff(as_of or datetime.datetime.utcnow())
+        )
+        if by == 'block':
+            query = query.join(Address, Complaint.address_id == Address.id)
+        return {key.value: count for key, count in query.group_by(group)}
+    
+    def get_complaint_by_id(self, complaint_id):
+        return self.session.query(Complaint).options(
+            joinedload(Complaint.resident), joinedload(Complaint.address)
+        ).filter(Complaint.id == complaint_id).first()
+    
+    @require_permission('complaint_management', 'can_add')
+    def add_complaint(self, complaint_data):
+        complaint = Complaint(
+            resident_id=complaint_data['resident_id'],
+            address_id=complaint_data['address_id'],
+            title=complaint_data['title'],
+            description=complaint_data.get('description', ''),
+            status=ComplaintStatus.PENDING
+        )
+        self.session.add(complaint)
+        commit(self.session)
+        return complaint
+    
+    @require_permission('complaint_management', 'can_edit')
+    def update_status(self, complaint_id, status):
+        complaint = self.session.query(Complaint).filter(Complaint.id == complaint_id).first()
+        if complaint and complaint.status != status:
+            complaint.status = status
+            complaint.resolved_at = datetime.datetime.utcnow() if status in CLOSED_STATUSES else None
+            commit(self.session)
+        return complaint
+
+def sla_cutoff(as_of):
+    """Complaints created before this and still open have breached the SLA."""
+    return as_of - datetime.timedelta(hours=COMPLAINT_SLA_HOURS)
+
+def _queue_row(row, as_of):
+    complaint_id, status, created_at, title, resident, number, block, resolved_at = row
+    sla_due = created_at + datetime.timedelta(hours=COMPLAINT_SLA_HOURS)
+    breached = (resolved_at or as_of) > sla_due
+    return (complaint_id, status.value, created_at, title, resident, number, block.value, resolved_at, sla_due, breached)
@@ -1,20 +1,63 @@
-from database.models import FinancialRecord, session
-from sqlalchemy import func, and_
+from database.models import FinancialRecord, Resident, Address, Charge, Block, session
+from services.aging_service import AgingService
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 class FinancialController:
-    def __init__(self):
-        self.session = session
+    def __init__(self, db_session=None):
+        self.session = db_session or session
     
     def get_total_pending_dues(self):
+        # Everything unpaid, overdue amounts included
         result = self.session.query(
             func.sum(FinancialRecord.amount)
-        ).filter(
-            and_(FinancialRecord.is_paid == False, FinancialRecord.due_date >= func.now())
-        ).scalar()
+        ).filter(FinancialRecord.is_paid == False).scalar()
         
         return result if result else 0.0
     
+    def get_dues_by_age(self, as_of=None):
+        return AgingService(self.session).bucket_totals(as_of)
+    
     def get_recent_financial_records(self, limit=5):
-        return self.session.query(FinancialRecord).order_by(
+        return self.session.query(FinancialRecord).options(
+            joinedload(FinancialRecord.resident)
+        ).order_by(
             FinancialRecord.due_date.desc()
         ).limit(limit).all()
+    
+    def get_ledger_export_query(self, filters=None):
+        """Column query of ledger entries matching ``filters``, for streaming exports."""
+        filters = filters or {}
+        query = self.session.query(
+            FinancialRecord.id,
+            FinancialRecord.due_date,
+            Resident.name.label('resident'),
+            Address.number.label('address'),
+            Address.block,
+            Charge.name.label('charge'),
+            FinancialRecord.amount,
+            FinancialRecord.is_paid,
+            FinancialRecord.paid_date,
+            FinancialRecord.notes
+        ).join(
+            Resident, FinancialRecord.resident_id == Resident.id
+        ).join(
+            Address, FinancialRecord.address_id == Address.id
+        ).join(
+            Charge, FinancialRecord.charge_id == Charge.id
+        )
+        
+        if filters.get('resident_id'):
+            query = query.filter(FinancialRecord.resident_id == filters['resident_id'])
+        if filters.get('address_id'):
+            query = query.filter(FinancialRecord.address_id == filters['address_id'])
+        if filters.get('block'):
+            query = query.filter(Address.block == Block[filters['block']])
+        if filters.get('is_paid') is not None:
+            query = query.filter(FinancialRecord.is_paid == filters['is_paid'])
+        if filters.get('due_from'):
+            query = query.filter(FinancialRecord.due_date >= filters['due_from'])
+        if filters.get('due_to'):
+            query = query.filter(FinancialRecord.due_date < filters['due_to'])
+        
+        return query.order_by(FinancialRecord.due_date, FinancialRecord.id)
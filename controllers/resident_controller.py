@@ -1,16 +1,48 @@
-from database.models import Resident, Address, Floor, session
-from sqlalchemy import and_, or_
+from auth.permissions import require_permission
+from database.connection import commit
+from database.counters import read_counter
+from database.occupancy import rebuild_occupancy
+from database.search import (build_match_expression, resident_match_ids, search_resident_ids,
+                             supports_full_text_search)
+from database.models import Resident, Address, Floor, Block, address_resident_association, session
+from database.pagination import DEFAULT_PAGE_SIZE, paginate
+from sqlalchemy import and_, bindparam, or_, select
+from sqlalchemy.orm import joinedload, selectinload
+
+# Columns shown in the resident table, in display order
+RESIDENT_ROW_COLUMNS = (
+    Resident.id,
+    Resident.name,
+    Resident.contact_number,
+    Resident.email,
+    Resident.emergency_contact,
+    Resident.id_proof_number,
+    Resident.move_in_date
+)
+
+# Per-row outcomes of the bulk allotment calls; any other outcome is the reason a row was skipped
+ALLOTTED = 'allotted'
+RELEASED = 'released'
 
 class ResidentController:
-    def __init__(self):
-        self.session = session
+    def __init__(self, db_session=None):
+        self.session = db_session or session
     
     def get_all_residents(self):
-        return self.session.query(Resident).filter(Resident.is_active == True).all()
+        return self.session.query(Resident).options(
+            *self._resident_loading()
+        ).filter(Resident.is_active == True).all()
     
     def get_resident_by_id(self, resident_id):
-        return self.session.query(Resident).filter(Resident.id == resident_id).first()
+        return self.session.query(Resident).options(
+            *self._resident_loading()
+        ).filter(Resident.id == resident_id).first()
+    
+    def _resident_loading(self):
+        # Floor is many-to-one, so a join is free; addresses come in one IN query
+        return joinedload(Resident.floor), selectinload(Resident.addresses)
     
+    @require_permission('resident_management', 'can_add')
     def add_resident(self, resident_data):
         resident = Resident(
             name=resident_data['name'],
@@ -22,9 +54,10 @@ class ResidentController:
             is_active=True
         )
         self.session.add(resident)
-        self.session.commit()
+        commit(self.session)
         return resident
     
+    @require_permission('resident_management', 'can_edit')
     def update_resident(self, resident_id, resident_data):
         resident = self.get_resident_by_id(resident_id)
         if resident:
@@ -34,38 +67,103 @@ class ResidentController:
             resident.emergency_contact = resident_data.get('emergency_contact', resident.emergency_contact)
             resident.id_proof_number = resident_data.get('id_proof_number', resident.id_proof_number)
             resident.move_in_date = resident_data.get('move_in_date', resident.move_in_date)
-            self.session.commit()
+            commit(self.session)
         return resident
     
+    @require_permission('resident_management', 'can_delete')
     def delete_resident(self, resident_id):
         resident = self.get_resident_by_id(resident_id)
         if resident:
             resident.is_active = False
-            self.session.commit()
+            commit(self.session)
         return resident
     
     def get_total_residents(self):
-        return self.session.query(Resident).filter(Resident.is_active == True).count()
+        return read_counter(self.session, 'residents.active')
     
     def filter_residents(self, filters):
-        query = self.session.query(Resident).filter(Resident.is_active == True)
+        query = self.session.query(Resident).options(
+            *self._resident_loading()
+        ).filter(Resident.is_active == True)
+        return self._apply_filters(query, filters).all()
+    
+    def get_resident_page(self, filters=None, page_size=DEFAULT_PAGE_SIZE, token=None, with_total=False):
+        """Keyset-paginated ``get_all_residents``/``filter_residents``, ordered by id."""
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        query = self._apply_filters(self.session.query(Resident).options(
+            *self._resident_loading()
+        ).filter(Resident.is_active == True), filters)
         
-        if 'name' in filters and filters['name']:
-            query = query.filter(Resident.name.ilike(f"%{filters['name']}%"))
+        count = None
+        if with_total:
+            # Unfiltered totals come from the summary counters instead of a scan
+            count = (lambda: query.order_by(None).count()) if filters else self.get_total_residents
+        return paginate(query, [Resident.id], page_size, token, count)
+    
+    def get_resident_rows(self, filters=None, after_id=None, limit=200):
+        """Return one keyset page of plain resident rows ordered by id."""
+        query = self.session.query(*RESIDENT_ROW_COLUMNS).filter(Resident.is_active == True)
+        query = self._apply_filters(query, filters or {})
+        
+        if after_id is not None:
+            query = query.filter(Resident.id > after_id)
+        
+        return [tuple(row) for row in query.order_by(Resident.id).limit(limit)]
+    
+    def search_resident_rows(self, query_text, limit=50):
+        """Return plain resident rows matching ``query_text`` in any column, best match first."""
+        if supports_full_text_search(self.session):
+            resident_ids = search_resident_ids(self.session, query_text, limit)
+            rows = self.session.query(*RESIDENT_ROW_COLUMNS).filter(
+                and_(Resident.id.in_(resident_ids), Resident.is_active == True)
+            )
+            rows_by_id = {row[0]: tuple(row) for row in rows}
+            return [rows_by_id[resident_id] for resident_id in resident_ids if resident_id in rows_by_id]
         
-        if 'contact_number' in filters and filters['contact_number']:
-            query = query.filter(Resident.contact_number.ilike(f"%{filters['contact_number']}%"))
+        return self.get_resident_rows({'search': query_text}, limit=limit)
+    
+    def get_resident_export_query(self, filters=None):
+        """Column query of every active resident matching ``filters``, for streaming exports."""
+        query = self.session.query(*RESIDENT_ROW_COLUMNS).filter(Resident.is_active == True)
+        return self._apply_filters(query, filters or {}).order_by(Resident.id)
+    
+    def _apply_filters(self, query, filters):
+        if supports_full_text_search(self.session):
+            # Name, contact and free-text filters are prefix matches on the FTS5 index
+            match_expression = build_match_expression({
+                column: filters.get(key) for key, column in (
+                    ('search', None), ('name', 'name'), ('contact_number', 'contact_number')
+                )
+            })
+            if match_expression:
+                query = query.filter(Resident.id.in_(resident_match_ids(match_expression)))
+        else:
+            if 'search' in filters and filters['search']:
+                query = query.filter(or_(
+                    Resident.name.ilike(f"%{filters['search']}%"),
+                    Resident.contact_number.ilike(f"%{filters['search']}%"),
+                    Resident.email.ilike(f"%{filters['search']}%"),
+                    Resident.emergency_contact.ilike(f"%{filters['search']}%"),
+                    Resident.id_proof_number.ilike(f"%{filters['search']}%")
+                ))
+            
+            if 'name' in filters and filters['name']:
+                query = query.filter(Resident.name.ilike(f"%{filters['name']}%"))
+            
+            if 'contact_number' in filters and filters['contact_number']:
+                query = query.filter(Resident.contact_number.ilike(f"%{filters['contact_number']}%"))
         
         if 'address' in filters and filters['address']:
-            query = query.join(Resident.addresses).filter(
+            query = query.filter(Resident.addresses.any(
                 or_(
                     Address.number.ilike(f"%{filters['address']}%"),
                     Address.block.ilike(f"%{filters['address']}%")
                 )
-            )
+            ))
         
-        return query.all()
+        return query
     
+    @require_permission('resident_management', 'can_edit')
     def allot_address_to_resident(self, resident_id, address_id, floor_id=None):
         resident = self.get_resident_by_id(resident_id)
         address = self.session.query(Address).filter(Address.id == address_id).first()
@@ -79,10 +177,11 @@ class ResidentController:
                     if floor and floor.address_id == address_id:
                         resident.floor = floor
                 
-                self.session.commit()
+                commit(self.session)
                 return True
         return False
     
+    @require_permission('resident_management', 'can_edit')
     def remove_address_from_resident(self, resident_id, address_id):
         resident = self.get_resident_by_id(resident_id)
         address = self.session.query(Address).filter(Address.id == address_id).first()
@@ -93,16 +192,198 @@ class ResidentController:
             if resident.floor and resident.floor.address_id == address_id:
                 resident.floor = None
                 
-            self.session.commit()
+            commit(self.session)
             return True
         return False
     
+    @require_permission('resident_management', 'can_edit')
+    def bulk_allot_addresses(self, rows):
+        """Allot many addresses at once from ``(resident_id, address_id, floor_id)`` rows.
+
+        ``floor_id`` may be None. Residents, addresses, floors and existing
+        allotments are checked with one query each, the new allotments are
+        inserted with one executemany and the floors set with another, all in
+        a single transaction. Returns one outcome per row, in order: ALLOTTED
+        or the reason the row was skipped.
+        """
+        rows = [tuple(row) + (None,) * (3 - len(row)) for row in rows]
+        if not rows:
+            return []
+        resident_ids = {row[0] for row in rows}
+        address_ids = {row[1] for row in rows}
+        floor_ids = {row[2] for row in rows if row[2] is not None}
+        
+        active_residents = set(self.session.execute(
+            select(Resident.id).where(Resident.id.in_(resident_ids), Resident.is_active == True)
+        ).scalars())
+        known_addresses = set(self.session.execute(
+            select(Address.id).where(Address.id.in_(address_ids))
+        ).scalars())
+        floor_addresses = dict(self.session.execute(
+            select(Floor.id, Floor.address_id).where(Floor.id.in_(floor_ids))
+        ).all()) if floor_ids else {}
+        allotted = self._existing_allotments(rows)
+        
+        outcomes = []
+        allotments = []
+        floors = {}
+        for resident_id, address_id, floor_id in rows:
+            if resident_id not in active_residents:
+                outcome = "resident not found or inactive"
+            elif address_id not in known_addresses:
+                outcome = "address not found"
+            elif floor_id is not None and floor_addresses.get(floor_id) != address_id:
+                outcome = "floor does not belong to the address"
+            elif (resident_id, address_id) in allotted:
+                outcome = "already allotted"
+            elif floor_id is not None and resident_id in floors:
+                outcome = "resident is given another floor in this batch"
+            else:
+                outcome = ALLOTTED
+                allotted.add((resident_id, address_id))
+                allotments.append({'address_id': address_id, 'resident_id': resident_id})
+                if floor_id is not None:
+                    floors[resident_id] = floor_id
+            outcomes.append(outcome)
+        
+        if allotments:
+            residents = Resident.__table__
+            previous_floors = dict(self.session.execute(
+                select(Resident.id, Resident.floor_id).where(Resident.id.in_(floors))
+            ).all()) if floors else {}
+            try:
+                self.session.execute(address_resident_association.insert(), allotments)
+                if floors:
+                    # On the connection, so only the floors involved are refreshed
+                    # instead of the session hooks recounting every floor
+                    connection = self.session.connection()
+                    connection.execute(
+                        residents.update().where(residents.c.id == bindparam('resident'))
+                        .values(floor_id=bindparam('floor')),
+                        [{'resident': resident_id, 'floor': floor_id} for resident_id, floor_id in floors.items()]
+                    )
+                    rebuild_occupancy(connection, {*floors.values(), *previous_floors.values()} - {None})
+            except Exception:
+                self.session.rollback()
+                raise
+            commit(self.session)
+        return outcomes
+    
+    @require_permission('resident_management', 'can_edit')
+    def bulk_release_addresses(self, rows):
+        """Undo many allotments at once from ``(resident_id, address_id[, floor_id])`` rows.
+
+        A resident whose floor is in a released address loses the floor, as
+        with ``remove_address_from_resident``. Allotments are checked with one
+        query and deleted with one executemany in a single transaction.
+        Returns one outcome per row, in order: RELEASED or the reason the row
+        was skipped.
+        """
+        pairs = [(row[0], row[1]) for row in rows]
+        if not pairs:
+            return []
+        allotted = self._existing_allotments(pairs)
+        
+        outcomes = []
+        released = set()
+        for pair in pairs:
+            if pair in released:
+                outcome = "duplicate in batch"
+            elif pair not in allotted:
+                outcome = "not allotted"
+            else:
+                outcome = RELEASED
+                released.add(pair)
+            outcomes.append(outcome)
+        
+        if released:
+            table = address_resident_association
+            residents = Resident.__table__
+            released_addresses = {address_id for _, address_id in released}
+            # Residents left on a floor of an address they no longer hold
+            floorless = {
+                resident_id: floor_id for resident_id, floor_id, address_id in self.session.execute(
+                    select(Resident.id, Floor.id, Floor.address_id).join(Floor, Resident.floor_id == Floor.id).where(
+                        Resident.id.in_({resident_id for resident_id, _ in released}),
+                        Floor.address_id.in_(released_addresses)
+                    )
+                ) if (resident_id, address_id) in released
+            }
+            try:
+                self.session.execute(
+                    table.delete().where(and_(table.c.resident_id == bindparam('resident'),
+                                              table.c.address_id == bindparam('address'))),
+                    [{'resident': resident_id, 'address': address_id} for resident_id, address_id in released]
+                )
+                if floorless:
+                    connection = self.session.connection()
+                    connection.execute(
+                        residents.update().where(residents.c.id.in_(floorless)).values(floor_id=None)
+                    )
+                    rebuild_occupancy(connection, set(floorless.values()))
+            except Exception:
+                self.session.rollback()
+                raise
+            commit(self.session)
+        return outcomes
+    
+    def _existing_allotments(self, rows):
+        """The ``(resident_id, address_id)`` pairs among ``rows`` that are already allotted."""
+        table = address_resident_association
+        pairs = {(row[0], row[1]) for row in rows}
+        existing = self.session.execute(
+            select(table.c.resident_id, table.c.address_id).where(
+                table.c.resident_id.in_({resident_id for resident_id, _ in pairs}),
+                table.c.address_id.in_({address_id for _, address_id in pairs})
+            )
+        )
+        return {tuple(pair) for pair in existing if tuple(pair) in pairs}
+    
     def get_residents_by_address(self, address_id):
-        return self.session.query(Resident).join(Resident.addresses).filter(
+        return self.session.query(Resident).options(
+            joinedload(Resident.floor)
+        ).join(Resident.addresses).filter(
             and_(Address.id == address_id, Resident.is_active == True)
         ).all()
     
+    def get_residents_by_address_page(self, address_id, page_size=DEFAULT_PAGE_SIZE, token=None,
+                                      with_total=False):
+        """Keyset-paginated ``get_residents_by_address``, ordered by id."""
+        query = self.session.query(Resident).options(
+            joinedload(Resident.floor)
+        ).join(Resident.addresses).filter(
+            and_(Address.id == address_id, Resident.is_active == True)
+        )
+        count = (lambda: query.order_by(None).count()) if with_total else None
+        return paginate(query, [Resident.id], page_size, token, count)
+    
     def get_residents_by_floor(self, floor_id):
-        return self.session.query(Resident).filter(
+        return self.session.query(Resident).options(
+            joinedload(Resident.floor)
+        ).filter(
             and_(Resident.floor_id == floor_id, Resident.is_active == True)
         ).all()
+    
+    def get_allotment_rows(self, address_id=None, block=None):
+        """Return plain (floor_id, address_id, number, block, floor_number, resident_id, name) rows."""
+        query = self.session.query(
+            Floor.id, Address.id, Address.number, Address.block, Floor.floor_number,
+            Resident.id, Resident.name
+        ).join(
+            Address, Floor.address_id == Address.id
+        ).join(
+            Resident, Floor.id == Resident.floor_id
+        ).filter(
+            Resident.is_active == True
+        )
+        
+        if address_id:
+            query = query.filter(Address.id == address_id)
+        if block:
+            query = query.filter(Address.block == Block[block])
+        
+        rows = query.order_by(Address.block, Address.number, Floor.floor_number, Resident.name)
+        return [
+            (floor_id, row_address_id, number, row_block.value, floor_number, resident_id, name)
+            for floor_id, row_address_id, number, row_block, floor_number, resident_id, name in rows
+        ]
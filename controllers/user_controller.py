@@ -1,14 +1,68 @@
+from auth.permissions import require_permission
+from database.connection import commit
 from database.models import User, session
+from database.pagination import DEFAULT_PAGE_SIZE, paginate
+from utils.security import check_password, hash_password, hash_passwords, needs_rehash
 
 class UserController:
-    def __init__(self):
-        self.session = session
+    def __init__(self, db_session=None):
+        self.session = db_session or session
     
     def get_all_users(self):
         return self.session.query(User).filter(User.is_active == True).all()
     
+    def get_user_page(self, page_size=DEFAULT_PAGE_SIZE, token=None, with_total=False):
+        """Keyset-paginated ``get_all_users``, ordered by username."""
+        query = self.session.query(User).filter(User.is_active == True)
+        count = (lambda: query.order_by(None).count()) if with_total else None
+        return paginate(query, [User.username, User.id], page_size, token, count)
+    
     def get_user_by_id(self, user_id):
         return self.session.query(User).filter(User.id == user_id).first()
     
     def get_user_by_username(self, username):
         return self.session.query(User).filter(User.username == username).first()
+    
+    def authenticate(self, username, password):
+        """Return the id of the user matching the credentials, or None.
+        
+        Hashes made with outdated parameters are replaced on a successful login.
+        """
+        user = self.session.query(User).filter(User.username == username).first()
+        if not user or not check_password(user.password_hash, password):
+            return None
+        
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            commit(self.session)
+        return user.id
+    
+    @require_permission('user_management', 'can_add')
+    def bulk_create_users(self, users_data, workers=None):
+        """Create many users in one transaction, hashing their passwords in parallel processes.
+        
+        Each item needs ``username`` and ``password`` and may carry ``full_name``
+        and ``email``. Returns the number of users created.
+        """
+        users_data = list(users_data)
+        hashes = hash_passwords((user_data['password'] for user_data in users_data), workers=workers)
+        records = [
+            {
+                'username': user_data['username'],
+                'password_hash': password_hash,
+                'full_name': user_data.get('full_name'),
+                'email': user_data.get('email'),
+                'is_active': True
+            }
+            for user_data, password_hash in zip(users_data, hashes)
+        ]
+        if not records:
+            return 0
+        
+        try:
+            self.session.execute(User.__table__.insert(), records)
+        except Exception:
+            self.session.rollback()
+            raise
+        commit(self.session)
+        return len(records)
@@ -1,12 +1,79 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool, StaticPool
+from config import (DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+                    DB_POOL_RECYCLE, SQLITE_PRAGMAS, QUERY_PROFILING, QUERY_PROFILE_BUFFER_SIZE,
+                    SLOW_QUERY_THRESHOLD_MS)
+from database.profiling import QueryProfiler
+
+def _engine_options(url):
+    options = {}
+    if url.startswith("sqlite"):
+        # Connections are handed between worker threads by the pool
+        options['connect_args'] = {'check_same_thread': False}
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            # Every connection to an in-memory database would see an empty database
+            options['poolclass'] = StaticPool
+            return options
+        options['poolclass'] = QueuePool
+
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+    return options
+
+def create_app_engine(url):
+    """Create an engine with the configured pool and, for SQLite, pragmas."""
+    new_engine = create_engine(url, **_engine_options(url))
+
+    if new_engine.dialect.name == "sqlite":
+        @event.listens_for(new_engine, "connect")
+        def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return new_engine
 
 # Create engine
-engine = create_engine(DATABASE_URL)
+engine = create_app_engine(DATABASE_URL)
+
+# Statement timings for the slow-query log and the diagnostics panel
+query_profiler = QueryProfiler(QUERY_PROFILE_BUFFER_SIZE, SLOW_QUERY_THRESHOLD_MS, QUERY_PROFILING)
+query_profiler.attach(engine)
 
 # Create session factory
-Session = sessionmaker(bind=engine)
+session_factory = sessionmaker(bind=engine)
+
+# Thread-local sessions: each thread calling Session() gets its own session
+Session = scoped_session(session_factory)
+
+# Proxy to the calling thread's session, used by the controllers
+session = Session
+
+def commit(db_session):
+    """Commit, rolling back on failure so the session stays usable."""
+    try:
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
 
-# Create a session
-session = Session()
+@contextmanager
+def session_scope():
+    """Provide a standalone unit of work that commits or rolls back as a whole."""
+    db_session = session_factory()
+    try:
+        yield db_session
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    finally:
+        db_session.close()
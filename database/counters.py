@@ -0,0 +1,188 @@
+from collections import Counter
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+from database.derived import (build_if_empty, check_main, find_drift, keep_previous_values,
+                              load_deleted_values, parameter_rows, previous_values)
+from database.models import Address, Resident, Complaint, SummaryCounter
+
+def _address_keys(category, block):
+    return [
+        'addresses.total',
+        f"addresses.category.{getattr(category, 'name', category)}",
+        f"addresses.block.{getattr(block, 'name', block)}",
+    ]
+
+def _resident_keys(is_active):
+    return ['residents.active'] if is_active else []
+
+def _complaint_keys(status):
+    return [f"complaints.status.{getattr(status, 'name', status)}"] if status is not None else []
+
+# model: (counter name prefix, attributes the counters depend on, attribute values -> counter names)
+TRACKED_MODELS = {
+    Address: ('addresses.', ('category', 'block'), _address_keys),
+    Resident: ('residents.', ('is_active',), _resident_keys),
+    Complaint: ('complaints.', ('status',), _complaint_keys),
+}
+TRACKED_TABLES = {model.__table__: model for model in TRACKED_MODELS}
+
+# Reads
+
+def read_counter(db_session, name):
+    value = db_session.execute(
+        select(SummaryCounter.value).where(SummaryCounter.name == name)
+    ).scalar()
+    return value or 0
+
+def read_counters(db_session, prefix=""):
+    rows = db_session.execute(
+        select(SummaryCounter.name, SummaryCounter.value).where(SummaryCounter.name.startswith(prefix))
+    )
+    return {name: value for name, value in rows}
+
+def read_breakdown(db_session, prefix, enum_type, counters=None):
+    """Return ``{member.value: count}`` for the non-zero counters under ``prefix``, in enum order.
+
+    ``counters`` may be an already loaded ``read_counters`` result.
+    """
+    if counters is None:
+        counters = read_counters(db_session, prefix)
+    breakdown = {}
+    for member in enum_type:
+        count = counters.get(prefix + member.name, 0)
+        if count:
+            breakdown[member.value] = count
+    return breakdown
+
+# Rebuild and reconciliation
+
+def compute_counters(connection, models=None):
+    """Count every tracked counter from the base tables with GROUP BY scans."""
+    counts = Counter()
+    for model in models or TRACKED_MODELS:
+        _, attributes, keys = TRACKED_MODELS[model]
+        columns = [getattr(model, attribute) for attribute in attributes]
+        for *values, count in connection.execute(select(*columns, func.count()).group_by(*columns)):
+            for key in keys(*values):
+                counts[key] += count
+    return counts
+
+def rebuild_counters(connection, models=None):
+    """Replace the stored counters of ``models`` (default all) with freshly computed ones."""
+    models = list(models or TRACKED_MODELS)
+    counts = compute_counters(connection, models)
+    table = SummaryCounter.__table__
+
+    for model in models:
+        prefix = TRACKED_MODELS[model][0]
+        connection.execute(table.delete().where(table.c.name.startswith(prefix)))
+    if counts:
+        connection.execute(table.insert(), [{'name': name, 'value': value} for name, value in counts.items()])
+    return dict(counts)
+
+def reconcile_counters(connection, repair=True):
+    """Compare stored counters with a full recount.
+
+    Returns ``{name: (stored, actual)}`` for every counter that drifted and,
+    unless ``repair`` is false, rebuilds the table.
+    """
+    actual = compute_counters(connection)
+    stored = dict(connection.execute(select(SummaryCounter.name, SummaryCounter.value)).all())
+    drift = find_drift(stored, actual, missing=0)
+    if drift and repair:
+        rebuild_counters(connection)
+    return drift
+
+def ensure_counters(connection):
+    """Build the counters once for databases that predate the summary table."""
+    return build_if_empty(connection, SummaryCounter.name, rebuild_counters)
+
+# Incremental maintenance
+
+def apply_counter_deltas(connection, deltas):
+    table = SummaryCounter.__table__
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        result = connection.execute(
+            table.update().where(table.c.name == name).values(value=table.c.value + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(name=name, value=delta))
+
+def _flush_deltas(flush_session):
+    deltas = Counter()
+
+    for instance in flush_session.new:
+        spec = TRACKED_MODELS.get(type(instance))
+        if spec:
+            _, attributes, keys = spec
+            deltas.update(keys(*(getattr(instance, attribute) for attribute in attributes)))
+
+    for instance in flush_session.deleted:
+        spec = TRACKED_MODELS.get(type(instance))
+        if spec:
+            _, attributes, keys = spec
+            deltas.subtract(keys(*previous_values(instance, attributes)))
+
+    for instance in flush_session.dirty:
+        spec = TRACKED_MODELS.get(type(instance))
+        if not spec:
+            continue
+        _, attributes, keys = spec
+        state = inspect(instance)
+        if any(state.attrs[attribute].history.has_changes() for attribute in attributes):
+            deltas.subtract(keys(*previous_values(instance, attributes)))
+            deltas.update(keys(*(getattr(instance, attribute) for attribute in attributes)))
+
+    return deltas
+
+# Old values are needed for the deltas of updated and deleted instances
+keep_previous_values(*[getattr(model, attribute) for model, (_, attributes, _) in TRACKED_MODELS.items()
+                       for attribute in attributes])
+
+@event.listens_for(Session, 'before_flush')
+def _load_deleted_values(flush_session, flush_context, instances):
+    load_deleted_values(flush_session, {model: spec[1] for model, spec in TRACKED_MODELS.items()})
+
+@event.listens_for(Session, 'after_flush')
+def _update_counters_after_flush(flush_session, flush_context):
+    # Pre-flush state and attribute history are still available here, and the
+    # updates join the flush's transaction so a rollback undoes them too
+    deltas = _flush_deltas(flush_session)
+    if any(deltas.values()):
+        apply_counter_deltas(flush_session.connection(), deltas)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _update_counters_after_bulk_write(orm_execute_state):
+    if orm_execute_state.is_select:
+        return None
+    model = TRACKED_TABLES.get(getattr(orm_execute_state.statement, 'table', None))
+    if model is None:
+        return None
+
+    result = orm_execute_state.invoke_statement()
+    connection = orm_execute_state.session.connection()
+    _, attributes, keys = TRACKED_MODELS[model]
+    rows = parameter_rows(orm_execute_state)
+
+    if isinstance(orm_execute_state.statement, Insert) and rows and all(
+        attribute in row for row in rows for attribute in attributes
+    ):
+        # Plain (executemany) inserts carry every value the counters need
+        deltas = Counter()
+        for row in rows:
+            deltas.update(keys(*(row[attribute] for attribute in attributes)))
+        apply_counter_deltas(connection, deltas)
+    else:
+        # Set-based UPDATE/DELETE/INSERT ... SELECT: recount just this table's counters
+        rebuild_counters(connection, [model])
+    return result
+
+def main():
+    check_main("Check the summary counters against a full recount.", reconcile_counters,
+               "Summary counters are up to date.", "Rebuilt counters, {} corrected.")
+
+if __name__ == "__main__":
+    main()
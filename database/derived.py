@@ -0,0 +1,75 @@
+from sqlalchemy import event, inspect, select
+
+# Shared by the tables kept in step with the base tables: the summary counters
+# (database.counters) and the floor occupancy index (database.occupancy)
+
+# Reconciliation
+
+def find_drift(stored, actual, missing=None):
+    """Return ``{key: (stored, actual)}`` for every key whose values differ, ``missing`` standing in for absent keys."""
+    return {
+        key: (stored.get(key, missing), actual.get(key, missing))
+        for key in set(stored) | set(actual)
+        if stored.get(key, missing) != actual.get(key, missing)
+    }
+
+def build_if_empty(connection, column, rebuild):
+    """Run ``rebuild(connection)`` if ``column``'s table has no rows yet; return whether it ran."""
+    if connection.execute(select(column).limit(1)).first() is None:
+        rebuild(connection)
+        return True
+    return False
+
+def check_main(description, reconcile, up_to_date, rebuilt, label=str):
+    """Command line entry point that reports, and unless --check repairs, drift.
+
+    ``rebuilt`` is formatted with the number of corrected entries.
+    """
+    import argparse
+    from database.connection import engine
+
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--check", action="store_true", help="report drift without repairing it")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        drift = reconcile(connection, repair=not args.check)
+
+    if not drift:
+        print(up_to_date)
+        return
+    for key, (stored, actual) in sorted(drift.items()):
+        print(f"{label(key)}: stored={stored} actual={actual}")
+    print("Reported drift only." if args.check else rebuilt.format(len(drift)))
+
+# Incremental maintenance
+
+def previous_values(instance, attributes):
+    """Return the values ``attributes`` had when ``instance`` was loaded or last flushed."""
+    state = inspect(instance)
+    values = []
+    for attribute in attributes:
+        history = state.attrs[attribute].history
+        previous = history.deleted or history.unchanged
+        values.append(previous[0] if previous else None)
+    return values
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    pass
+
+def keep_previous_values(*attributes):
+    """Load the old value before each of ``attributes`` is overwritten, so it is
+    known at flush even when the instance was expired by an earlier commit."""
+    for attribute in attributes:
+        event.listen(attribute, 'set', _keep_previous_value, active_history=True)
+
+def load_deleted_values(flush_session, tracked):
+    """Load the ``tracked[type(instance)]`` attributes of instances about to be deleted."""
+    for instance in flush_session.deleted:
+        for attribute in tracked.get(type(instance), ()):
+            getattr(instance, attribute)
+
+def parameter_rows(orm_execute_state):
+    """Return the parameter sets of a bulk statement as a list, one per executemany row."""
+    rows = orm_execute_state.parameters
+    return rows if isinstance(rows, list) else [rows] if rows else []
@@ -0,0 +1,38 @@
+from sqlalchemy import inspect, text
+from database.models import Base
+
+def create_missing_indexes(connection):
+    """Create every index declared on the models that the database lacks.
+
+    ``Base.metadata.create_all`` only creates indexes together with new tables,
+    so databases created before an index was declared need this to catch up.
+    Returns the names of the indexes that were created.
+    """
+    inspector = inspect(connection)
+    created = []
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                index.create(connection)
+                created.append(index.name)
+
+    if created and connection.dialect.name == "sqlite":
+        # Refresh planner statistics so the new indexes are actually chosen
+        connection.execute(text("ANALYZE"))
+
+    return created
+
+def drop_declared_indexes(connection):
+    """Drop the model-declared indexes (used to benchmark the unindexed schema)."""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                index.drop(connection)
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, Enum, Table
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, Enum, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+import datetime
 import enum
+from database.connection import session
 
 Base = declarative_base()
 
@@ -9,13 +11,17 @@ Base = declarative_base()
 address_resident_association = Table(
     'address_resident', Base.metadata,
     Column('address_id', Integer, ForeignKey('addresses.id')),
-    Column('resident_id', Integer, ForeignKey('residents.id'))
+    Column('resident_id', Integer, ForeignKey('residents.id')),
+    # One index per join direction, each covering the other key
+    Index('ix_address_resident_address_resident', 'address_id', 'resident_id'),
+    Index('ix_address_resident_resident_address', 'resident_id', 'address_id')
 )
 
 user_permission_association = Table(
     'user_permission', Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id')),
-    Column('permission_id', Integer, ForeignKey('permissions.id'))
+    Column('permission_id', Integer, ForeignKey('permissions.id')),
+    Index('ix_user_permission_user_permission', 'user_id', 'permission_id')
 )
 
 class Category(enum.Enum):
@@ -51,6 +57,11 @@ class User(Base):
     
     permissions = relationship("Permission", secondary=user_permission_association)
     
+    def has_permission(self, module, action):
+        # Served from the resolver's cached grants, never from the relationship
+        from auth.permissions import permission_resolver
+        return permission_resolver.has_permission(self.id, module, action)
+    
 class Permission(Base):
     __tablename__ = 'permissions'
     
@@ -74,6 +85,12 @@ class Address(Base):
     
     floors = relationship("Floor", back_populates="address")
     residents = relationship("Resident", secondary=address_resident_association, back_populates="addresses")
+    
+    __table_args__ = (
+        # Category/block group-bys and filters are answered from the index alone
+        Index('ix_addresses_category', 'category'),
+        Index('ix_addresses_block_number', 'block', 'number'),
+    )
 
 class Floor(Base):
     __tablename__ = 'floors'
@@ -94,6 +111,10 @@ class Floor(Base):
     
     address = relationship("Address", back_populates="floors")
     residents = relationship("Resident", back_populates="floor")
+    
+    __table_args__ = (
+        Index('ix_floors_address_floor_number', 'address_id', 'floor_number'),
+    )
 
 class Resident(Base):
     __tablename__ = 'residents'
@@ -113,6 +134,12 @@ class Resident(Base):
     
     # Financial records
     financial_records = relationship("FinancialRecord", back_populates="resident")
+    
+    __table_args__ = (
+        # Active-resident counts and id-ordered keyset pages
+        Index('ix_residents_active_id', 'is_active', 'id'),
+        Index('ix_residents_floor_active', 'floor_id', 'is_active'),
+    )
 
 class ChargeType(enum.Enum):
     MONTHLY = "Monthly"
@@ -144,6 +171,16 @@ class FinancialRecord(Base):
     resident = relationship("Resident", back_populates="financial_records")
     address = relationship("Address")
     charge = relationship("Charge")
+    
+    __table_args__ = (
+        # Covers the pending-dues sum without touching the table
+        Index('ix_financial_records_paid_due_amount', 'is_paid', 'due_date', 'amount'),
+        # Covers the aging report's scan of unpaid records
+        Index('ix_financial_records_aging', 'is_paid', 'due_date', 'resident_id', 'address_id', 'charge_id', 'amount'),
+        Index('ix_financial_records_due_date', 'due_date'),
+        Index('ix_financial_records_resident_due', 'resident_id', 'due_date'),
+        Index('ix_financial_records_address_due', 'address_id', 'due_date'),
+    )
 
 class ComplaintStatus(enum.Enum):
     PENDING = "Pending"
@@ -166,3 +203,37 @@ class Complaint(Base):
     
     resident = relationship("Resident")
     address = relationship("Address")
+    
+    __table_args__ = (
+        Index('ix_complaints_status_created', 'status', 'created_at'),
+        Index('ix_complaints_created_at', 'created_at'),
+        Index('ix_complaints_address_status', 'address_id', 'status'),
+    )
+
+class SummaryCounter(Base):
+    __tablename__ = 'summary_counters'
+    
+    # Maintained by database.counters, e.g. 'addresses.total' or 'complaints.status.PENDING'
+    name = Column(String(100), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class FloorOccupancy(Base):
+    __tablename__ = 'floor_occupancy'
+    
+    # Maintained by database.occupancy, one row per floor of an existing address
+    floor_id = Column(Integer, primary_key=True)
+    address_id = Column(Integer, nullable=False)
+    block = Column(Enum(Block), nullable=False)
+    floor_number = Column(Integer, nullable=False)
+    is_owner = Column(Boolean, nullable=False, default=False)
+    is_tenant = Column(Boolean, nullable=False, default=False)
+    is_commercial = Column(Boolean, nullable=False, default=False)
+    is_shop = Column(Boolean, nullable=False, default=False)
+    is_vacant = Column(Boolean, nullable=False, default=False)
+    active_residents = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Free floors (no active residents), optionally in one block, in address order
+        Index('ix_floor_occupancy_free', 'active_residents', 'block', 'address_id', 'floor_number'),
+        Index('ix_floor_occupancy_address', 'address_id', 'floor_number'),
+    )
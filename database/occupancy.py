@@ -0,0 +1,228 @@
+from sqlalchemy import and_, event, func, inspect, select
+from sqlalchemy.orm import Session
+from database.derived import (build_if_empty, check_main, find_drift, keep_previous_values,
+                              load_deleted_values, parameter_rows, previous_values)
+from database.models import Address, Floor, FloorOccupancy, Resident
+
+# Floor columns mirrored into the occupancy index
+FLOOR_COLUMNS = ('address_id', 'floor_number', 'is_owner', 'is_tenant', 'is_commercial', 'is_shop', 'is_vacant')
+
+# Resident attributes that move a resident in or out of a floor's count
+RESIDENT_ATTRIBUTES = ('floor_id', 'is_active')
+
+OCCUPANCY_TABLES = {model.__table__: model for model in (Resident, Floor, Address)}
+
+# Floor ids per statement when refreshing part of the index, within every
+# database's bound parameter limit
+CHUNK_SIZE = 500
+
+# Past this many floors a bulk write recomputes the whole index in one
+# statement rather than chunk by chunk
+FULL_REFRESH_FLOORS = 10000
+
+# Rebuild and reconciliation
+
+def occupancy_query(floor_ids=None):
+    """Compute occupancy rows, in FloorOccupancy column order, from the base tables."""
+    active_residents = select(func.count(Resident.id)).where(
+        Resident.floor_id == Floor.id, Resident.is_active == True
+    ).scalar_subquery()
+
+    query = select(
+        Floor.id,
+        Floor.address_id,
+        Address.block,
+        Floor.floor_number,
+        *[func.coalesce(getattr(Floor, column), False) for column in FLOOR_COLUMNS[2:]],
+        active_residents
+    ).join(Address, Floor.address_id == Address.id)
+    if floor_ids is not None:
+        query = query.where(Floor.id.in_(floor_ids))
+    return query
+
+def rebuild_occupancy(connection, floor_ids=None):
+    """Replace the occupancy rows of ``floor_ids`` (default every floor) with freshly computed ones."""
+    table = FloorOccupancy.__table__
+    columns = [column.name for column in table.columns]
+    if floor_ids is None:
+        connection.execute(table.delete())
+        connection.execute(table.insert().from_select(columns, occupancy_query()))
+        return
+
+    for chunk in _chunks(floor_ids):
+        connection.execute(table.delete().where(table.c.floor_id.in_(chunk)))
+        connection.execute(table.insert().from_select(columns, occupancy_query(chunk)))
+
+def recount_residents(connection, floor_ids=None):
+    """Recount ``active_residents`` of ``floor_ids`` (default every floor), leaving the floor columns alone."""
+    table = FloorOccupancy.__table__
+    statement = table.update().values(active_residents=select(func.count(Resident.id)).where(
+        and_(Resident.floor_id == table.c.floor_id, Resident.is_active == True)
+    ).scalar_subquery())
+    if floor_ids is None:
+        connection.execute(statement)
+        return
+    for chunk in _chunks(floor_ids):
+        connection.execute(statement.where(table.c.floor_id.in_(chunk)))
+
+def add_missing_floors(connection):
+    """Add rows for floors that have none yet, such as those just inserted."""
+    table = FloorOccupancy.__table__
+    connection.execute(table.insert().from_select(
+        [column.name for column in table.columns],
+        occupancy_query().where(Floor.id.not_in(select(table.c.floor_id)))
+    ))
+
+def reconcile_occupancy(connection, repair=True):
+    """Compare the occupancy index with a full recompute.
+
+    Returns ``{floor_id: (stored, actual)}`` for every row that drifted (None
+    for a missing row) and, unless ``repair`` is false, rebuilds the index.
+    """
+    table = FloorOccupancy.__table__
+    actual = {row[0]: tuple(row) for row in connection.execute(occupancy_query())}
+    stored = {row[0]: tuple(row) for row in connection.execute(select(table))}
+    drift = find_drift(stored, actual)
+    if drift and repair:
+        rebuild_occupancy(connection)
+    return drift
+
+def ensure_occupancy(connection):
+    """Build the index once for databases that predate the occupancy table."""
+    return build_if_empty(connection, FloorOccupancy.floor_id, rebuild_occupancy)
+
+# Incremental maintenance
+
+def _changed(instance, attributes):
+    state = inspect(instance)
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+def _flush_changes(flush_session):
+    """Return the floor ids whose occupancy rows are stale and the addresses whose block changed."""
+    floor_ids = set()
+    addresses = {}
+
+    for instance in flush_session.new:
+        if isinstance(instance, Resident):
+            floor_ids.add(instance.floor_id)
+        elif isinstance(instance, Floor):
+            floor_ids.add(instance.id)
+
+    for instance in flush_session.deleted:
+        if isinstance(instance, Resident):
+            floor_ids.add(previous_values(instance, ['floor_id'])[0])
+        elif isinstance(instance, Floor):
+            floor_ids.add(instance.id)
+
+    for instance in flush_session.dirty:
+        if isinstance(instance, Resident) and _changed(instance, RESIDENT_ATTRIBUTES):
+            floor_ids.update((previous_values(instance, ['floor_id'])[0], instance.floor_id))
+        elif isinstance(instance, Floor) and _changed(instance, FLOOR_COLUMNS):
+            floor_ids.add(instance.id)
+        elif isinstance(instance, Address) and _changed(instance, ('block',)):
+            addresses[instance.id] = instance.block
+
+    floor_ids.discard(None)
+    return floor_ids, addresses
+
+# The floor a resident leaves is refreshed as well as the one they move to
+keep_previous_values(Resident.floor_id)
+
+@event.listens_for(Session, 'before_flush')
+def _load_deleted_floors(flush_session, flush_context, instances):
+    load_deleted_values(flush_session, {Resident: ('floor_id',)})
+
+@event.listens_for(Session, 'after_flush')
+def _update_occupancy_after_flush(flush_session, flush_context):
+    # Runs in the flush's transaction, after the rows are written, so the
+    # recompute sees them and a rollback undoes it too
+    floor_ids, addresses = _flush_changes(flush_session)
+    if not floor_ids and not addresses:
+        return
+
+    connection = flush_session.connection()
+    table = FloorOccupancy.__table__
+    for address_id, block in addresses.items():
+        connection.execute(table.update().where(table.c.address_id == address_id).values(block=block))
+    rebuild_occupancy(connection, floor_ids)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _update_occupancy_after_bulk_write(orm_execute_state):
+    if orm_execute_state.is_select:
+        return None
+    statement = orm_execute_state.statement
+    model = OCCUPANCY_TABLES.get(getattr(statement, 'table', None))
+    if model is None:
+        return None
+    if model is Address and orm_execute_state.is_insert:
+        # A new address has no floors yet
+        return None
+
+    connection = orm_execute_state.session.connection()
+    rows = parameter_rows(orm_execute_state)
+
+    if orm_execute_state.is_insert:
+        result = orm_execute_state.invoke_statement()
+        if model is Floor:
+            add_missing_floors(connection)
+        elif rows and all('floor_id' in row for row in rows):
+            recount_residents(connection, {row['floor_id'] for row in rows} - {None})
+        else:
+            recount_residents(connection)
+        return result
+
+    if len(rows) > 1:
+        # An executemany UPDATE or DELETE binds a different WHERE per row, so
+        # the rows it touches are not known up front
+        result = orm_execute_state.invoke_statement()
+        if model is Resident:
+            recount_residents(connection)
+        else:
+            rebuild_occupancy(connection)
+        return result
+
+    # Look up the rows the WHERE clause selects before they change or go away
+    params = rows[0] if rows else {}
+    if model is Resident:
+        residents = connection.execute(_matching(statement, Resident.id, Resident.floor_id), params).all()
+        result = orm_execute_state.invoke_statement()
+        floor_ids = {floor_id for _, floor_id in residents}
+        if orm_execute_state.is_update:
+            resident_ids = [resident_id for resident_id, _ in residents]
+            for chunk in _chunks(resident_ids):
+                floor_ids.update(connection.execute(
+                    select(Resident.floor_id).where(Resident.id.in_(chunk))
+                ).scalars())
+        recount_residents(connection, _targeted(floor_ids - {None}))
+        return result
+
+    if model is Floor:
+        floors = _matching(statement, Floor.id)
+    else:
+        floors = select(Floor.id).where(Floor.address_id.in_(_matching(statement, Address.id)))
+    floor_ids = set(connection.execute(floors, params).scalars())
+    result = orm_execute_state.invoke_statement()
+    rebuild_occupancy(connection, _targeted(floor_ids))
+    return result
+
+def _matching(statement, *columns):
+    query = select(*columns)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    return query
+
+def _targeted(floor_ids):
+    return floor_ids if len(floor_ids) <= FULL_REFRESH_FLOORS else None
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+def main():
+    check_main("Check the floor occupancy index against a full recompute.", reconcile_occupancy,
+               "Floor occupancy index is up to date.", "Rebuilt occupancy index, {} floors corrected.",
+               label=lambda floor_id: f"floor {floor_id}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import base64
+import datetime
+import enum
+import json
+from sqlalchemy import Date, DateTime, Enum, and_, literal, or_, tuple_
+from sqlalchemy.sql import operators
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+class InvalidPageToken(ValueError):
+    pass
+
+class Page:
+    """One page of a keyset-paginated query.
+
+    ``next_token`` is an opaque string to pass back for the following page,
+    or None on the last page. ``total`` is only set when it was asked for.
+    """
+
+    def __init__(self, items, next_token=None, total=None):
+        self.items = items
+        self.next_token = next_token
+        self.total = total
+
+    @property
+    def has_more(self):
+        return self.next_token is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+def paginate(query, key_columns, page_size=DEFAULT_PAGE_SIZE, token=None, count=None, transform=None):
+    """Return one ``Page`` of ``query`` ordered by ``key_columns``.
+
+    ``key_columns`` must be non-null, identify a row uniquely (end them with
+    the primary key) and may use ``column.desc()``. Instead of an OFFSET the
+    next page starts after the last key seen, so every page costs the same
+    index range scan however deep the caller goes. ``count`` is a callable
+    returning the total; it runs for the first page only and the result
+    travels in the token. ``transform`` maps each fetched row to the item
+    returned.
+    """
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+    keys = [_key(column) for column in key_columns]
+    fingerprint = [str(column) for column, _ in keys]
+
+    total = None
+    if token is not None:
+        values, total = _decode_token(token, keys, fingerprint)
+        query = query.filter(_after(keys, values))
+    elif count is not None:
+        total = count()
+
+    rows = query.order_by(
+        *[column.desc() if descending else column for column, descending in keys]
+    ).limit(page_size + 1).all()
+
+    next_token = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        values = [_row_value(rows[-1], column) for column, _ in keys]
+        next_token = _encode_token(values, total, fingerprint)
+
+    items = [transform(row) for row in rows] if transform else rows
+    return Page(items, next_token, total)
+
+def _key(column):
+    # column.desc() wraps the column in a unary expression with a desc modifier
+    if getattr(column, 'modifier', None) is operators.desc_op:
+        return column.element, True
+    return column, False
+
+def _after(keys, values):
+    """Rows strictly after ``values`` in the key order."""
+    # Bound as literals so booleans compare with < and > like any other value
+    values = [literal(value, column.type) for (column, _), value in zip(keys, values)]
+    if len({descending for _, descending in keys}) == 1:
+        # Same direction everywhere: a row value comparison the index can seek on
+        columns = tuple_(*[column for column, _ in keys])
+        bound = tuple_(*values)
+        return columns < bound if keys[0][1] else columns > bound
+
+    clauses = []
+    for index, ((column, descending), value) in enumerate(zip(keys, values)):
+        equal = [keys[position][0] == values[position] for position in range(index)]
+        clauses.append(and_(*equal, column < value if descending else column > value))
+    return or_(*clauses)
+
+def _row_value(row, column):
+    if hasattr(row, '_mapping'):
+        return row._mapping[column]
+    return getattr(row, column.key)
+
+# Tokens
+
+def _encode_token(values, total, fingerprint):
+    payload = {'k': [_dump(value) for value in values], 'c': fingerprint}
+    if total is not None:
+        payload['t'] = total
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def _decode_token(token, keys, fingerprint):
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(data)
+        if payload['c'] != fingerprint or len(payload['k']) != len(keys):
+            raise InvalidPageToken("Page token belongs to a different listing")
+        values = [_load(value, column.type) for value, (column, _) in zip(payload['k'], keys)]
+    except InvalidPageToken:
+        raise
+    except (ValueError, KeyError, TypeError, LookupError) as e:
+        raise InvalidPageToken("Malformed page token") from e
+    return values, payload.get('t')
+
+def _dump(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+def _load(value, column_type):
+    if value is None:
+        return None
+    if isinstance(column_type, DateTime):
+        return datetime.datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return datetime.date.fromisoformat(value)
+    if isinstance(column_type, Enum) and column_type.enum_class is not None:
+        return column_type.enum_class[value]
+    return value
@@ -0,0 +1,181 @@
+import collections
+import logging
+import sys
+import threading
+import time
+from sqlalchemy import event
+
+slow_query_logger = logging.getLogger("database.slow_queries")
+
+# Packages whose functions count as the origin of a statement; the innermost one wins
+ORIGIN_PACKAGES = ('controllers.', 'services.', 'ui.', 'utils.', 'auth.')
+
+class QueryRecord:
+    """One executed statement as seen by the profiler."""
+
+    __slots__ = ('started_at', 'statement', 'params_shape', 'origin', 'elapsed_ms', 'rows', 'error')
+
+    def __init__(self, statement, params_shape, origin):
+        self.started_at = time.time()
+        self.statement = statement
+        self.params_shape = params_shape
+        self.origin = origin
+        self.elapsed_ms = 0.0
+        self.rows = None
+        self.error = None
+
+class QueryProfiler:
+    """Times every statement an engine runs and keeps the latest in a ring buffer.
+
+    The clock covers executing the statement and fetching its rows, since
+    SQLite does most of a SELECT's work during the fetch. Statements slower
+    than ``slow_threshold_ms`` are also logged to ``database.slow_queries`` and
+    kept in a separate buffer. Parameter values are never stored, only their
+    shape.
+    """
+
+    def __init__(self, buffer_size=500, slow_threshold_ms=200, enabled=True):
+        self.records = collections.deque(maxlen=buffer_size)
+        self.slow_records = collections.deque(maxlen=buffer_size)
+        self.slow_threshold_ms = slow_threshold_ms
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def attach(self, bind):
+        event.listen(bind, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(bind, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(bind, "handle_error", self._handle_error)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.slow_records.clear()
+            self._stats.clear()
+
+    def summary(self):
+        """Return ``(origin, calls, total_ms, max_ms, rows)`` per origin, slowest total first."""
+        with self._lock:
+            rows = [(origin, *stats) for origin, stats in self._stats.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    # Engine events
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not self.enabled or context is None:
+            return
+        record = QueryRecord(statement, _params_shape(parameters, executemany), _origin())
+        context._profile_record = record
+        context._profile_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        record = getattr(context, '_profile_record', None)
+        if record is None:
+            return
+        record.elapsed_ms = (time.perf_counter() - context._profile_started) * 1000
+        self.records.append(record)
+
+        if cursor.description is None:
+            record.rows = cursor.rowcount if cursor.rowcount >= 0 else None
+            self._finish(record)
+        else:
+            # The result reads context.cursor, so its fetches go through the proxy
+            # and the record completes when the result closes the cursor
+            context.cursor = _ProfiledCursor(cursor, record, self)
+
+    def _handle_error(self, exception_context):
+        context = exception_context.execution_context
+        record = getattr(context, '_profile_record', None)
+        if record is None or record.error is not None:
+            return
+        record.elapsed_ms = (time.perf_counter() - context._profile_started) * 1000
+        record.error = type(exception_context.original_exception).__name__
+        if record not in self.records:
+            self.records.append(record)
+        self._finish(record)
+
+    def _finish(self, record):
+        with self._lock:
+            stats = self._stats.setdefault(record.origin, [0, 0.0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += record.elapsed_ms
+            stats[2] = max(stats[2], record.elapsed_ms)
+            stats[3] += record.rows or 0
+
+        if record.elapsed_ms >= self.slow_threshold_ms:
+            self.slow_records.append(record)
+            slow_query_logger.warning(
+                "%.0f ms, %s rows, from %s: %s [%s]", record.elapsed_ms,
+                "?" if record.rows is None else record.rows, record.origin,
+                " ".join(record.statement.split())[:500], record.params_shape
+            )
+
+class _ProfiledCursor:
+    """DBAPI cursor proxy adding fetch time and row counts to a QueryRecord."""
+
+    def __init__(self, cursor, record, profiler):
+        self._cursor = cursor
+        self._record = record
+        self._profiler = profiler
+        self._fetched = 0
+        self._finished = False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._fetched += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._timed(self._cursor.fetchmany, *args)
+        self._fetched += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._fetched += len(rows)
+        return rows
+
+    def close(self):
+        self._cursor.close()
+        if not self._finished:
+            self._finished = True
+            self._record.rows = self._fetched
+            self._profiler._finish(self._record)
+
+    def _timed(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            self._record.elapsed_ms += (time.perf_counter() - started) * 1000
+
+def _params_shape(parameters, executemany):
+    if executemany:
+        first = parameters[0] if parameters else ()
+        return f"{len(parameters)} x {len(first)} params"
+    if not parameters:
+        return "no params"
+    return f"{len(parameters)} params"
+
+def _origin():
+    """Name the application method that issued the statement, e.g. ``ResidentController.filter_residents``."""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(ORIGIN_PACKAGES):
+            owner = frame.f_locals.get('self')
+            if owner is not None:
+                return f"{type(owner).__name__}.{frame.f_code.co_name}"
+            return f"{module}.{frame.f_code.co_name}"
+        if fallback is None and not module.startswith(('sqlalchemy', __name__)):
+            fallback = f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or "unknown"
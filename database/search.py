@@ -0,0 +1,125 @@
+import re
+from sqlalchemy import Integer, column, text
+
+# Resident columns mirrored into the full-text index, with their bm25 weights
+RESIDENT_SEARCH_COLUMNS = {
+    'name': 10.0,
+    'contact_number': 5.0,
+    'email': 3.0,
+    'emergency_contact': 1.0,
+    'id_proof_number': 4.0,
+}
+
+_COLUMNS = ", ".join(RESIDENT_SEARCH_COLUMNS)
+_NEW_VALUES = ", ".join(f"new.{column}" for column in RESIDENT_SEARCH_COLUMNS)
+_OLD_VALUES = ", ".join(f"old.{column}" for column in RESIDENT_SEARCH_COLUMNS)
+
+# External-content FTS5 table: the index stores only tokens, rows live in residents
+RESIDENT_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS residents_fts USING fts5(
+        {_COLUMNS},
+        content='residents', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS residents_fts_insert AFTER INSERT ON residents BEGIN
+        INSERT INTO residents_fts(rowid, {_COLUMNS}) VALUES (new.id, {_NEW_VALUES});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS residents_fts_delete AFTER DELETE ON residents BEGIN
+        INSERT INTO residents_fts(residents_fts, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD_VALUES});
+    END""",
+    # Only the mirrored columns: floor moves and deactivations leave the index alone
+    f"""CREATE TRIGGER IF NOT EXISTS residents_fts_update AFTER UPDATE OF {_COLUMNS} ON residents BEGIN
+        INSERT INTO residents_fts(residents_fts, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD_VALUES});
+        INSERT INTO residents_fts(rowid, {_COLUMNS}) VALUES (new.id, {_NEW_VALUES});
+    END""",
+]
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Engine -> whether its database has the residents_fts table, checked once per engine
+_search_index_present = {}
+
+def supports_full_text_search(db_session):
+    """Whether filters can use the FTS5 index.
+
+    SQLite databases created before the index existed (init_db not re-run)
+    have no residents_fts table and use the LIKE filters instead.
+    """
+    engine = db_session.get_bind().engine
+    present = _search_index_present.get(engine)
+    if present is None:
+        present = engine.dialect.name == "sqlite" and _has_search_table(db_session)
+        _search_index_present[engine] = present
+    return present
+
+def _has_search_table(connection):
+    return connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'residents_fts'"
+    )).first() is not None
+
+def ensure_resident_search_index(connection):
+    """Create the resident FTS5 table and its sync triggers if they are missing.
+
+    The index is rebuilt from the residents table when it is first created, so
+    this can be run against an existing database.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+
+    exists = _has_search_table(connection)
+
+    # Databases created before the update trigger was limited to the mirrored columns
+    update_trigger = connection.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'residents_fts_update'"
+    )).scalar()
+    if update_trigger and "UPDATE OF" not in update_trigger:
+        connection.execute(text("DROP TRIGGER residents_fts_update"))
+
+    for statement in RESIDENT_SEARCH_DDL:
+        connection.execute(text(statement))
+
+    if not exists:
+        rebuild_resident_search_index(connection)
+    _search_index_present[connection.engine] = True
+    return True
+
+def rebuild_resident_search_index(connection):
+    connection.execute(text("INSERT INTO residents_fts(residents_fts) VALUES ('rebuild')"))
+
+def build_match_expression(terms):
+    """Turn ``{column: user_text}`` into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and all terms must match. The
+    ``None`` column searches every indexed column. Returns ``None`` if the
+    input holds no searchable words.
+    """
+    clauses = []
+    for field, value in terms.items():
+        words = _TOKEN.findall(value or "")
+        if not words:
+            continue
+        phrase = " ".join(f'"{word}"*' for word in words)
+        clauses.append(f"{field} : ({phrase})" if field else f"({phrase})")
+
+    return " AND ".join(clauses) if clauses else None
+
+def resident_match_ids(match_expression):
+    """Subquery of resident ids matching an FTS5 expression."""
+    return text(
+        "SELECT rowid FROM residents_fts WHERE residents_fts MATCH :match"
+    ).bindparams(match=match_expression).columns(column('rowid', Integer))
+
+def search_resident_ids(db_session, query_text, limit=50):
+    """Return active resident ids matching ``query_text`` in any column, best match first."""
+    match_expression = build_match_expression({None: query_text})
+    if match_expression is None:
+        return []
+
+    weights = ", ".join(str(weight) for weight in RESIDENT_SEARCH_COLUMNS.values())
+    rows = db_session.execute(text(
+        f"SELECT residents.id FROM residents_fts "
+        f"JOIN residents ON residents.id = residents_fts.rowid "
+        f"WHERE residents_fts MATCH :match AND residents.is_active = 1 "
+        f"ORDER BY bm25(residents_fts, {weights}) LIMIT :limit"
+    ), {'match': match_expression, 'limit': limit})
+    return [row[0] for row in rows]
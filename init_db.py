@@ -1,9 +1,30 @@
+from database.connection import engine
 from database.models import Base, User, Permission, session
+from database.counters import ensure_counters
+from database.migrations import create_missing_indexes
+from database.occupancy import ensure_occupancy
+from database.search import ensure_resident_search_index
 from utils.security import hash_password
 
 def init_db():
     # Create tables
-    Base.metadata.create_all()
+    Base.metadata.create_all(engine)
+    
+    # Indexes declared after the database was first created
+    with engine.begin() as connection:
+        create_missing_indexes(connection)
+    
+    # Full-text index over residents (SQLite only)
+    with engine.begin() as connection:
+        ensure_resident_search_index(connection)
+    
+    # Dashboard counters for databases created before the summary table
+    with engine.begin() as connection:
+        ensure_counters(connection)
+    
+    # Floor occupancy index for databases created before it
+    with engine.begin() as connection:
+        ensure_occupancy(connection)
     
     # Create admin user if not exists
     admin_user = session.query(User).filter(User.username == 'admin').first()
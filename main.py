@@ -1,13 +1,18 @@
+import logging
 import sys
+import time
 from PyQt5.QtWidgets import QApplication
 from auth.login import LoginDialog
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
     app = QApplication(sys.argv)
     login_dialog = LoginDialog()
     if login_dialog.exec_():
+        # Startup is measured from a successful login to the first paint
+        started_at = time.perf_counter()
         from ui.main_window import MainWindow
-        main_window = MainWindow(login_dialog.current_user)
+        main_window = MainWindow(login_dialog.current_user, started_at)
         main_window.show()
         sys.exit(app.exec_())
 
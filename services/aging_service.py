@@ -0,0 +1,165 @@
+import datetime
+import itertools
+from sqlalchemy import case, extract, func, select
+from database.models import Address, Charge, FinancialRecord, Resident, session
+
+# Upper bound (whole calendar days past due, inclusive) of every bucket except
+# the open-ended last one: due today or later is Current, due yesterday is 1-30
+AGING_BOUNDARIES = (0, 30, 60, 90)
+AGING_BUCKETS = ('Current', '1-30', '31-60', '61-90', '90+')
+
+# Julian day number of 1970-01-01, to turn SQLite julianday() values into epoch days
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+_UNIX_EPOCH = datetime.date(1970, 1, 1)
+
+class AgingReport:
+    """Outstanding dues of one aging run, bucketed by days past due.
+
+    ``items`` holds one row per unpaid record (``resident_id``, ``address_id``,
+    ``charge_id``, ``amount``, ``days_overdue``, ``bucket``) and ``by`` rolls
+    them up per resident, address, block or charge.
+    """
+
+    DIMENSIONS = ('resident', 'address', 'block', 'charge')
+
+    def __init__(self, as_of, items, residents, addresses, charges):
+        self.as_of = as_of
+        self.items = items
+        self.residents = residents
+        self.addresses = addresses
+        self.charges = charges
+
+    def totals(self):
+        """Return ``{bucket: amount}`` over every outstanding record."""
+        sums = self.items.groupby('bucket')['amount'].sum()
+        return {bucket: float(sums.get(bucket, 0.0)) for bucket in AGING_BUCKETS}
+
+    def by(self, dimension):
+        """Return a DataFrame with one row per ``dimension`` value, its labels, one
+        column per bucket and a ``Total`` column, largest balances first."""
+        if dimension not in self.DIMENSIONS:
+            raise ValueError(f"Unknown aging dimension: {dimension}")
+
+        items = self.items
+        if dimension == 'block':
+            items = items.assign(block=self.addresses['block'].reindex(items['address_id']).to_numpy())
+        key = 'block' if dimension == 'block' else f"{dimension}_id"
+
+        table = items.pivot_table(
+            index=key, columns='bucket', values='amount', aggfunc='sum', fill_value=0.0, observed=False
+        ).reindex(columns=list(AGING_BUCKETS), fill_value=0.0)
+        table.columns = list(AGING_BUCKETS)
+        table['Total'] = table.sum(axis=1)
+
+        labels = {'resident': self.residents, 'address': self.addresses, 'charge': self.charges}.get(dimension)
+        if labels is not None:
+            table = labels.reindex(table.index).join(table)
+        return table.sort_values('Total', ascending=False)
+
+    def to_csv(self, file_path, dimension='resident'):
+        self.by(dimension).to_csv(file_path)
+
+class AgingService:
+    def __init__(self, db_session=None):
+        self.session = db_session or session
+
+    def build_report(self, as_of=None):
+        """Load every unpaid record in one query and bucket it with NumPy."""
+        # Imported here so the dashboard, which only needs bucket_totals, starts without pandas
+        import numpy as np
+        import pandas as pd
+
+        as_of = as_of or datetime.datetime.now()
+        connection = self.session.connection()
+
+        # Due dates come back as epoch days so every column is numeric and no
+        # per-row datetime parsing happens in Python
+        if connection.dialect.name == "sqlite":
+            due_days = func.julianday(FinancialRecord.due_date) - _UNIX_EPOCH_JULIAN_DAY
+        else:
+            due_days = extract('epoch', FinancialRecord.due_date) / 86400.0
+
+        rows = _fetch_tuples(connection, select(
+            FinancialRecord.resident_id,
+            FinancialRecord.address_id,
+            FinancialRecord.charge_id,
+            FinancialRecord.amount,
+            due_days
+        ).where(FinancialRecord.is_paid == False))
+
+        values = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.float64, count=len(rows) * 5)
+        values = values.reshape(-1, 5)
+        # Age in whole calendar days, so a record due any time today is Current
+        days_overdue = (_as_of_date(as_of) - _UNIX_EPOCH).days - np.floor(values[:, 4]).astype(np.int64)
+
+        items = pd.DataFrame({
+            'resident_id': values[:, 0].astype(np.int64),
+            'address_id': values[:, 1].astype(np.int64),
+            'charge_id': values[:, 2].astype(np.int64),
+            'amount': values[:, 3],
+            'days_overdue': days_overdue,
+            'bucket': pd.Categorical.from_codes(
+                np.searchsorted(AGING_BOUNDARIES, days_overdue, side='left'), categories=AGING_BUCKETS
+            )
+        })
+
+        return AgingReport(as_of, items, *self._load_labels(connection))
+
+    def bucket_totals(self, as_of=None):
+        """Return ``{bucket: amount}`` aggregated by the database.
+
+        Same buckets as ``build_report``, for callers such as the dashboard that
+        need only the totals and not the per-record detail.
+        """
+        as_of = as_of or datetime.datetime.now()
+        # Records due on or after midnight ``days`` before as_of are at most ``days`` old
+        midnight = datetime.datetime.combine(_as_of_date(as_of), datetime.time())
+        bucket = case(
+            *[(FinancialRecord.due_date >= midnight - datetime.timedelta(days=days), index)
+              for index, days in enumerate(AGING_BOUNDARIES)],
+            else_=len(AGING_BOUNDARIES)
+        )
+        rows = self.session.execute(
+            select(bucket, func.sum(FinancialRecord.amount)).where(
+                FinancialRecord.is_paid == False
+            ).group_by(bucket)
+        )
+        totals = dict.fromkeys(AGING_BUCKETS, 0.0)
+        for index, amount in rows:
+            totals[AGING_BUCKETS[index]] = amount or 0.0
+        return totals
+
+    def _load_labels(self, connection):
+        import pandas as pd
+
+        residents = pd.DataFrame(
+            connection.execute(select(Resident.id, Resident.name)).all(), columns=['resident_id', 'name']
+        ).set_index('resident_id')
+
+        addresses = pd.DataFrame(
+            [(address_id, number, block.value) for address_id, number, block in
+             connection.execute(select(Address.id, Address.number, Address.block))],
+            columns=['address_id', 'number', 'block']
+        ).set_index('address_id')
+
+        charges = pd.DataFrame(
+            connection.execute(select(Charge.id, Charge.name)).all(), columns=['charge_id', 'charge']
+        ).set_index('charge_id')
+
+        return residents, addresses, charges
+
+def _as_of_date(as_of):
+    return as_of.date() if isinstance(as_of, datetime.datetime) else as_of
+
+def _fetch_tuples(connection, statement):
+    """Run a Core select on ``connection`` and return the DBAPI rows as plain tuples.
+
+    Skips building a Row per result row, which costs as much as the fetch
+    itself for the aging scan. Only for statements whose columns need no
+    result processing (numbers, raw strings).
+    """
+    result = connection.execute(statement)
+    try:
+        return result.cursor.fetchall()
+    finally:
+        result.close()
@@ -0,0 +1,79 @@
+import datetime
+from sqlalchemy import and_, exists, false, literal, select
+from auth.permissions import require_permission
+from database.connection import commit
+from database.models import (Charge, ChargeType, FinancialRecord, Resident,
+                             address_resident_association, session)
+
+class BillingService:
+    """Turns active monthly charges into financial records for a billing period.
+
+    A run inserts one due per active resident, allotted address and active
+    monthly charge with a single INSERT ... SELECT. Pairs that already have a
+    record for the charge in the period are skipped, so running the same
+    period twice inserts nothing the second time.
+    """
+
+    def __init__(self, db_session=None):
+        self.session = db_session or session
+
+    @require_permission('financial_management', 'can_add')
+    def run_monthly_billing(self, period, due_day=1):
+        """Bill the month containing ``period`` and return the number of dues created."""
+        period_start, period_end = month_bounds(period)
+        due_date = period_start.replace(day=due_day)
+
+        allotment = address_resident_association.alias('allotment')
+        existing = FinancialRecord.__table__.alias('existing')
+
+        already_billed = exists().where(and_(
+            existing.c.resident_id == allotment.c.resident_id,
+            existing.c.address_id == allotment.c.address_id,
+            existing.c.charge_id == Charge.id,
+            existing.c.due_date >= period_start,
+            existing.c.due_date < period_end
+        ))
+
+        dues = select(
+            allotment.c.resident_id,
+            allotment.c.address_id,
+            Charge.id,
+            Charge.amount,
+            literal(due_date, FinancialRecord.due_date.type),
+            false(),
+            literal(f"Monthly billing {period_start:%Y-%m}")
+        ).distinct().join(
+            Resident.__table__, Resident.id == allotment.c.resident_id
+        ).join(
+            Charge.__table__, and_(Charge.is_active == True, Charge.charge_type == ChargeType.MONTHLY)
+        ).where(
+            Resident.is_active == True,
+            ~already_billed
+        )
+
+        statement = FinancialRecord.__table__.insert().from_select(
+            ['resident_id', 'address_id', 'charge_id', 'amount', 'due_date', 'is_paid', 'notes'],
+            dues
+        )
+
+        try:
+            result = self.session.execute(statement)
+        except Exception:
+            self.session.rollback()
+            raise
+        commit(self.session)
+        return result.rowcount
+
+def month_bounds(period):
+    """Return (first day of the month, first day of the next month) as datetimes."""
+    if isinstance(period, str):
+        period = datetime.datetime.strptime(period, "%Y-%m")
+    start = datetime.datetime(period.year, period.month, 1)
+    end = datetime.datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+if __name__ == "__main__":
+    import sys
+    billing_period = sys.argv[1] if len(sys.argv) > 1 else datetime.date.today().strftime("%Y-%m")
+    created = BillingService().run_monthly_billing(billing_period)
+    print(f"Created {created} dues for {billing_period}")
@@ -0,0 +1,111 @@
+import time
+from sqlalchemy import event
+from config import DASHBOARD_CACHE_TTL
+from database.connection import Session
+from database.counters import read_breakdown, read_counters
+from database.models import (Address, Resident, FinancialRecord, Complaint, ComplaintStatus,
+                             Category, Block, session)
+from services.aging_service import AgingService
+
+# Models whose writes change what the dashboard shows
+DASHBOARD_MODELS = (Address, Resident, FinancialRecord, Complaint)
+DASHBOARD_TABLES = frozenset(model.__table__ for model in DASHBOARD_MODELS)
+
+class DashboardService:
+    """Builds the dashboard snapshot from the summary counters and caches it.
+
+    The cache is shared by every instance and is dropped when a session that
+    wrote to one of the dashboard tables commits or rolls back. A snapshot
+    whose build overlapped such a drop is returned but not cached.
+    """
+
+    _snapshot = None
+    _expires_at = 0.0
+    _generation = 0
+
+    def __init__(self, db_session=None, ttl=DASHBOARD_CACHE_TTL):
+        self.session = db_session or session
+        self.ttl = ttl
+
+    @classmethod
+    def invalidate(cls):
+        cls._generation += 1
+        cls._snapshot = None
+        cls._expires_at = 0.0
+
+    def get_snapshot(self, force=False):
+        """Return the cached snapshot, rebuilding it when stale or forced."""
+        now = time.monotonic()
+        snapshot = DashboardService._snapshot
+        if force or snapshot is None or now >= DashboardService._expires_at:
+            generation = DashboardService._generation
+            snapshot = self.build_snapshot()
+            if generation == DashboardService._generation:
+                DashboardService._snapshot = snapshot
+                DashboardService._expires_at = now + self.ttl
+        return snapshot
+
+    def build_snapshot(self, recent_limit=5):
+        snapshot = self._load_counters()
+        snapshot['dues_by_age'] = AgingService(self.session).bucket_totals()
+        snapshot['pending_dues'] = sum(snapshot['dues_by_age'].values())
+        snapshot['recent_complaints'] = self._load_recent_complaints(recent_limit)
+        snapshot['recent_financial_records'] = self._load_recent_financial_records(recent_limit)
+        return snapshot
+
+    def _load_counters(self):
+        # Cards and distributions come from the maintained counters in one small read
+        counters = read_counters(self.session)
+        return {
+            'total_addresses': counters.get('addresses.total', 0),
+            'total_residents': counters.get('residents.active', 0),
+            'pending_complaints': sum(
+                counters.get(f"complaints.status.{status.name}", 0)
+                for status in (ComplaintStatus.PENDING, ComplaintStatus.IN_PROGRESS)
+            ),
+            'addresses_by_category': read_breakdown(self.session, 'addresses.category.', Category, counters),
+            'addresses_by_block': read_breakdown(self.session, 'addresses.block.', Block, counters),
+        }
+
+    def _load_recent_complaints(self, limit):
+        rows = self.session.query(
+            Complaint.title, Complaint.status, Complaint.description
+        ).order_by(Complaint.created_at.desc()).limit(limit)
+        return [
+            {'title': title, 'status': status.value, 'description': description}
+            for title, status, description in rows
+        ]
+
+    def _load_recent_financial_records(self, limit):
+        rows = self.session.query(
+            Resident.name, FinancialRecord.amount, FinancialRecord.due_date, FinancialRecord.is_paid
+        ).outerjoin(
+            Resident, FinancialRecord.resident_id == Resident.id
+        ).order_by(FinancialRecord.due_date.desc()).limit(limit)
+        return [
+            {'resident_name': name, 'amount': amount, 'due_date': due_date, 'is_paid': is_paid}
+            for name, amount, due_date, is_paid in rows
+        ]
+
+# Writes only mark the session; the cache is dropped once they are committed
+# or rolled back, so nothing uncommitted can be cached in between
+
+@event.listens_for(Session, 'after_flush')
+def _mark_after_flush(flush_session, flush_context):
+    for instance in (*flush_session.new, *flush_session.dirty, *flush_session.deleted):
+        if isinstance(instance, DASHBOARD_MODELS):
+            flush_session.info['dashboard_stale'] = True
+            return
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_after_bulk_write(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    if getattr(orm_execute_state.statement, 'table', None) in DASHBOARD_TABLES:
+        orm_execute_state.session.info['dashboard_stale'] = True
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _invalidate_after_transaction(ended_session):
+    if ended_session.info.pop('dashboard_stale', False):
+        DashboardService.invalidate()
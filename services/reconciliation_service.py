@@ -0,0 +1,275 @@
+import collections
+import csv
+import datetime
+import functools
+import re
+import time
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import bindparam, select, update
+from auth.permissions import require_permission
+from database.connection import commit
+from database.models import FinancialRecord, session
+
+BANK_COLUMNS = ['date', 'amount', 'reference']
+
+# Payers quote the record they are paying as FR-<id>, e.g. "Rent FR-10452"
+REFERENCE_PATTERN = re.compile(r'\bFR-?(\d+)\b', re.IGNORECASE)
+
+class ReconciliationResult:
+    """Totals for one bank file."""
+
+    def __init__(self):
+        self.lines_read = 0
+        self.matched_by_reference = 0
+        self.matched_by_resident = 0
+        self.unmatched = 0
+        self.posted = 0
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def matched(self):
+        return self.matched_by_reference + self.matched_by_resident
+
+class UnpaidIndex:
+    """Hash indexes over the unpaid records, consumed as lines are matched.
+
+    ``by_id`` maps a record id to its ``(resident_id, cents)`` and
+    ``by_resident`` maps ``(resident_id, cents)`` to the record ids oldest due
+    first. A record matched one way is only marked taken, so the other index
+    skips it without a search.
+    """
+
+    def __init__(self, rows):
+        self.by_id = {}
+        self.by_resident = collections.defaultdict(collections.deque)
+        self.taken = set()
+        for record_id, resident_id, amount in rows:
+            cents = _cents(amount)
+            self.by_id[record_id] = (resident_id, cents)
+            self.by_resident[(resident_id, cents)].append(record_id)
+
+    def take_reference(self, record_id, cents, resident_id=None):
+        entry = self.by_id.get(record_id)
+        if entry is None or record_id in self.taken or entry[1] != cents:
+            return None
+        if resident_id is not None and entry[0] != resident_id:
+            return None
+        self.taken.add(record_id)
+        return record_id
+
+    def take_oldest(self, resident_id, cents):
+        candidates = self.by_resident.get((resident_id, cents))
+        while candidates:
+            record_id = candidates.popleft()
+            if record_id not in self.taken:
+                self.taken.add(record_id)
+                return record_id
+        return None
+
+class ReconciliationService:
+    """Posts the credits of a bank statement file against unpaid dues.
+
+    Each line pays exactly one record: the one its reference names if the
+    amount (and resident, when given) agrees, otherwise the resident's oldest
+    unpaid record of the same amount.
+    """
+
+    def __init__(self, db_session=None):
+        self.session = db_session or session
+
+    @require_permission('financial_management', 'can_edit')
+    def reconcile(self, bank_file, report_path, date_format="%Y-%m-%d", progress_callback=None,
+                  progress_every=10000):
+        """Match ``bank_file`` against the unpaid records and post the matches.
+
+        The file needs ``date``, ``amount`` and ``reference`` columns and may
+        have a ``resident_id`` column. It is read one line at a time and lines
+        that match nothing are written to ``report_path`` as they are found,
+        with the line number and reason. All matches are posted by a single
+        executemany UPDATE in one transaction, so a failure posts nothing.
+        Matches whose record was paid by someone else in the meantime are
+        reported and counted as unmatched.
+        """
+        result = ReconciliationResult()
+        index = self.load_unpaid_index()
+        payments = []
+        # (line number, matched_by) of each payment, to report it if it cannot be posted
+        matched_lines = []
+        # Statement files repeat a handful of dates, so each is parsed once
+        parse_date = functools.lru_cache(maxsize=4096)(
+            lambda text: datetime.datetime.strptime(text, date_format)
+        )
+
+        with open(bank_file, newline='', encoding='utf-8-sig') as source, \
+                open(report_path, 'w', newline='', encoding='utf-8') as report:
+            reader = csv.DictReader(source, skipinitialspace=True)
+            missing = [column for column in BANK_COLUMNS if column not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+            writer = csv.writer(report)
+            writer.writerow(["line", *reader.fieldnames, "reason"])
+
+            for line in reader:
+                result.lines_read += 1
+                try:
+                    paid_date, cents, resident_id, reference_id = _parse_line(line, parse_date)
+                    record_id, matched_by = self.match_line(index, cents, resident_id, reference_id)
+                except ValueError as e:
+                    result.unmatched += 1
+                    writer.writerow([reader.line_num, *[line.get(column) for column in reader.fieldnames], str(e)])
+                else:
+                    payments.append({'record_id': record_id, 'paid_on': paid_date})
+                    matched_lines.append((reader.line_num, matched_by))
+                    if matched_by == 'reference':
+                        result.matched_by_reference += 1
+                    else:
+                        result.matched_by_resident += 1
+
+                if progress_callback and result.lines_read % progress_every == 0:
+                    result.elapsed = time.perf_counter() - result.started_at
+                    progress_callback(result)
+
+            already_paid = self.post_payments(payments)
+            conflicts = {}
+            for payment, (line_num, matched_by) in zip(payments, matched_lines):
+                if payment['record_id'] in already_paid:
+                    conflicts[line_num] = matched_by
+            if conflicts:
+                # Rare, so those lines are read again rather than kept for every match
+                source.seek(0)
+                reader = csv.DictReader(source, skipinitialspace=True)
+                for line in reader:
+                    matched_by = conflicts.get(reader.line_num)
+                    if matched_by is None:
+                        continue
+                    writer.writerow([reader.line_num, *[line.get(column) for column in reader.fieldnames],
+                                     "record was paid while the file was being matched"])
+                    result.unmatched += 1
+                    if matched_by == 'reference':
+                        result.matched_by_reference -= 1
+                    else:
+                        result.matched_by_resident -= 1
+            result.posted = len(payments) - len(already_paid)
+
+        result.elapsed = time.perf_counter() - result.started_at
+        if progress_callback:
+            progress_callback(result)
+        return result
+
+    def load_unpaid_index(self):
+        # Plain rows straight off the connection; there is nothing for the ORM to build
+        connection = self.session.connection().execution_options(stream_results=True)
+        rows = connection.execute(
+            select(FinancialRecord.id, FinancialRecord.resident_id, FinancialRecord.amount)
+            .where(FinancialRecord.is_paid == False)
+            .order_by(FinancialRecord.due_date, FinancialRecord.id)
+        ).yield_per(10000)
+        return UnpaidIndex(rows)
+
+    def match_line(self, index, cents, resident_id=None, reference_id=None):
+        """Take the record a line pays from ``index`` and say how it matched.
+
+        Raises ValueError with the reason when nothing matches.
+        """
+        if reference_id is not None:
+            record_id = index.take_reference(reference_id, cents, resident_id)
+            if record_id is not None:
+                return record_id, 'reference'
+
+        if resident_id is not None:
+            record_id = index.take_oldest(resident_id, cents)
+            if record_id is not None:
+                return record_id, 'resident'
+
+        if reference_id is not None:
+            raise ValueError("referenced record is not unpaid or the amount differs")
+        if resident_id is None:
+            raise ValueError("no record reference or resident")
+        raise ValueError("no unpaid record of this amount")
+
+    def post_payments(self, payments):
+        """Mark the matched records paid.
+
+        Returns the ids of the records that were already paid when posting
+        started; those payments are not posted. Raises RuntimeError, posting
+        nothing, if a record is paid between that check and the update.
+        """
+        if not payments:
+            return set()
+
+        table = FinancialRecord.__table__
+        statement = update(table).where(
+            table.c.id == bindparam('record_id'),
+            table.c.is_paid == False
+        ).values(is_paid=True, paid_date=bindparam('paid_on'))
+
+        try:
+            already_paid = self._paid_since_loaded([payment['record_id'] for payment in payments])
+            pending = [payment for payment in payments if payment['record_id'] not in already_paid]
+            if pending:
+                result = self.session.execute(statement, pending)
+                if 0 <= result.rowcount < len(pending):
+                    raise RuntimeError("Dues were paid while the bank file was being posted; run it again.")
+        except Exception:
+            self.session.rollback()
+            raise
+        commit(self.session)
+        return already_paid
+
+    def _paid_since_loaded(self, record_ids, chunk_size=900):
+        # Locked where the database supports it, so the update below sees the same rows
+        table = FinancialRecord.__table__
+        paid = set()
+        for start in range(0, len(record_ids), chunk_size):
+            paid.update(self.session.execute(
+                select(table.c.id).where(table.c.id.in_(record_ids[start:start + chunk_size]), table.c.is_paid == True)
+                .with_for_update()
+            ).scalars())
+        return paid
+
+def _parse_line(line, parse_date):
+    """Return ``(paid_date, cents, resident_id, reference_id)``, raising ValueError on a bad line."""
+    try:
+        paid_date = parse_date((line['date'] or '').strip())
+    except ValueError:
+        raise ValueError("invalid date") from None
+
+    try:
+        amount = Decimal((line['amount'] or '').strip().replace(',', ''))
+    except InvalidOperation:
+        raise ValueError("invalid amount") from None
+    # Decimal accepts "NaN" and "Infinity", which cannot be compared or converted to cents
+    if not amount.is_finite():
+        raise ValueError("invalid amount")
+    if not amount > 0:
+        raise ValueError("not a credit")
+
+    resident_id = (line.get('resident_id') or '').strip()
+    if resident_id and not resident_id.isdigit():
+        raise ValueError("invalid resident_id")
+
+    reference = REFERENCE_PATTERN.search(line['reference'] or '')
+    return (paid_date, _cents(amount), int(resident_id) if resident_id else None,
+            int(reference.group(1)) if reference else None)
+
+def _cents(amount):
+    return int(round(amount * 100))
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Post a bank statement CSV against unpaid dues.")
+    parser.add_argument("bank_file")
+    parser.add_argument("report", help="CSV file for the unmatched lines")
+    parser.add_argument("--date-format", default="%Y-%m-%d")
+    args = parser.parse_args()
+
+    result = ReconciliationService().reconcile(args.bank_file, args.report, args.date_format)
+    print(f"Read {result.lines_read} lines in {result.elapsed:.1f}s: posted {result.posted} "
+          f"({result.matched_by_reference} by reference, {result.matched_by_resident} by resident), "
+          f"{result.unmatched} unmatched written to {args.report}.")
+
+if __name__ == "__main__":
+    main()
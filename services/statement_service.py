@@ -0,0 +1,230 @@
+import csv
+import datetime
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from sqlalchemy import Boolean, and_, case, func, literal, select, union_all
+from database.models import Address, Charge, FinancialRecord, Resident, session
+from services.billing_service import month_bounds
+
+# Ledgers are kept per resident or per address
+OWNER_COLUMNS = {'resident': 'resident_id', 'address': 'address_id'}
+
+# Within one day charges come before the payments against them
+CHARGE, PAYMENT = 0, 1
+
+class Statement:
+    """One owner's ledger for a period.
+
+    ``entries`` are ``(date, record_id, charge, debit, credit, balance)`` tuples
+    in ledger order. ``paid`` and ``unpaid`` split the charges due in the
+    period by whether they have been paid.
+    """
+
+    def __init__(self, owner, owner_id, start, end, opening, charges, payments, paid, unpaid, entries=None):
+        self.owner = owner
+        self.owner_id = owner_id
+        self.start = start
+        self.end = end
+        self.opening = opening
+        self.charges = charges
+        self.payments = payments
+        self.paid = paid
+        self.unpaid = unpaid
+        self.entries = entries or []
+
+    @property
+    def closing(self):
+        return self.opening + self.charges - self.payments
+
+    def to_csv(self, file_path):
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Record", "Description", "Debit", "Credit", "Balance"])
+            writer.writerow([self.start.date(), "", "Opening balance", "", "", _money(self.opening)])
+            for date, record_id, charge, debit, credit, balance in self.entries:
+                writer.writerow([date.date(), record_id, charge, _money(debit) if debit else "",
+                                 _money(credit) if credit else "", _money(balance)])
+            writer.writerow([(self.end - datetime.timedelta(days=1)).date(), "", "Closing balance", _money(self.charges),
+                             _money(self.payments), _money(self.closing)])
+            writer.writerow([])
+            writer.writerow(["Charges due this period", "", "Paid", _money(self.paid), "Unpaid", _money(self.unpaid)])
+
+class StatementService:
+    def __init__(self, db_session=None):
+        self.session = db_session or session
+
+    def build_statement(self, period, resident_id=None, address_id=None):
+        """Return the ``Statement`` of one resident or address for the month containing ``period``."""
+        owner, owner_id = ('resident', resident_id) if resident_id is not None else ('address', address_id)
+        statements = list(self.iter_statements(period, owner, [owner_id]))
+        if statements:
+            return statements[0]
+        start, end = month_bounds(period)
+        return Statement(owner, owner_id, start, end, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    def iter_statements(self, period, owner='resident', owner_ids=None, chunk_size=1000):
+        """Yield a ``Statement`` per owner with any ledger activity up to the end of the period.
+
+        Balances come from one grouped query and the entries from one streamed
+        window query ordered by owner, so memory holds one owner's entries at a
+        time however many owners are covered.
+        """
+        start, end = month_bounds(period)
+        summaries = self.summaries(start, end, owner, owner_ids)
+        entries = self.iter_ledger(start, end, owner, owner_ids, chunk_size)
+
+        # Both are ordered by owner id; owners with no entries in the period still get a statement
+        grouped = itertools.groupby(entries, key=lambda row: row[0])
+        owner_entries = next(grouped, None)
+        for owner_id, opening, charges, payments, paid, unpaid in summaries:
+            rows = []
+            if owner_entries is not None and owner_entries[0] == owner_id:
+                rows = [row[1:] for row in owner_entries[1]]
+                owner_entries = next(grouped, None)
+            yield Statement(owner, owner_id, start, end, opening, charges, payments, paid, unpaid, rows)
+
+    def summaries(self, start, end, owner='resident', owner_ids=None):
+        """Return ``(owner_id, opening, charges, payments, paid, unpaid)`` per owner, in owner order."""
+        entries = _ledger_entries(end, owner, owner_ids)
+        in_period = entries.c.entry_date >= start
+        period_charge = and_(in_period, entries.c.kind == CHARGE)
+
+        rows = self.session.execute(select(
+            entries.c.owner_id,
+            func.sum(case((~in_period, entries.c.debit - entries.c.credit), else_=0.0)),
+            func.sum(case((in_period, entries.c.debit), else_=0.0)),
+            func.sum(case((in_period, entries.c.credit), else_=0.0)),
+            func.sum(case((and_(period_charge, entries.c.is_paid == True), entries.c.debit), else_=0.0)),
+            func.sum(case((and_(period_charge, entries.c.is_paid == False), entries.c.debit), else_=0.0))
+        ).group_by(entries.c.owner_id).order_by(entries.c.owner_id))
+        return [tuple(row) for row in rows]
+
+    def iter_ledger(self, start, end, owner='resident', owner_ids=None, chunk_size=1000):
+        """Stream ``(owner_id, date, record_id, charge, debit, credit, balance)`` rows for the period.
+
+        The running balance is a window sum over the owner's whole history up
+        to ``end``, so the first row of the period already includes the
+        opening balance.
+        """
+        entries = _ledger_entries(end, owner, owner_ids)
+        ordering = (entries.c.entry_date, entries.c.kind, entries.c.record_id)
+        ledger = select(
+            entries,
+            func.sum(entries.c.debit - entries.c.credit).over(
+                partition_by=entries.c.owner_id, order_by=ordering, rows=(None, 0)
+            ).label('balance')
+        ).subquery('ledger')
+
+        statement = select(
+            ledger.c.owner_id,
+            ledger.c.entry_date,
+            ledger.c.record_id,
+            case((ledger.c.kind == PAYMENT, "Payment: " + func.coalesce(Charge.name, "")),
+                 else_=func.coalesce(Charge.name, "")),
+            ledger.c.debit,
+            ledger.c.credit,
+            ledger.c.balance
+        ).outerjoin(
+            Charge, Charge.id == ledger.c.charge_id
+        ).where(
+            ledger.c.entry_date >= start
+        ).order_by(ledger.c.owner_id, ledger.c.entry_date, ledger.c.kind, ledger.c.record_id)
+
+        connection = self.session.connection().execution_options(stream_results=True)
+        for row in connection.execute(statement).yield_per(chunk_size):
+            yield tuple(row)
+
+def _ledger_entries(end, owner, owner_ids):
+    """Charges on their due date and payments on their paid date, before ``end``."""
+    owner_column = getattr(FinancialRecord, OWNER_COLUMNS[owner])
+
+    def scoped(query, date_column):
+        query = query.where(date_column < end)
+        if owner_ids is not None:
+            query = query.where(owner_column.in_(owner_ids))
+        return query
+
+    charges = scoped(select(
+        owner_column.label('owner_id'),
+        FinancialRecord.id.label('record_id'),
+        FinancialRecord.charge_id.label('charge_id'),
+        FinancialRecord.due_date.label('entry_date'),
+        literal(CHARGE).label('kind'),
+        FinancialRecord.amount.label('debit'),
+        literal(0.0).label('credit'),
+        FinancialRecord.is_paid.label('is_paid')
+    ), FinancialRecord.due_date)
+
+    payments = scoped(select(
+        owner_column,
+        FinancialRecord.id,
+        FinancialRecord.charge_id,
+        FinancialRecord.paid_date,
+        literal(PAYMENT),
+        literal(0.0),
+        FinancialRecord.amount,
+        literal(True, Boolean)
+    ).where(FinancialRecord.is_paid == True, FinancialRecord.paid_date.isnot(None)), FinancialRecord.paid_date)
+
+    return union_all(charges, payments).subquery('entries')
+
+def _money(value):
+    return f"{value:.2f}"
+
+# Month-end batch
+
+def generate_statements(period, output_dir, owner='resident', workers=None, chunk_size=500, db_session=None):
+    """Write one CSV statement for the month of ``period`` per active resident
+    (or address) with any ledger activity up to the end of that month.
+
+    Owners are split into chunks of ``chunk_size`` ids and each chunk is
+    rendered in a worker process with its own database connections. Returns
+    the number of statements written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if owner == 'resident':
+        id_query = select(Resident.id).where(Resident.is_active == True).order_by(Resident.id)
+    else:
+        id_query = select(Address.id).order_by(Address.id)
+    owner_ids = list((db_session or session).execute(id_query).scalars())
+    chunks = [owner_ids[index:index + chunk_size] for index in range(0, len(owner_ids), chunk_size)]
+    if not chunks:
+        return 0
+
+    write_chunk = partial(_write_statements, period=period, output_dir=output_dir, owner=owner)
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    # Spawned rather than forked: this runs from the UI's worker threads, and a
+    # forked child can inherit a lock another thread was holding
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return sum(executor.map(write_chunk, chunks))
+
+def _write_statements(owner_ids, period, output_dir, owner):
+    from database.connection import session_scope
+
+    written = 0
+    with session_scope() as db_session:
+        for statement in StatementService(db_session).iter_statements(period, owner, owner_ids):
+            file_name = f"{owner}_{statement.owner_id}_{period:%Y-%m}.csv"
+            statement.to_csv(os.path.join(output_dir, file_name))
+            written += 1
+    return written
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write month-end statements as CSV files.")
+    parser.add_argument("period", help="month as YYYY-MM")
+    parser.add_argument("output_dir")
+    parser.add_argument("--owner", choices=sorted(OWNER_COLUMNS), default='resident')
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    period = datetime.datetime.strptime(args.period, "%Y-%m")
+    written = generate_statements(period, args.output_dir, args.owner, args.workers)
+    print(f"Wrote {written} statements to {args.output_dir}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+
+# The engine is created from DATABASE_URL when database.connection is first
+# imported, so the test database has to be chosen before anything else loads
+_workdir = tempfile.mkdtemp(prefix="sms-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'estate.db')}"
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture(scope="session")
+def estate():
+    """A small deterministic estate, built once per test run."""
+    from database.connection import engine
+    from database.migrations import create_missing_indexes
+    from database.models import Base
+    from database.search import ensure_resident_search_index
+    from utils.data_generator import generate_estate
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        create_missing_indexes(connection)
+        ensure_resident_search_index(connection)
+        counts = generate_estate(connection, addresses=60, months=3, seed=7)
+    return counts
+
+@pytest.fixture
+def db_session(estate):
+    """A session with its connection already checked out, rolled back afterwards."""
+    from database.connection import session_factory
+
+    db_session = session_factory()
+    db_session.connection()
+    yield db_session
+    db_session.rollback()
+    db_session.close()
+
+@pytest.fixture
+def workdir():
+    return _workdir
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The QApplication widgets need, on the offscreen platform."""
+    from PyQt5.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
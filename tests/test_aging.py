@@ -0,0 +1,45 @@
+import datetime
+import pytest
+from sqlalchemy import select, update
+from database.models import FinancialRecord
+from services.aging_service import AgingService
+
+AS_OF = datetime.datetime(2026, 5, 15, 14, 0)
+
+# Due date, days overdue on AS_OF and the bucket it ages into
+DUES = [
+    (datetime.datetime(2026, 5, 20), -5, 'Current'),
+    (datetime.datetime(2026, 5, 15, 18, 0), 0, 'Current'),
+    (datetime.datetime(2026, 5, 15, 9, 0), 0, 'Current'),
+    (datetime.datetime(2026, 5, 14, 23, 0), 1, '1-30'),
+    (datetime.datetime(2026, 4, 15, 10, 0), 30, '1-30'),
+    (datetime.datetime(2026, 4, 14, 20, 0), 31, '31-60'),
+    (datetime.datetime(2026, 2, 14), 90, '61-90'),
+    (datetime.datetime(2026, 2, 13, 23, 59), 91, '90+'),
+]
+
+@pytest.fixture
+def dues(db_session):
+    """Only the DUES records are unpaid, each with a distinct amount."""
+    resident_id, address_id, charge_id = db_session.execute(
+        select(FinancialRecord.resident_id, FinancialRecord.address_id, FinancialRecord.charge_id).limit(1)
+    ).one()
+    db_session.execute(update(FinancialRecord).values(is_paid=True))
+    db_session.add_all([
+        FinancialRecord(resident_id=resident_id, address_id=address_id, charge_id=charge_id,
+                        amount=float(index + 1), due_date=due_date, is_paid=False)
+        for index, (due_date, _, _) in enumerate(DUES)
+    ])
+    db_session.flush()
+    return db_session
+
+def test_report_buckets_on_calendar_days(dues):
+    items = AgingService(dues).build_report(AS_OF).items.sort_values('amount')
+    assert list(items['days_overdue']) == [days for _, days, _ in DUES]
+    assert list(items['bucket']) == [bucket for _, _, bucket in DUES]
+
+def test_report_and_database_totals_agree(dues):
+    service = AgingService(dues)
+    expected = {'Current': 6.0, '1-30': 9.0, '31-60': 6.0, '61-90': 7.0, '90+': 8.0}
+    assert service.build_report(AS_OF).totals() == expected
+    assert service.bucket_totals(AS_OF) == expected
@@ -0,0 +1,66 @@
+import datetime
+import time
+import pytest
+from PyQt5.QtCore import QDate
+from sqlalchemy import delete, func, select
+import ui.financial_management as financial_management
+from database.models import Charge, ChargeType, FinancialRecord, Resident, address_resident_association
+from services.billing_service import BillingService
+
+@pytest.fixture
+def april_2031(db_session):
+    """Removes the dues a test bills for April 2031; billing commits them."""
+    yield "2031-04"
+    db_session.rollback()
+    db_session.execute(delete(FinancialRecord).where(
+        FinancialRecord.due_date >= datetime.datetime(2031, 4, 1),
+        FinancialRecord.due_date < datetime.datetime(2031, 5, 1)
+    ))
+    db_session.commit()
+
+def test_billing_a_month_twice_creates_no_duplicates(db_session, april_2031):
+    allotments = db_session.execute(
+        select(func.count()).select_from(
+            select(address_resident_association.c.resident_id, address_resident_association.c.address_id)
+            .join(Resident, Resident.id == address_resident_association.c.resident_id)
+            .where(Resident.is_active == True).distinct().subquery()
+        )
+    ).scalar()
+    charges = db_session.execute(
+        select(func.count(Charge.id)).where(Charge.is_active == True, Charge.charge_type == ChargeType.MONTHLY)
+    ).scalar()
+    service = BillingService(db_session)
+
+    created = service.run_monthly_billing(april_2031)
+    assert created == allotments * charges > 0
+    assert service.run_monthly_billing(april_2031) == 0
+
+    # Only the missing due is recreated
+    first = db_session.execute(
+        select(FinancialRecord.id).where(FinancialRecord.notes == "Monthly billing 2031-04").limit(1)
+    ).scalar()
+    db_session.execute(delete(FinancialRecord).where(FinancialRecord.id == first))
+    assert service.run_monthly_billing(april_2031) == 1
+
+def test_monthly_billing_runs_off_the_gui_thread(qapp, estate, monkeypatch):
+    messages = []
+    monkeypatch.setattr(financial_management.QMessageBox, 'information',
+                        lambda parent, title, text: messages.append((title, text)))
+    monkeypatch.setattr(financial_management.QMessageBox, 'critical',
+                        lambda parent, title, text: messages.append((title, text)))
+
+    widget = financial_management.FinancialManagementWidget()
+    widget.billing_period.setDate(QDate(2031, 3, 1))
+    widget.runMonthlyBilling()
+    assert not widget.run_billing_btn.isEnabled()
+
+    deadline = time.monotonic() + 30
+    while not messages and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+    assert widget.run_billing_btn.isEnabled()
+    title, text = messages[0]
+    assert title == "Billing Complete" and text.endswith("dues for March 2031.")
+    assert int(text.split()[1]) > 0
+    widget.deleteLater()
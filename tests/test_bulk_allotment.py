@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import delete, func, select
+from controllers.resident_controller import ALLOTTED, RELEASED, ResidentController
+from database.connection import session_scope
+from database.models import Floor, Resident, address_resident_association
+from database.occupancy import reconcile_occupancy
+
+MISSING = 10 ** 9
+
+@pytest.fixture
+def newcomers(estate):
+    """Two committed residents without floors or allotments; the bulk calls commit."""
+    with session_scope() as db_session:
+        residents = [Resident(name="Bulk One"), Resident(name="Bulk Two")]
+        db_session.add_all(residents)
+        db_session.flush()
+        resident_ids = [resident.id for resident in residents]
+    yield resident_ids
+    with session_scope() as db_session:
+        db_session.execute(delete(address_resident_association).where(
+            address_resident_association.c.resident_id.in_(resident_ids)
+        ))
+        for resident in db_session.execute(select(Resident).where(Resident.id.in_(resident_ids))).scalars():
+            db_session.delete(resident)
+
+def _allotments(db_session, resident_ids):
+    return set(db_session.execute(
+        select(address_resident_association.c.resident_id, address_resident_association.c.address_id)
+        .where(address_resident_association.c.resident_id.in_(resident_ids))
+    ).all())
+
+def test_bulk_allot_and_release_report_every_row(db_session, newcomers):
+    first, second = newcomers
+    (floor, address), (other_floor, other_address) = db_session.execute(
+        select(func.min(Floor.id), Floor.address_id).group_by(Floor.address_id).order_by(Floor.address_id).limit(2)
+    ).all()
+    controller = ResidentController(db_session)
+
+    outcomes = controller.bulk_allot_addresses([
+        (first, address, floor),
+        (second, address),
+        (first, address, None),
+        (MISSING, address, None),
+        (second, MISSING, None),
+        (second, other_address, floor),
+        (first, other_address, other_floor),
+    ])
+    assert outcomes == [
+        ALLOTTED,
+        ALLOTTED,
+        "already allotted",
+        "resident not found or inactive",
+        "address not found",
+        "floor does not belong to the address",
+        "resident is given another floor in this batch",
+    ]
+    db_session.expire_all()
+    assert _allotments(db_session, newcomers) == {(first, address), (second, address)}
+    assert db_session.get(Resident, first).floor_id == floor
+    assert reconcile_occupancy(db_session.connection(), repair=False) == {}
+
+    outcomes = controller.bulk_release_addresses([
+        (first, address, floor),
+        (second, address),
+        (first, address),
+        (second, other_address),
+    ])
+    assert outcomes == [RELEASED, RELEASED, "duplicate in batch", "not allotted"]
+    db_session.expire_all()
+    assert _allotments(db_session, newcomers) == set()
+    assert db_session.get(Resident, first).floor_id is None
+    assert reconcile_occupancy(db_session.connection(), repair=False) == {}
+
+def test_empty_batches_do_nothing(db_session):
+    controller = ResidentController(db_session)
+    assert controller.bulk_allot_addresses([]) == []
+    assert controller.bulk_release_addresses([]) == []
@@ -0,0 +1,22 @@
+import subprocess
+import sys
+from services.aging_service import AGING_BUCKETS, AgingService
+from ui.financial_management import AgingChartDialog
+
+def test_charts_module_does_not_import_matplotlib():
+    code = "import sys, ui.charts, ui.financial_management; print('matplotlib' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == "False"
+
+def test_aging_chart_updates_bars_in_place(qapp, db_session):
+    table = AgingService(db_session).build_report().by('block')
+    dialog = AgingChartDialog()
+    dialog.showTable(table, 'block')
+    chart = dialog.chart
+    first = chart.bars[AGING_BUCKETS[-1]][0]
+    assert chart.categories == [str(block) for block in table.index]
+
+    dialog.showTable(table * 2, 'block')
+    assert chart.bars[AGING_BUCKETS[-1]][0] is first
+    assert first.get_height() == table[AGING_BUCKETS[-1]].iloc[0] * 2
+    dialog.deleteLater()
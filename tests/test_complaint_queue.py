@@ -0,0 +1,70 @@
+import datetime
+from sqlalchemy import select
+from config import COMPLAINT_SLA_HOURS
+from controllers.complaint_controller import ComplaintController, sla_cutoff
+from database.models import Address, Block, Category, Complaint, ComplaintStatus, Resident
+
+AS_OF = datetime.datetime(2030, 6, 1, 12, 0)
+SLA = datetime.timedelta(hours=COMPLAINT_SLA_HOURS)
+
+def _add_complaints(db_session):
+    """Complaints on a fresh address; returns ``(address_id, {title: id})``."""
+    address = Address(category=Category.R, number="Q1", row="Q", block=Block.D, total_floors=1)
+    resident_id = db_session.execute(select(Resident.id).order_by(Resident.id).limit(1)).scalar()
+    db_session.add(address)
+    db_session.flush()
+
+    specs = [
+        ("fresh", ComplaintStatus.PENDING, AS_OF - datetime.timedelta(hours=1), None),
+        ("on the cutoff", ComplaintStatus.PENDING, sla_cutoff(AS_OF), None),
+        ("overdue", ComplaintStatus.PENDING, sla_cutoff(AS_OF) - datetime.timedelta(seconds=1), None),
+        ("working", ComplaintStatus.IN_PROGRESS, AS_OF - 2 * SLA, None),
+        ("late fix", ComplaintStatus.RESOLVED, AS_OF - 3 * SLA, AS_OF - SLA),
+        ("quick fix", ComplaintStatus.CLOSED, AS_OF - 3 * SLA, AS_OF - 3 * SLA + datetime.timedelta(hours=2)),
+    ]
+    complaints = {}
+    for title, status, created_at, resolved_at in specs:
+        complaints[title] = Complaint(resident_id=resident_id, address_id=address.id, title=title,
+                                      description="", status=status, created_at=created_at,
+                                      resolved_at=resolved_at)
+    db_session.add_all(complaints.values())
+    db_session.flush()
+    return address.id, {title: complaint.id for title, complaint in complaints.items()}
+
+def test_queue_is_ordered_by_status_then_age(db_session):
+    address_id, ids = _add_complaints(db_session)
+    controller = ComplaintController(db_session)
+
+    titles, token = [], None
+    while True:
+        page = controller.get_complaint_queue(statuses=None, address_id=address_id, as_of=AS_OF,
+                                              page_size=2, token=token, with_total=True)
+        assert page.total == 6
+        titles.extend(row[3] for row in page)
+        if not page.has_more:
+            break
+        token = page.next_token
+
+    # Statuses sort by their stored names; oldest first within a status
+    assert titles == ["quick fix", "working", "overdue", "on the cutoff", "fresh", "late fix"]
+
+    page = controller.get_complaint_queue(address_id=address_id, block='D', as_of=AS_OF)
+    assert [row[3] for row in page] == ["working", "overdue", "on the cutoff", "fresh"]
+
+def test_sla_cutoff_is_exclusive(db_session):
+    controller = ComplaintController(db_session)
+    before = controller.get_sla_breaches(as_of=AS_OF, by='block')
+    address_id, ids = _add_complaints(db_session)
+
+    page = controller.get_complaint_queue(address_id=address_id, overdue_only=True, as_of=AS_OF)
+    assert [row[0] for row in page] == [ids["working"], ids["overdue"]]
+
+    rows = {row[3]: row for row in controller.get_complaint_queue(statuses=None, address_id=address_id, as_of=AS_OF)}
+    assert {title: row[-1] for title, row in rows.items()} == {
+        "fresh": False, "on the cutoff": False, "overdue": True,
+        "working": True, "late fix": True, "quick fix": False,
+    }
+    assert rows["fresh"][-2] == AS_OF - datetime.timedelta(hours=1) + SLA
+
+    after = controller.get_sla_breaches(as_of=AS_OF, by='block')
+    assert after.get(Block.D.value, 0) - before.get(Block.D.value, 0) == 2
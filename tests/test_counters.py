@@ -0,0 +1,67 @@
+from sqlalchemy import delete, insert, select, update
+from database.counters import read_counter, reconcile_counters
+from database.models import Address, Block, Category, Complaint, ComplaintStatus, Resident
+
+def _snapshot(db_session, *names):
+    return {name: read_counter(db_session, name) for name in names}
+
+def _assert_in_step(db_session):
+    assert reconcile_counters(db_session.connection(), repair=False) == {}
+
+def test_orm_writes_keep_counters_in_step(db_session):
+    names = ('addresses.total', 'addresses.category.PB', 'addresses.block.E', 'addresses.block.A',
+             'residents.active', 'complaints.status.PENDING', 'complaints.status.RESOLVED')
+    before = _snapshot(db_session, *names)
+
+    address = Address(category=Category.PB, number="C1", row="C", block=Block.E, total_floors=1)
+    resident = Resident(name="Counter Test")
+    db_session.add_all([address, resident])
+    db_session.flush()
+    complaint = Complaint(resident_id=resident.id, address_id=address.id, title="Leak", description="Roof")
+    db_session.add(complaint)
+    db_session.flush()
+
+    address.block = Block.A
+    complaint.status = ComplaintStatus.RESOLVED
+    db_session.flush()
+    resident.is_active = False
+    db_session.flush()
+
+    after = _snapshot(db_session, *names)
+    assert {name: after[name] - before[name] for name in names} == {
+        'addresses.total': 1, 'addresses.category.PB': 1, 'addresses.block.E': 0, 'addresses.block.A': 1,
+        'residents.active': 0, 'complaints.status.PENDING': 0, 'complaints.status.RESOLVED': 1,
+    }
+    _assert_in_step(db_session)
+
+    db_session.delete(complaint)
+    db_session.delete(address)
+    db_session.flush()
+    assert _snapshot(db_session, *names) == before
+    _assert_in_step(db_session)
+
+def test_bulk_writes_keep_counters_in_step(db_session):
+    before = _snapshot(db_session, 'addresses.total', 'addresses.block.B', 'residents.active')
+
+    db_session.execute(insert(Address), [
+        {'category': Category.R, 'number': f"BW{index}", 'row': "BW", 'block': Block.B, 'total_floors': 2}
+        for index in range(4)
+    ])
+    assert _snapshot(db_session, 'addresses.total', 'addresses.block.B') == {
+        'addresses.total': before['addresses.total'] + 4,
+        'addresses.block.B': before['addresses.block.B'] + 4,
+    }
+
+    db_session.execute(update(Address).where(Address.row == "BW").values(block=Block.C))
+    db_session.execute(delete(Address).where(Address.row == "BW", Address.number == "BW0"))
+    resident_id = db_session.execute(
+        select(Resident.id).where(Resident.is_active == True).order_by(Resident.id).limit(1)
+    ).scalar()
+    db_session.execute(update(Resident).where(Resident.id == resident_id).values(is_active=False))
+
+    assert _snapshot(db_session, 'addresses.total', 'addresses.block.B', 'residents.active') == {
+        'addresses.total': before['addresses.total'] + 3,
+        'addresses.block.B': before['addresses.block.B'],
+        'residents.active': before['residents.active'] - 1,
+    }
+    _assert_in_step(db_session)
@@ -0,0 +1,46 @@
+import math
+import os
+import threading
+import pandas as pd
+import pytest
+from controllers.resident_controller import ResidentController
+from utils.data_export import EXPORT_FORMATS, export_query
+
+READERS = {
+    'csv': pd.read_csv,
+    'xlsx': pd.read_excel,
+    'parquet': pd.read_parquet,
+}
+
+@pytest.mark.parametrize('file_format', sorted(EXPORT_FORMATS))
+def test_every_row_is_written_once(db_session, tmp_path, file_format):
+    query = ResidentController(db_session).get_resident_export_query()
+    expected = query.order_by(None).count()
+    file_path = str(tmp_path / f"residents.{file_format}")
+    progress = []
+
+    result = export_query(query, file_path, chunk_size=7, total=expected,
+                          progress_callback=lambda r: progress.append(r.rows_written))
+
+    assert result.rows_written == expected > 7
+    assert len(progress) == math.ceil(expected / 7) and progress[-1] == expected
+    frame = READERS[file_format](file_path)
+    assert len(frame) == expected
+    assert list(frame.columns) == [column['name'] for column in query.column_descriptions]
+    assert frame.iloc[:, 0].is_unique
+
+def test_cancelled_export_removes_the_partial_file(db_session, tmp_path):
+    query = ResidentController(db_session).get_resident_export_query()
+    file_path = str(tmp_path / "residents.csv")
+    cancel_event = threading.Event()
+
+    result = export_query(query, file_path, chunk_size=5, progress_callback=lambda r: cancel_event.set(),
+                          cancel_event=cancel_event)
+
+    assert result.cancelled and result.rows_written == 5
+    assert not os.path.exists(file_path)
+
+def test_unknown_format_is_rejected(db_session, tmp_path):
+    query = ResidentController(db_session).get_resident_export_query()
+    with pytest.raises(ValueError, match="Unsupported export format: txt"):
+        export_query(query, str(tmp_path / "residents.txt"))
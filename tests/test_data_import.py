@@ -0,0 +1,55 @@
+import pytest
+from database.models import Block, Category
+from utils.data_import import import_addresses_from_csv
+
+class RecordingController:
+    """Collects the chunks an import would write, one list per transaction."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def bulk_add_addresses(self, records):
+        self.chunks.append(records)
+
+def _write_csv(path, lines):
+    path.write_text("\n".join(["category,number,row,block,total_floors"] + lines) + "\n")
+    return str(path)
+
+def test_invalid_rows_are_rejected_with_their_line_numbers(tmp_path):
+    file_path = _write_csv(tmp_path / "addresses.csv", [
+        "R,1,A,A,3",
+        "R,,A,A,3",
+        "X,3,A,B,2",
+        "A,4,B,Z,2",
+        "AS,5,B,C,0",
+        "PB,6,C,D,2.5",
+        "R,7,C,E,4",
+    ])
+    controller = RecordingController()
+    progress = []
+
+    result = import_addresses_from_csv(file_path, controller, chunk_size=3,
+                                       progress_callback=lambda r: progress.append(r.rows_read))
+
+    assert (result.rows_read, result.rows_imported) == (7, 2)
+    assert result.rejects == [
+        (3, 'missing number'),
+        (4, 'invalid category'),
+        (5, 'invalid block'),
+        (6, 'invalid total_floors'),
+        (7, 'invalid total_floors'),
+    ]
+    assert progress == [3, 6, 7]
+    # Chunks without a single valid row are not written at all
+    assert [[record['number'] for record in chunk] for chunk in controller.chunks] == [['1'], ['7']]
+    assert controller.chunks[1][0] == {'category': Category.R, 'number': '7', 'row': 'C',
+                                       'block': Block.E, 'total_floors': 4}
+
+def test_missing_columns_are_reported_before_anything_is_written(tmp_path):
+    file_path = tmp_path / "addresses.csv"
+    file_path.write_text("category,number,row\nR,1,A\n")
+    controller = RecordingController()
+
+    with pytest.raises(ValueError, match="block, total_floors"):
+        import_addresses_from_csv(str(file_path), controller)
+    assert controller.chunks == []
@@ -0,0 +1,39 @@
+from sqlalchemy import delete, insert, select, update
+from database.models import Address, Block, Category, Floor, Resident
+from database.occupancy import reconcile_occupancy
+from utils.query_count import QueryCounter
+
+def _occupancy_statements(counter):
+    return [' '.join(statement.split()) for statement in counter.statements if 'floor_occupancy' in statement]
+
+def _first(db_session, column, *criteria):
+    return db_session.execute(select(column).where(*criteria).order_by(column).limit(1)).scalar()
+
+def test_inserting_addresses_leaves_the_index_alone(db_session):
+    rows = [{'category': Category.R, 'number': f"T{index}", 'row': "T", 'block': Block.A, 'total_floors': 1}
+            for index in range(3)]
+    with QueryCounter() as counter:
+        db_session.execute(insert(Address), rows)
+    assert _occupancy_statements(counter) == []
+
+def test_bulk_writes_refresh_only_affected_floors(db_session):
+    address_id = _first(db_session, Address.id)
+    floor_id = _first(db_session, Floor.id)
+    resident_id = _first(db_session, Resident.id, Resident.floor_id.isnot(None), Resident.is_active == True)
+
+    statements = [
+        insert(Floor).values(address_id=address_id, floor_number=99, is_vacant=True),
+        update(Floor).where(Floor.id == floor_id).values(is_shop=True),
+        update(Resident).where(Resident.id == resident_id).values(floor_id=floor_id),
+        update(Resident).where(Resident.id == resident_id).values(is_active=False),
+        update(Address).where(Address.id == address_id).values(block=Block.C),
+        delete(Resident).where(Resident.id == resident_id),
+    ]
+    for statement in statements:
+        with QueryCounter() as counter:
+            db_session.execute(statement)
+        for sql in _occupancy_statements(counter):
+            # Set-based writes refresh rows by floor id, never the whole index
+            assert sql.startswith('INSERT') or 'WHERE floor_occupancy.floor_id IN' in sql, sql
+
+    assert reconcile_occupancy(db_session.connection(), repair=False) == {}
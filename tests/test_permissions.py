@@ -0,0 +1,67 @@
+import uuid
+import pytest
+from sqlalchemy import event, text, update
+from auth.permissions import PermissionResolver, permission_resolver
+from database.connection import session_scope
+from database.models import FinancialRecord, Permission, User, session
+from utils.query_count import QueryCounter, assert_max_queries
+
+MODULE = 'test_module'
+
+@pytest.fixture
+def granted_user(estate):
+    """A committed user with can_view on MODULE; returns ``(user_id, permission_id)``."""
+    suffix = uuid.uuid4().hex[:8]
+    with session_scope() as db_session:
+        permission = Permission(name=f"view-{suffix}", module=MODULE, can_view=True)
+        user = User(username=f"user-{suffix}", password_hash="x", permissions=[permission])
+        db_session.add(user)
+        db_session.flush()
+        ids = user.id, permission.id
+    permission_resolver.invalidate()
+    yield ids
+    session.remove()
+
+def test_unrelated_statements_keep_the_cache(granted_user, db_session):
+    user_id, _ = granted_user
+    assert permission_resolver.has_permission(user_id, MODULE, 'can_view')
+
+    db_session.execute(text("UPDATE financial_records SET notes = notes WHERE id = -1"))
+    db_session.execute(update(FinancialRecord).where(FinancialRecord.id == -1).values(notes=None))
+    db_session.commit()
+    with assert_max_queries(0):
+        assert permission_resolver.has_permission(user_id, MODULE, 'can_view')
+
+def test_committed_bulk_write_drops_the_cache(granted_user):
+    user_id, permission_id = granted_user
+    assert permission_resolver.has_permission(user_id, MODULE, 'can_view')
+
+    with session_scope() as db_session:
+        db_session.execute(update(Permission).where(Permission.id == permission_id).values(can_view=False))
+    assert not permission_resolver.has_permission(user_id, MODULE, 'can_view')
+
+def test_grants_read_before_a_rollback_are_not_kept(granted_user):
+    user_id, permission_id = granted_user
+
+    # The resolver reads through the thread's session, which sees its own flushed change
+    session.execute(update(Permission).where(Permission.id == permission_id).values(can_view=False))
+    assert not permission_resolver.has_permission(user_id, MODULE, 'can_view')
+    session.rollback()
+    assert permission_resolver.has_permission(user_id, MODULE, 'can_view')
+
+def test_load_overlapping_an_invalidation_is_not_cached(granted_user, db_session):
+    user_id, _ = granted_user
+    resolver = PermissionResolver(db_session)
+
+    def invalidate(orm_execute_state):
+        resolver.invalidate()
+
+    event.listen(db_session, 'do_orm_execute', invalidate)
+    try:
+        assert resolver.has_permission(user_id, MODULE, 'can_view')
+    finally:
+        event.remove(db_session, 'do_orm_execute', invalidate)
+
+    with QueryCounter() as counter:
+        assert resolver.has_permission(user_id, MODULE, 'can_view')
+    assert counter.count == 1
@@ -0,0 +1,51 @@
+from controllers.address_controller import AddressController
+from controllers.complaint_controller import ComplaintController
+from controllers.financial_controller import FinancialController
+from controllers.resident_controller import ResidentController
+from utils.query_count import assert_max_queries
+
+# Rendering a list touches these relationships; with eager loading they cost
+# a fixed number of statements however many rows come back
+
+def test_recent_financial_records_load_residents(db_session):
+    with assert_max_queries(1):
+        records = FinancialController(db_session).get_recent_financial_records(limit=20)
+        names = [record.resident.name for record in records]
+    assert len(names) == 20
+
+def test_recent_complaints_load_resident_and_address(db_session):
+    with assert_max_queries(1):
+        complaints = ComplaintController(db_session).get_recent_complaints(limit=20)
+        labels = [(complaint.resident.name, complaint.address.number) for complaint in complaints]
+    assert len(labels) == 20
+
+def test_all_residents_load_floor_and_addresses(db_session):
+    with assert_max_queries(2):
+        residents = ResidentController(db_session).get_all_residents()
+        allotments = [(resident.floor_id and resident.floor.floor_number, len(resident.addresses))
+                      for resident in residents]
+    assert len(allotments) > 60
+
+def test_resident_by_id_loads_floor_and_addresses(db_session):
+    resident_id = ResidentController(db_session).get_resident_rows(limit=1)[0][0]
+    db_session.expunge_all()
+    with assert_max_queries(2):
+        resident = ResidentController(db_session).get_resident_by_id(resident_id)
+        resident.floor, list(resident.addresses)
+
+def test_addresses_with_floors(db_session):
+    with assert_max_queries(2):
+        addresses = AddressController(db_session).get_all_addresses(with_floors=True)
+        floors = sum(len(address.floors) for address in addresses)
+    assert len(addresses) == 60 and floors >= 60
+
+def test_address_by_id_loads_floors(db_session):
+    with assert_max_queries(2):
+        address = AddressController(db_session).get_address_by_id(7)
+        floor_numbers = [floor.floor_number for floor in address.floors]
+    assert floor_numbers
+
+def test_allotment_rows_are_one_query(db_session):
+    with assert_max_queries(1):
+        rows = ResidentController(db_session).get_allotment_rows(block='C')
+    assert rows and all(row[3] == 'C' for row in rows)
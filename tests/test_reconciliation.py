@@ -0,0 +1,46 @@
+import csv
+import datetime
+import pytest
+from sqlalchemy import select, update
+from database.connection import session_scope
+from database.models import FinancialRecord
+from services.reconciliation_service import ReconciliationService, _parse_line
+
+def _parse(amount):
+    line = {'date': '2026-02-03', 'amount': amount, 'reference': 'FR-1'}
+    return _parse_line(line, lambda text: datetime.datetime.strptime(text, "%Y-%m-%d"))
+
+@pytest.mark.parametrize('amount', ['NaN', 'sNaN', 'Infinity', '-Infinity', 'abc'])
+def test_non_finite_amounts_are_invalid(amount):
+    with pytest.raises(ValueError, match="invalid amount"):
+        _parse(amount)
+
+def test_record_paid_meanwhile_is_reported_not_counted(db_session, tmp_path):
+    first, second = db_session.execute(
+        select(FinancialRecord.id, FinancialRecord.amount)
+        .where(FinancialRecord.is_paid == False).order_by(FinancialRecord.id).limit(2)
+    ).all()
+    bank_file, report_path = tmp_path / "bank.csv", tmp_path / "unmatched.csv"
+    with open(bank_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['date', 'amount', 'reference'])
+        for record_id, amount in (first, second):
+            writer.writerow(['2026-02-03', f"{amount:.2f}", f"FR-{record_id}"])
+
+    service = ReconciliationService(db_session)
+    load_unpaid_index = service.load_unpaid_index
+
+    def load_then_pay_elsewhere():
+        index = load_unpaid_index()
+        with session_scope() as other:
+            other.execute(update(FinancialRecord).where(FinancialRecord.id == second.id).values(is_paid=True))
+        return index
+
+    service.load_unpaid_index = load_then_pay_elsewhere
+    result = service.reconcile(str(bank_file), str(report_path))
+
+    assert (result.posted, result.matched, result.unmatched) == (1, 1, 1)
+    with open(report_path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert [row[0] for row in rows[1:]] == ['3']
+    assert rows[1][-1] == "record was paid while the file was being matched"
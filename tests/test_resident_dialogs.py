@@ -0,0 +1,18 @@
+from sqlalchemy import select
+from controllers.address_controller import AddressController
+from database.models import Resident
+from ui.resident_management import AllotmentDialog
+
+def test_allotment_dialog_lists_free_floors_of_the_selected_address(qapp, db_session):
+    resident = db_session.execute(select(Resident).limit(1)).scalar()
+    controller = AddressController(db_session)
+    free_floors = controller.get_free_floors()
+
+    dialog = AllotmentDialog(None, resident, controller)
+    for index in range(min(dialog.address_combo.count(), 5)):
+        dialog.address_combo.setCurrentIndex(index)
+        address_id = dialog.address_combo.currentData()
+        floors = [dialog.floor_combo.itemData(row) for row in range(dialog.floor_combo.count())]
+        assert dialog.selected_address_id == address_id
+        assert floors == [floor_id for _, floor_id in free_floors.get(address_id, [])]
+    dialog.deleteLater()
@@ -0,0 +1,24 @@
+from controllers.resident_controller import ResidentController
+from ui.table_models import ResidentTableModel
+
+def test_first_page_then_pages_in_on_scroll(qapp, db_session):
+    controller = ResidentController(db_session)
+    model = ResidentTableModel(controller, page_size=20)
+    first_page = controller.get_resident_rows({}, limit=model.page_size)
+
+    model.setFilters({}, first_page)
+    assert model.rowCount() == 20 and model.canFetchMore()
+
+    model.fetchMore()
+    assert model.rowCount() == 40
+    assert [model.residentId(row) for row in range(40)] == [
+        row[0] for row in controller.get_resident_rows({}, limit=40)
+    ]
+
+def test_short_first_page_is_complete(qapp, db_session):
+    controller = ResidentController(db_session)
+    model = ResidentTableModel(controller, page_size=20)
+    rows = controller.get_resident_rows({}, limit=5)
+
+    model.setFilters({'name': 'x'}, rows)
+    assert model.rowCount() == 5 and not model.canFetchMore()
@@ -0,0 +1,64 @@
+from sqlalchemy import select, text
+from controllers.resident_controller import ResidentController
+from database.models import Floor, Resident
+from database.search import build_match_expression, search_resident_ids
+
+def _total_changes(db_session):
+    # Counts the rows the residents_fts triggers write as well
+    return db_session.execute(text("SELECT total_changes()")).scalar()
+
+def _check_index(db_session):
+    db_session.execute(text("INSERT INTO residents_fts(residents_fts, rank) VALUES ('integrity-check', 1)"))
+
+def test_match_expression_quotes_every_word():
+    assert build_match_expression({None: 'o"neil  55-01'}) == '("o"* "neil"* "55"* "01"*)'
+    assert build_match_expression({'name': "Ada", 'contact_number': "555"}) == \
+        'name : ("Ada"*) AND contact_number : ("555"*)'
+    assert build_match_expression({None: " -*- ", 'name': None}) is None
+
+def test_filters_follow_resident_writes(db_session):
+    controller = ResidentController(db_session)
+    resident = Resident(name="Zéphyrine Quixote", contact_number="555-9911", email="zq@example.org")
+    db_session.add(resident)
+    db_session.flush()
+
+    # Prefix, diacritic-insensitive and combined filters
+    assert [row[0] for row in controller.get_resident_rows({'name': "zephy"})] == [resident.id]
+    assert [row[0] for row in controller.get_resident_rows({'name': "quix", 'contact_number': "555-99"})] == [resident.id]
+    assert controller.get_resident_rows({'name': "quix", 'contact_number': "555-00"}) == []
+    assert search_resident_ids(db_session, "zq example")[0] == resident.id
+
+    resident.name = "Zéphyrine Marlowe"
+    db_session.flush()
+    assert controller.get_resident_rows({'name': "quixote"}) == []
+    assert [row[0] for row in controller.search_resident_rows("marlowe")] == [resident.id]
+
+    resident.is_active = False
+    db_session.flush()
+    assert search_resident_ids(db_session, "marlowe") == []
+
+    db_session.delete(resident)
+    db_session.flush()
+    assert db_session.execute(text(
+        "SELECT rowid FROM residents_fts WHERE residents_fts MATCH 'marlowe'"
+    )).all() == []
+    _check_index(db_session)
+
+def test_floor_moves_leave_the_index_alone(db_session):
+    resident_id, floor_id = db_session.execute(
+        select(Resident.id, Resident.floor_id).where(Resident.floor_id.isnot(None)).order_by(Resident.id).limit(1)
+    ).one()
+    other_floor = db_session.execute(
+        select(Floor.id).where(Floor.id != floor_id).order_by(Floor.id).limit(1)
+    ).scalar()
+
+    # Plain SQL, so only the triggers write besides the statement itself
+    def changes(sql, *parameters):
+        before = _total_changes(db_session)
+        db_session.connection().exec_driver_sql(sql, parameters)
+        return _total_changes(db_session) - before
+
+    assert changes("UPDATE residents SET floor_id = ?, is_active = 1 WHERE id = ?", other_floor, resident_id) == 1
+    assert changes("UPDATE residents SET contact_number = '555-4242' WHERE id = ?", resident_id) > 1
+    assert resident_id in search_resident_ids(db_session, "555-4242")
+    _check_index(db_session)
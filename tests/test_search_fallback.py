@@ -0,0 +1,26 @@
+from sqlalchemy.orm import Session
+from controllers.resident_controller import ResidentController
+from database.connection import create_app_engine
+from database.models import Base, Resident
+from database.search import ensure_resident_search_index, supports_full_text_search
+
+def test_database_without_search_index_uses_like_filters(workdir):
+    # A database created before the FTS5 index was added
+    engine = create_app_engine(f"sqlite:///{workdir}/before_fts.db")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db_session:
+        db_session.add_all([Resident(name="Ada Lovelace", contact_number="555-0101"),
+                            Resident(name="Alan Turing", contact_number="555-0102")])
+        db_session.commit()
+
+        assert not supports_full_text_search(db_session)
+        rows = ResidentController(db_session).get_resident_rows({'name': "Lovelace"})
+        assert [row[1] for row in rows] == ["Ada Lovelace"]
+
+    with engine.begin() as connection:
+        ensure_resident_search_index(connection)
+    with Session(engine) as db_session:
+        assert supports_full_text_search(db_session)
+        rows = ResidentController(db_session).get_resident_rows({'name': "Lovel"})
+        assert [row[1] for row in rows] == ["Ada Lovelace"]
+    engine.dispose()
@@ -0,0 +1,14 @@
+import threading
+from utils.security import check_password, hash_passwords
+
+def test_hash_passwords_from_a_worker_thread():
+    passwords = [f"secret-{index}" for index in range(6)]
+    hashes = []
+    worker = threading.Thread(target=lambda: hashes.extend(hash_passwords(passwords, workers=2)))
+    worker.start()
+    worker.join(timeout=120)
+
+    assert not worker.is_alive()
+    assert len(hashes) == len(passwords)
+    assert all(check_password(stored, password) for stored, password in zip(hashes, passwords))
+    assert not check_password(hashes[0], passwords[1])
@@ -0,0 +1,29 @@
+import datetime
+import os
+import threading
+from sqlalchemy import select
+from database.models import FinancialRecord, Resident
+from services.statement_service import StatementService, generate_statements, month_bounds
+
+def test_month_bounds_roll_over_the_year():
+    assert month_bounds(datetime.date(2025, 12, 9)) == (datetime.datetime(2025, 12, 1), datetime.datetime(2026, 1, 1))
+    assert month_bounds("2026-02") == (datetime.datetime(2026, 2, 1), datetime.datetime(2026, 3, 1))
+
+def test_generate_statements_from_a_worker_thread(db_session, tmp_path):
+    # The UI starts the batch from a query_executor thread
+    period = db_session.execute(select(FinancialRecord.due_date).limit(1)).scalar()
+    active = list(db_session.execute(
+        select(Resident.id).where(Resident.is_active == True).order_by(Resident.id)
+    ).scalars())
+    expected = sum(1 for _ in StatementService(db_session).iter_statements(period, 'resident', active))
+
+    written = []
+    worker = threading.Thread(target=lambda: written.append(
+        generate_statements(period, str(tmp_path), workers=2, chunk_size=25, db_session=db_session)
+    ))
+    worker.start()
+    worker.join(timeout=120)
+
+    assert not worker.is_alive()
+    assert written == [expected] and expected > 0
+    assert len(os.listdir(tmp_path)) == expected
@@ -1,15 +1,30 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                            QTableWidgetItem, QPushButton, QComboBox, QLineEdit, 
+                            QTableWidgetItem, QTableView, QPushButton, QComboBox, QLineEdit, 
                             QLabel, QCheckBox, QSpinBox, QGroupBox, QFormLayout,
-                            QHeaderView, QDialog, QFileDialog, QMessageBox)
-from PyQt5.QtCore import Qt
+                            QHeaderView, QDialog, QFileDialog, QMessageBox,
+                            QProgressDialog, QApplication)
+from PyQt5.QtCore import Qt, QTimer
+from auth.permissions import current_user_can
+from config import LIVE_SEARCH_DEBOUNCE
 from controllers.address_controller import AddressController
+from database.models import Category
+from ui.export_runner import ExportRunner
+from ui.table_models import RowTableModel
 from utils.data_import import import_addresses_from_csv
+from utils.filters import ExactMatcher, IncrementalFilter, TextMatcher
+from utils.query_executor import query_executor
 
 class AddressManagementWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.controller = AddressController()
+        self.current_filters = {}
+        # Columns of get_address_rows: id, category, number, row, block, total_floors
+        self.live_filter = IncrementalFilter({
+            'category': ExactMatcher(1, lambda name: Category[name].value),
+            'block': ExactMatcher(4),
+            'number': TextMatcher(2)
+        })
         self.initUI()
         self.loadAddresses()
         
@@ -46,6 +61,15 @@ class AddressManagementWidget(QWidget):
         filter_layout.addWidget(QLabel("Number:"))
         filter_layout.addWidget(self.number_filter)
         
+        # Filter as the user types, once typing pauses
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(LIVE_SEARCH_DEBOUNCE)
+        self.filter_timer.timeout.connect(self.applyFilter)
+        self.number_filter.textChanged.connect(self.filter_timer.start)
+        self.category_filter.currentIndexChanged.connect(self.applyFilter)
+        self.block_filter.currentIndexChanged.connect(self.applyFilter)
+        
         # Apply filter button
         apply_filter_btn = QPushButton("Apply Filter")
         apply_filter_btn.clicked.connect(self.applyFilter)
@@ -64,47 +88,61 @@ class AddressManagementWidget(QWidget):
         
         add_btn = QPushButton("Add Address")
         add_btn.clicked.connect(self.showAddDialog)
+        add_btn.setEnabled(current_user_can('address_management', 'can_add'))
         buttons_layout.addWidget(add_btn)
         
         edit_btn = QPushButton("Edit Address")
         edit_btn.clicked.connect(self.showEditDialog)
+        edit_btn.setEnabled(current_user_can('address_management', 'can_edit'))
         buttons_layout.addWidget(edit_btn)
         
         delete_btn = QPushButton("Delete Address")
         delete_btn.clicked.connect(self.deleteAddress)
+        delete_btn.setEnabled(current_user_can('address_management', 'can_delete'))
         buttons_layout.addWidget(delete_btn)
         
         import_btn = QPushButton("Import CSV")
         import_btn.clicked.connect(self.importCSV)
+        import_btn.setEnabled(current_user_can('address_management', 'can_add'))
         buttons_layout.addWidget(import_btn)
         
+        export_btn = QPushButton("Export")
+        export_btn.clicked.connect(self.exportAddresses)
+        buttons_layout.addWidget(export_btn)
+        
         buttons_layout.addStretch()
         layout.addLayout(buttons_layout)
         
         # Table for addresses
-        self.address_table = QTableWidget()
-        self.address_table.setColumnCount(6)
-        self.address_table.setHorizontalHeaderLabels(["ID", "Category", "Number", "Row", "Block", "Floors"])
+        self.address_model = RowTableModel(["ID", "Category", "Number", "Row", "Block", "Floors"], parent=self)
+        self.address_table = QTableView()
+        self.address_table.setModel(self.address_model)
         self.address_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.address_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.address_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.address_table.verticalHeader().setVisible(False)
+        self.address_table.setSelectionBehavior(QTableView.SelectRows)
+        self.address_table.setSelectionMode(QTableView.SingleSelection)
+        self.address_table.setEditTriggers(QTableView.NoEditTriggers)
         self.address_table.doubleClicked.connect(self.showFloorsDialog)
         layout.addWidget(self.address_table)
         
-    def loadAddresses(self):
-        addresses = self.controller.get_all_addresses()
-        self.populateTable(addresses)
-        
-    def populateTable(self, addresses):
-        self.address_table.setRowCount(0)
-        for row, address in enumerate(addresses):
-            self.address_table.insertRow(row)
-            self.address_table.setItem(row, 0, QTableWidgetItem(str(address.id)))
-            self.address_table.setItem(row, 1, QTableWidgetItem(address.category.value))
-            self.address_table.setItem(row, 2, QTableWidgetItem(address.number))
-            self.address_table.setItem(row, 3, QTableWidgetItem(address.row))
-            self.address_table.setItem(row, 4, QTableWidgetItem(address.block.value))
-            self.address_table.setItem(row, 5, QTableWidgetItem(str(address.total_floors)))
+    def loadAddresses(self, filters=None):
+        filters = dict(filters or {})
+        self.current_filters = filters
+        self.live_filter.forget()
+        query_executor.submit(
+            "addresses",
+            lambda db_session: AddressController(db_session).get_address_rows(filters),
+            on_result=lambda rows: self.populateTable(rows, filters),
+            on_error=self.onQueryError
+        )
+        
+    def populateTable(self, rows, filters):
+        # Every matching address is loaded, so stricter filters can narrow these rows
+        self.live_filter.remember(filters, rows)
+        self.address_model.setRows(rows)
+    
+    def onQueryError(self, error):
+        QMessageBox.critical(self, "Error", f"Failed to load addresses:\n{error}")
     
     def applyFilter(self):
         filters = {}
@@ -115,15 +153,32 @@ class AddressManagementWidget(QWidget):
         if self.number_filter.text():
             filters['number'] = self.number_filter.text()
         
-        filtered_addresses = self.controller.filter_addresses(filters)
-        self.populateTable(filtered_addresses)
+        self.filter_timer.stop()
+        rows = self.live_filter.narrow(filters)
+        if rows is None:
+            self.loadAddresses(filters)
+        else:
+            # Stricter than the rows on screen: no query, and any query still running is dropped
+            query_executor.cancel("addresses")
+            self.current_filters = filters
+            self.address_model.setRows(rows)
     
     def resetFilter(self):
+        # Block the live filter signals so the reset issues a single query
+        for widget in (self.category_filter, self.block_filter, self.number_filter):
+            widget.blockSignals(True)
         self.category_filter.setCurrentIndex(0)
         self.block_filter.setCurrentIndex(0)
         self.number_filter.clear()
+        for widget in (self.category_filter, self.block_filter, self.number_filter):
+            widget.blockSignals(False)
+        self.filter_timer.stop()
         self.loadAddresses()
     
+    def selectedAddressId(self):
+        row = self.address_model.rowData(self.address_table.currentIndex().row())
+        return row[0] if row else None
+    
     def showAddDialog(self):
         dialog = AddressDialog(self)
         if dialog.exec_():
@@ -131,9 +186,8 @@ class AddressManagementWidget(QWidget):
             self.loadAddresses()
     
     def showEditDialog(self):
-        selected_row = self.address_table.currentRow()
-        if selected_row >= 0:
-            address_id = int(self.address_table.item(selected_row, 0).text())
+        address_id = self.selectedAddressId()
+        if address_id is not None:
             address = self.controller.get_address_by_id(address_id)
             
             dialog = AddressDialog(self, address)
@@ -144,9 +198,8 @@ class AddressManagementWidget(QWidget):
             QMessageBox.warning(self, "No Selection", "Please select an address to edit.")
     
     def deleteAddress(self):
-        selected_row = self.address_table.currentRow()
-        if selected_row >= 0:
-            address_id = int(self.address_table.item(selected_row, 0).text())
+        address_id = self.selectedAddressId()
+        if address_id is not None:
             
             reply = QMessageBox.question(self, "Confirm Delete", 
                                         "Are you sure you want to delete this address?",
@@ -158,9 +211,8 @@ class AddressManagementWidget(QWidget):
             QMessageBox.warning(self, "No Selection", "Please select an address to delete.")
     
     def showFloorsDialog(self):
-        selected_row = self.address_table.currentRow()
-        if selected_row >= 0:
-            address_id = int(self.address_table.item(selected_row, 0).text())
+        address_id = self.selectedAddressId()
+        if address_id is not None:
             address = self.controller.get_address_by_id(address_id)
             
             dialog = FloorsDialog(self, address)
@@ -169,12 +221,41 @@ class AddressManagementWidget(QWidget):
     def importCSV(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Import Addresses", "", "CSV Files (*.csv)")
         if file_path:
+            progress = QProgressDialog("Importing addresses...", None, 0, 0, self)
+            progress.setWindowTitle("Import Addresses")
+            progress.setWindowModality(Qt.WindowModal)
+            progress.show()
+            
+            def onProgress(result):
+                progress.setLabelText(f"Imported {result.rows_imported} of {result.rows_read} rows "
+                                      f"({result.rows_per_second:.0f} rows/s)")
+                QApplication.processEvents()
+            
             try:
-                import_addresses_from_csv(file_path, self.controller)
-                self.loadAddresses()
-                QMessageBox.information(self, "Success", "Addresses imported successfully.")
+                result = import_addresses_from_csv(file_path, self.controller, progress_callback=onProgress)
             except Exception as e:
+                progress.close()
                 QMessageBox.critical(self, "Error", f"Failed to import addresses: {str(e)}")
+                return
+            
+            progress.close()
+            self.loadAddresses()
+            
+            message = (f"Imported {result.rows_imported} of {result.rows_read} rows "
+                       f"in {result.elapsed:.1f}s ({result.rows_per_second:.0f} rows/s).")
+            if result.rejects:
+                message += f"\n\n{len(result.rejects)} rows were rejected:\n"
+                message += "\n".join(f"Line {line}: {reason}" for line, reason in result.rejects[:20])
+                if len(result.rejects) > 20:
+                    message += f"\n... and {len(result.rejects) - 20} more"
+            QMessageBox.information(self, "Import Complete", message)
+    
+    def exportAddresses(self):
+        filters = dict(self.current_filters)
+        ExportRunner(
+            self, "Export Addresses", "addresses",
+            lambda db_session: AddressController(db_session).get_address_export_query(filters)
+        ).start()
 
 class AddressDialog(QDialog):
     def __init__(self, parent=None, address=None):
@@ -264,14 +345,17 @@ class FloorsDialog(QDialog):
         buttons_layout = QHBoxLayout()
         add_floor_btn = QPushButton("Add Floor")
         add_floor_btn.clicked.connect(self.showAddFloorDialog)
+        add_floor_btn.setEnabled(current_user_can('address_management', 'can_edit'))
         buttons_layout.addWidget(add_floor_btn)
         
         edit_floor_btn = QPushButton("Edit Floor")
         edit_floor_btn.clicked.connect(self.showEditFloorDialog)
+        edit_floor_btn.setEnabled(current_user_can('address_management', 'can_edit'))
         buttons_layout.addWidget(edit_floor_btn)
         
         delete_floor_btn = QPushButton("Delete Floor")
         delete_floor_btn.clicked.connect(self.deleteFloor)
+        delete_floor_btn.setEnabled(current_user_can('address_management', 'can_edit'))
         buttons_layout.addWidget(delete_floor_btn)
         
         buttons_layout.addStretch()
@@ -297,6 +381,7 @@ class FloorsDialog(QDialog):
         
         update_shop_btn = QPushButton("Update Shop Count")
         update_shop_btn.clicked.connect(self.updateShopCount)
+        update_shop_btn.setEnabled(current_user_can('address_management', 'can_edit'))
         shop_layout.addRow("", update_shop_btn)
         
         self.shop_group.setLayout(shop_layout)
@@ -0,0 +1,186 @@
+import math
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QSizePolicy
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QPainter, QColor, QPen, QFontMetrics
+
+PALETTE = ["#3498db", "#e67e22", "#2ecc71", "#e74c3c", "#9b59b6", "#1abc9c", "#f1c40f", "#34495e"]
+
+class ChartWidget(QWidget):
+    """Base for the QPainter charts: holds ordered ``{label: value}`` data.
+
+    ``setData`` only replaces the values and schedules a repaint, so updating a
+    chart never rebuilds any widgets.
+    """
+
+    def __init__(self, title="", parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.data = {}
+        self.setMinimumSize(250, 200)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def setData(self, data):
+        data = dict(data)
+        if data != self.data:
+            self.data = data
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        area = QRectF(self.rect()).adjusted(10, 10, -10, -10)
+
+        if self.title:
+            title_height = QFontMetrics(painter.font()).height() + 6
+            painter.drawText(QRectF(area.left(), area.top(), area.width(), title_height),
+                             Qt.AlignCenter, self.title)
+            area.setTop(area.top() + title_height)
+
+        if not self.data or not any(self.data.values()):
+            painter.drawText(area, Qt.AlignCenter, "No data")
+        else:
+            self.paintChart(painter, area)
+        painter.end()
+
+    def paintChart(self, painter, area):
+        raise NotImplementedError
+
+class PieChartWidget(ChartWidget):
+    def paintChart(self, painter, area):
+        total = float(sum(self.data.values()))
+        metrics = QFontMetrics(painter.font())
+        legend_width = max(metrics.width(f"{label} (100.0%)") for label in self.data) + 24
+        diameter = max(min(area.width() - legend_width - 10, area.height()), 10)
+        pie = QRectF(area.left(), area.top() + (area.height() - diameter) / 2, diameter, diameter)
+
+        # Qt angles are in 1/16th of a degree, counter-clockwise from 3 o'clock
+        start = 90 * 16
+        row_height = metrics.height() + 4
+        legend_top = area.top() + (area.height() - row_height * len(self.data)) / 2
+        for index, (label, value) in enumerate(self.data.items()):
+            color = QColor(PALETTE[index % len(PALETTE)])
+            span = -int(round(value / total * 360 * 16))
+            painter.setPen(QPen(Qt.white, 1))
+            painter.setBrush(color)
+            painter.drawPie(pie, start, span)
+            start += span
+
+            y = legend_top + index * row_height
+            painter.setPen(Qt.NoPen)
+            painter.drawRect(QRectF(pie.right() + 14, y + 3, 10, 10))
+            painter.setPen(self.palette().windowText().color())
+            painter.drawText(QPointF(pie.right() + 30, y + metrics.ascent()),
+                             f"{label} ({value / total * 100:.1f}%)")
+
+class BarChartWidget(ChartWidget):
+    def paintChart(self, painter, area):
+        metrics = QFontMetrics(painter.font())
+        text_color = self.palette().windowText().color()
+        maximum = max(self.data.values())
+        step = _nice_step(maximum)
+        top_value = step * math.ceil(maximum / step) if maximum > 0 else 1
+
+        axis_width = metrics.width(str(int(top_value))) + 8
+        plot = area.adjusted(axis_width, metrics.height() / 2, 0, -(metrics.height() + 6))
+
+        # Grid lines and y-axis labels
+        ticks = int(round(top_value / step))
+        for tick in range(ticks + 1):
+            y = plot.bottom() - plot.height() * tick / ticks
+            painter.setPen(QPen(QColor("#dfe4ea"), 1))
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            painter.setPen(text_color)
+            painter.drawText(QRectF(area.left(), y - metrics.height() / 2, axis_width - 4, metrics.height()),
+                             Qt.AlignRight | Qt.AlignVCenter, str(int(step * tick)))
+
+        slot = plot.width() / len(self.data)
+        for index, (label, value) in enumerate(self.data.items()):
+            height = plot.height() * value / top_value
+            bar = QRectF(plot.left() + slot * index + slot * 0.2, plot.bottom() - height, slot * 0.6, height)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(PALETTE[0]))
+            painter.drawRect(bar)
+            painter.setPen(text_color)
+            painter.drawText(QRectF(plot.left() + slot * index, plot.bottom() + 4, slot, metrics.height()),
+                             Qt.AlignCenter, str(label))
+
+class MatplotlibChartWidget(QWidget):
+    """Chart backed by matplotlib for reports the QPainter charts cannot draw.
+
+    matplotlib and its Qt backend are imported when the first instance is
+    created, so screens that only use the native charts never pay for them.
+    """
+
+    def __init__(self, title="", figsize=(6, 4), parent=None):
+        super().__init__(parent)
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=figsize, tight_layout=True)
+        self.canvas = FigureCanvas(self.figure)
+        self.axes = self.figure.add_subplot(111)
+        if title:
+            self.axes.set_title(title)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.canvas)
+
+    def redraw(self):
+        """Schedule a repaint after the caller has updated artists on ``self.axes``."""
+        self.axes.relim()
+        self.axes.autoscale_view()
+        self.canvas.draw_idle()
+
+class StackedBarChartWidget(MatplotlibChartWidget):
+    """One bar per category, stacked from ``{series: [value per category]}``.
+
+    ``setData`` with the same categories and series only moves the existing
+    bars; the artists are rebuilt only when either changes.
+    """
+
+    def __init__(self, title="", figsize=(6, 4), parent=None):
+        super().__init__(title, figsize, parent)
+        self.categories = []
+        self.bars = {}
+
+    def setData(self, categories, series):
+        categories = [str(category) for category in categories]
+        if categories != self.categories or list(series) != list(self.bars):
+            self._createBars(categories, series)
+        else:
+            bottom = [0.0] * len(categories)
+            for name, values in series.items():
+                for rectangle, value, base in zip(self.bars[name], values, bottom):
+                    rectangle.set_y(base)
+                    rectangle.set_height(value)
+                bottom = [base + value for base, value in zip(bottom, values)]
+        self.redraw()
+
+    def _createBars(self, categories, series):
+        for container in self.bars.values():
+            container.remove()
+        self.categories = categories
+        self.bars = {}
+
+        positions = range(len(categories))
+        bottom = [0.0] * len(categories)
+        for index, (name, values) in enumerate(series.items()):
+            self.bars[name] = self.axes.bar(positions, values, bottom=bottom, label=name,
+                                            color=PALETTE[index % len(PALETTE)])
+            bottom = [base + value for base, value in zip(bottom, values)]
+        self.axes.set_xticks(list(positions))
+        self.axes.set_xticklabels(categories, rotation=30, ha='right')
+        if series:
+            self.axes.legend()
+
+def _nice_step(maximum, ticks=5):
+    """Round ``maximum / ticks`` up to 1, 2 or 5 times a power of ten."""
+    if maximum <= 0:
+        return 1
+    raw = maximum / ticks
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return max(int(factor * magnitude), 1)
+    return int(10 * magnitude)
@@ -1,17 +1,241 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGroupBox, QComboBox,
+                            QCheckBox, QPushButton, QTableView, QHeaderView, QDialog, QFormLayout,
+                            QLineEdit, QTextEdit, QMessageBox)
+from PyQt5.QtCore import Qt
+from auth.permissions import current_user_can
+from controllers.address_controller import AddressController
+from controllers.complaint_controller import ComplaintController, OPEN_STATUSES
+from controllers.resident_controller import ResidentController
+from database.models import ComplaintStatus
+from ui.table_models import RowTableModel
+from utils.query_executor import query_executor
 
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+# Status filter choices: label and the statuses it shows (None for all)
+STATUS_FILTERS = [
+    ("Open", OPEN_STATUSES),
+    *[(status.value, (status,)) for status in ComplaintStatus],
+    ("All", None),
+]
 
 class ComplaintManagementWidget(QWidget):
     def __init__(self):
         super().__init__()
+        self.controller = ComplaintController()
+        self.next_token = None
         self.initUI()
-        
+        self.loadQueue()
+
     def initUI(self):
         layout = QVBoxLayout(self)
-        
+
         title = QLabel("Complaint Management")
+        title.setAlignment(Qt.AlignCenter)
         title.setStyleSheet("font-size: 18px; font-weight: bold; margin: 10px;")
         layout.addWidget(title)
-        
-        content = QLabel("Complaint Management module will be implemented here.")
-        layout.addWidget(content)
+
+        # Open tickets per status and SLA breaches
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("margin: 5px;")
+        layout.addWidget(self.summary_label)
+
+        # Filter section
+        filter_group = QGroupBox("Filters")
+        filter_layout = QHBoxLayout()
+
+        self.status_filter = QComboBox()
+        for label, statuses in STATUS_FILTERS:
+            self.status_filter.addItem(label, statuses)
+        filter_layout.addWidget(QLabel("Status:"))
+        filter_layout.addWidget(self.status_filter)
+
+        self.block_filter = QComboBox()
+        self.block_filter.addItem("All Blocks")
+        self.block_filter.addItems(["A", "B", "C", "D", "E"])
+        filter_layout.addWidget(QLabel("Block:"))
+        filter_layout.addWidget(self.block_filter)
+
+        self.overdue_filter = QCheckBox("Overdue only")
+        filter_layout.addWidget(self.overdue_filter)
+        filter_layout.addStretch()
+
+        for signal in (self.status_filter.currentIndexChanged, self.block_filter.currentIndexChanged,
+                       self.overdue_filter.toggled):
+            signal.connect(self.loadQueue)
+
+        filter_group.setLayout(filter_layout)
+        layout.addWidget(filter_group)
+
+        # Buttons section
+        buttons_layout = QHBoxLayout()
+
+        add_btn = QPushButton("New Complaint")
+        add_btn.clicked.connect(self.showAddDialog)
+        add_btn.setEnabled(current_user_can('complaint_management', 'can_add'))
+        buttons_layout.addWidget(add_btn)
+
+        for label, status in (("Start Work", ComplaintStatus.IN_PROGRESS),
+                              ("Resolve", ComplaintStatus.RESOLVED),
+                              ("Close", ComplaintStatus.CLOSED)):
+            status_btn = QPushButton(label)
+            status_btn.clicked.connect(lambda _, status=status: self.updateStatus(status))
+            status_btn.setEnabled(current_user_can('complaint_management', 'can_edit'))
+            buttons_layout.addWidget(status_btn)
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.loadQueue)
+        buttons_layout.addWidget(refresh_btn)
+
+        buttons_layout.addStretch()
+        layout.addLayout(buttons_layout)
+
+        # Queue, oldest first within each status
+        self.queue_model = RowTableModel(
+            ["ID", "Status", "Created", "Title", "Resident", "Address", "Block", "SLA Due", "Overdue"], parent=self
+        )
+        self.queue_table = QTableView()
+        self.queue_table.setModel(self.queue_model)
+        self.queue_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.queue_table.verticalHeader().setVisible(False)
+        self.queue_table.setSelectionBehavior(QTableView.SelectRows)
+        self.queue_table.setSelectionMode(QTableView.SingleSelection)
+        self.queue_table.setEditTriggers(QTableView.NoEditTriggers)
+        layout.addWidget(self.queue_table)
+
+        self.load_more_btn = QPushButton("Load More")
+        self.load_more_btn.clicked.connect(self.loadMore)
+        self.load_more_btn.setEnabled(False)
+        layout.addWidget(self.load_more_btn)
+
+    def currentFilters(self):
+        block = self.block_filter.currentText()
+        return {
+            'statuses': self.status_filter.currentData(),
+            'block': None if block == "All Blocks" else block,
+            'overdue_only': self.overdue_filter.isChecked()
+        }
+
+    def loadQueue(self):
+        self.next_token = None
+        self.requestPage(self.currentFilters(), None, append=False)
+        query_executor.submit(
+            "complaint_summary",
+            lambda db_session: _load_summary(ComplaintController(db_session)),
+            on_result=self.showSummary,
+            on_error=self.onQueryError
+        )
+
+    def loadMore(self):
+        if self.next_token:
+            self.requestPage(self.currentFilters(), self.next_token, append=True)
+
+    def requestPage(self, filters, token, append):
+        self.load_more_btn.setEnabled(False)
+        query_executor.submit(
+            "complaints",
+            lambda db_session: ComplaintController(db_session).get_complaint_queue(token=token, **filters),
+            on_result=lambda page: self.showPage(page, append),
+            on_error=self.onQueryError
+        )
+
+    def showPage(self, page, append):
+        rows = [_display_row(row) for row in page.items]
+        if append:
+            self.queue_model.setRows(self.queue_model.rows + rows)
+        else:
+            self.queue_model.setRows(rows)
+        self.next_token = page.next_token
+        self.load_more_btn.setEnabled(page.has_more)
+
+    def showSummary(self, summary):
+        counts, breaches = summary
+        parts = [f"{status.value}: {counts.get(status.value, 0)}" for status in OPEN_STATUSES]
+        parts.append(f"Overdue: {sum(breaches.values())}")
+        self.summary_label.setText("    ".join(parts))
+
+    def onQueryError(self, error):
+        QMessageBox.critical(self, "Error", f"Failed to load complaints:\n{error}")
+
+    def selectedComplaintId(self):
+        row = self.queue_model.rowData(self.queue_table.currentIndex().row())
+        return row[0] if row else None
+
+    def updateStatus(self, status):
+        complaint_id = self.selectedComplaintId()
+        if complaint_id is None:
+            QMessageBox.warning(self, "No Selection", "Please select a complaint.")
+            return
+
+        self.controller.update_status(complaint_id, status)
+        self.loadQueue()
+
+    def showAddDialog(self):
+        dialog = ComplaintDialog(self)
+        if dialog.exec_():
+            data = dialog.get_complaint_data()
+            if not data['address_id'] or not data['resident_id'] or not data['title']:
+                QMessageBox.warning(self, "Missing Details", "Address, resident and title are required.")
+                return
+            self.controller.add_complaint(data)
+            self.loadQueue()
+
+class ComplaintDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("New Complaint")
+        self.resident_controller = ResidentController()
+        self.initUI()
+
+    def initUI(self):
+        layout = QFormLayout(self)
+
+        self.address_combo = QComboBox()
+        for address_id, _, number, _, block, _ in AddressController().get_address_rows():
+            self.address_combo.addItem(f"{number}, {block} Block", address_id)
+        self.address_combo.currentIndexChanged.connect(self.populateResidents)
+        layout.addRow("Address:", self.address_combo)
+
+        self.resident_combo = QComboBox()
+        layout.addRow("Resident:", self.resident_combo)
+        self.populateResidents()
+
+        self.title_input = QLineEdit()
+        self.title_input.setMaxLength(100)
+        layout.addRow("Title:", self.title_input)
+
+        self.description_input = QTextEdit()
+        layout.addRow("Description:", self.description_input)
+
+        # Buttons
+        buttons_layout = QHBoxLayout()
+        save_btn = QPushButton("Save")
+        save_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+
+        buttons_layout.addWidget(save_btn)
+        buttons_layout.addWidget(cancel_btn)
+        layout.addRow("", buttons_layout)
+
+    def populateResidents(self):
+        self.resident_combo.clear()
+        address_id = self.address_combo.currentData()
+        if address_id is None:
+            return
+        for resident in self.resident_controller.get_residents_by_address(address_id):
+            self.resident_combo.addItem(resident.name, resident.id)
+
+    def get_complaint_data(self):
+        return {
+            'address_id': self.address_combo.currentData(),
+            'resident_id': self.resident_combo.currentData(),
+            'title': self.title_input.text().strip(),
+            'description': self.description_input.toPlainText().strip()[:500]
+        }
+
+def _load_summary(controller):
+    return controller.get_status_counts(), controller.get_sla_breaches()
+
+def _display_row(row):
+    complaint_id, status, created_at, title, resident, number, block, resolved_at, sla_due, breached = row
+    return (complaint_id, status, created_at.strftime("%Y-%m-%d %H:%M"), title, resident or "", number, block,
+            sla_due.strftime("%Y-%m-%d %H:%M"), "Yes" if breached else "")
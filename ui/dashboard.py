@@ -1,21 +1,14 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QFrame, QSizePolicy)
 from PyQt5.QtCore import Qt
-from controllers.address_controller import AddressController
-from controllers.resident_controller import ResidentController
-from controllers.financial_controller import FinancialController
-from controllers.complaint_controller import ComplaintController
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+from services.dashboard_service import DashboardService
+from utils.query_executor import query_executor
+from ui.charts import PieChartWidget, BarChartWidget
 
 class DashboardWidget(QWidget):
     def __init__(self):
         super().__init__()
-        self.address_controller = AddressController()
-        self.resident_controller = ResidentController()
-        self.financial_controller = FinancialController()
-        self.complaint_controller = ComplaintController()
+        self.displayed_snapshot = None
         self.initUI()
         self.loadDashboardData()
         
@@ -58,8 +51,8 @@ class DashboardWidget(QWidget):
         address_category_title.setStyleSheet("font-weight: bold; margin: 5px;")
         address_category_layout.addWidget(address_category_title)
         
-        self.address_category_canvas = FigureCanvas(Figure(figsize=(5, 4)))
-        address_category_layout.addWidget(self.address_category_canvas)
+        self.address_category_chart = PieChartWidget("Address Distribution by Category")
+        address_category_layout.addWidget(self.address_category_chart)
         
         charts_layout.addWidget(self.address_category_frame)
         
@@ -73,11 +66,26 @@ class DashboardWidget(QWidget):
         address_block_title.setStyleSheet("font-weight: bold; margin: 5px;")
         address_block_layout.addWidget(address_block_title)
         
-        self.address_block_canvas = FigureCanvas(Figure(figsize=(5, 4)))
-        address_block_layout.addWidget(self.address_block_canvas)
+        self.address_block_chart = BarChartWidget("Address Distribution by Block")
+        address_block_layout.addWidget(self.address_block_chart)
         
         charts_layout.addWidget(self.address_block_frame)
         
+        # Outstanding dues by age chart
+        self.dues_age_frame = QFrame()
+        self.dues_age_frame.setFrameShape(QFrame.StyledPanel)
+        dues_age_layout = QVBoxLayout(self.dues_age_frame)
+        
+        dues_age_title = QLabel("Outstanding Dues by Age")
+        dues_age_title.setAlignment(Qt.AlignCenter)
+        dues_age_title.setStyleSheet("font-weight: bold; margin: 5px;")
+        dues_age_layout.addWidget(dues_age_title)
+        
+        self.dues_age_chart = BarChartWidget("Days Past Due")
+        dues_age_layout.addWidget(self.dues_age_chart)
+        
+        charts_layout.addWidget(self.dues_age_frame)
+        
         layout.addLayout(charts_layout)
         
         # Recent complaints and financial records
@@ -145,80 +153,68 @@ class DashboardWidget(QWidget):
         value_label.setAlignment(Qt.AlignCenter)
         value_label.setStyleSheet("font-size: 24px; font-weight: bold;")
         layout.addWidget(value_label)
+        card.value_label = value_label
         
         return card
     
-    def loadDashboardData(self):
-        # Load statistics
-        total_addresses = self.address_controller.get_total_addresses()
-        self.address_card.findChild(QLabel, text="0").setText(str(total_addresses))
-        
-        total_residents = self.resident_controller.get_total_residents()
-        self.resident_card.findChild(QLabel, text="0").setText(str(total_residents))
-        
-        pending_dues = self.financial_controller.get_total_pending_dues()
-        self.financial_card.findChild(QLabel, text="₹0").setText(f"₹{pending_dues:.2f}")
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Cheap while the cached snapshot is fresh; rebuilt after writes or expiry
+        self.loadDashboardData()
+    
+    def loadDashboardData(self, force=False):
+        query_executor.submit(
+            "dashboard",
+            lambda db_session: DashboardService(db_session).get_snapshot(force=force),
+            on_result=self.showSnapshot
+        )
+    
+    def showSnapshot(self, snapshot):
+        if snapshot is self.displayed_snapshot:
+            return
+        self.displayed_snapshot = snapshot
         
-        pending_complaints = self.complaint_controller.get_pending_complaints_count()
-        self.complaint_card.findChild(QLabel, text="0").setText(str(pending_complaints))
+        # Load statistics
+        self.address_card.value_label.setText(str(snapshot['total_addresses']))
+        self.resident_card.value_label.setText(str(snapshot['total_residents']))
+        self.financial_card.value_label.setText(f"₹{snapshot['pending_dues']:.2f}")
+        self.complaint_card.value_label.setText(str(snapshot['pending_complaints']))
         
         # Load charts
-        self.loadAddressCategoryChart()
-        self.loadAddressBlockChart()
+        self.loadAddressCategoryChart(snapshot['addresses_by_category'])
+        self.loadAddressBlockChart(snapshot['addresses_by_block'])
+        self.dues_age_chart.setData(snapshot['dues_by_age'])
         
         # Load recent data
-        self.loadRecentComplaints()
-        self.loadRecentFinancialRecords()
+        self.loadRecentComplaints(snapshot['recent_complaints'])
+        self.loadRecentFinancialRecords(snapshot['recent_financial_records'])
     
-    def loadAddressCategoryChart(self):
-        categories = self.address_controller.get_addresses_by_category()
-        
-        figure = self.address_category_canvas.figure
-        figure.clear()
-        
-        ax = figure.add_subplot(111)
-        ax.pie(categories.values(), labels=categories.keys(), autopct='%1.1f%%')
-        ax.set_title('Address Distribution by Category')
-        
-        self.address_category_canvas.draw()
+    def loadAddressCategoryChart(self, categories):
+        # Repaints in place, no figure is rebuilt
+        self.address_category_chart.setData(categories)
     
-    def loadAddressBlockChart(self):
-        blocks = self.address_controller.get_addresses_by_block()
-        
-        figure = self.address_block_canvas.figure
-        figure.clear()
-        
-        ax = figure.add_subplot(111)
-        ax.bar(blocks.keys(), blocks.values())
-        ax.set_title('Address Distribution by Block')
-        ax.set_xlabel('Block')
-        ax.set_ylabel('Count')
-        
-        self.address_block_canvas.draw()
+    def loadAddressBlockChart(self, blocks):
+        self.address_block_chart.setData(blocks)
     
-    def loadRecentComplaints(self):
-        recent_complaints = self.complaint_controller.get_recent_complaints(5)
-        
+    def loadRecentComplaints(self, recent_complaints):
         if recent_complaints:
             text = ""
             for complaint in recent_complaints:
-                text += f"<b>{complaint.title}</b> - {complaint.status.value}<br>"
-                text += f"{complaint.description[:50]}...<br><br>"
+                text += f"<b>{complaint['title']}</b> - {complaint['status']}<br>"
+                text += f"{complaint['description'][:50]}...<br><br>"
             
             self.recent_complaints_label.setText(text)
         else:
             self.recent_complaints_label.setText("No recent complaints")
     
-    def loadRecentFinancialRecords(self):
-        recent_records = self.financial_controller.get_recent_financial_records(5)
-        
+    def loadRecentFinancialRecords(self, recent_records):
         if recent_records:
             text = ""
             for record in recent_records:
-                resident_name = record.resident.name if record.resident else "Unknown"
-                text += f"<b>{resident_name}</b> - ₹{record.amount:.2f}<br>"
-                text += f"Due: {record.due_date.strftime('%Y-%m-%d')} - "
-                text += f"Status: {'Paid' if record.is_paid else 'Pending'}<br><br>"
+                resident_name = record['resident_name'] or "Unknown"
+                text += f"<b>{resident_name}</b> - ₹{record['amount']:.2f}<br>"
+                text += f"Due: {record['due_date'].strftime('%Y-%m-%d')} - "
+                text += f"Status: {'Paid' if record['is_paid'] else 'Pending'}<br><br>"
             
             self.recent_financial_label.setText(text)
         else:
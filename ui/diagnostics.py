@@ -0,0 +1,122 @@
+import datetime
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox,
+                            QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox)
+from PyQt5.QtCore import QTimer
+from database.connection import query_profiler
+
+REFRESH_INTERVAL = 2000  # milliseconds while the panel is visible
+
+class DiagnosticsWidget(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+
+        title = QLabel("Diagnostics")
+        title.setStyleSheet("font-size: 18px; font-weight: bold; margin: 10px;")
+        layout.addWidget(title)
+
+        # Controls
+        controls_layout = QHBoxLayout()
+
+        self.profiling_check = QCheckBox("Record queries")
+        self.profiling_check.setChecked(query_profiler.enabled)
+        self.profiling_check.toggled.connect(self.setProfilingEnabled)
+        controls_layout.addWidget(self.profiling_check)
+
+        controls_layout.addWidget(QLabel("Slow query threshold:"))
+        self.threshold_spin = QSpinBox()
+        self.threshold_spin.setRange(1, 60000)
+        self.threshold_spin.setSuffix(" ms")
+        self.threshold_spin.setValue(query_profiler.slow_threshold_ms)
+        self.threshold_spin.valueChanged.connect(self.setSlowThreshold)
+        controls_layout.addWidget(self.threshold_spin)
+
+        controls_layout.addStretch()
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        controls_layout.addWidget(refresh_btn)
+
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clearRecords)
+        controls_layout.addWidget(clear_btn)
+
+        layout.addLayout(controls_layout)
+
+        # Tables
+        self.tabs = QTabWidget()
+
+        self.summary_table = self.createTable(["Origin", "Calls", "Total (ms)", "Average (ms)", "Max (ms)", "Rows"])
+        self.tabs.addTab(self.summary_table, "By Origin")
+
+        record_headers = ["Time", "Origin", "Elapsed (ms)", "Rows", "Parameters", "Statement"]
+        self.recent_table = self.createTable(record_headers)
+        self.tabs.addTab(self.recent_table, "Recent Queries")
+
+        self.slow_table = self.createTable(record_headers)
+        self.tabs.addTab(self.slow_table, "Slow Queries")
+
+        layout.addWidget(self.tabs)
+
+    def createTable(self, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectRows)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def setProfilingEnabled(self, enabled):
+        query_profiler.enabled = enabled
+
+    def setSlowThreshold(self, value):
+        query_profiler.slow_threshold_ms = value
+
+    def clearRecords(self):
+        query_profiler.clear()
+        self.refresh()
+
+    def refresh(self):
+        summary = query_profiler.summary()
+        self.summary_table.setRowCount(len(summary))
+        for row, (origin, calls, total_ms, max_ms, rows) in enumerate(summary):
+            values = [origin, calls, f"{total_ms:.1f}", f"{total_ms / calls:.1f}", f"{max_ms:.1f}", rows]
+            self.setRow(self.summary_table, row, values)
+
+        self.fillRecords(self.recent_table, query_profiler.records)
+        self.fillRecords(self.slow_table, query_profiler.slow_records)
+
+    def fillRecords(self, table, records):
+        # Newest first
+        records = list(records)[::-1]
+        table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            self.setRow(table, row, [
+                datetime.datetime.fromtimestamp(record.started_at).strftime("%H:%M:%S.%f")[:-3],
+                record.origin,
+                f"{record.elapsed_ms:.1f}",
+                record.error or ("" if record.rows is None else record.rows),
+                record.params_shape,
+                " ".join(record.statement.split())
+            ])
+
+    def setRow(self, table, row, values):
+        for column, value in enumerate(values):
+            table.setItem(row, column, QTableWidgetItem(str(value)))
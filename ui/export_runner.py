@@ -0,0 +1,90 @@
+import os
+import threading
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
+from utils.data_export import EXPORT_FORMATS, export_query
+from utils.query_executor import query_executor
+
+class ExportRunner(QObject):
+    """Asks for a target file and streams a query to it on the query executor.
+
+    ``build_query`` is called on the worker thread with the worker's session
+    and must return the column query to export. Progress is shown in a
+    cancellable dialog.
+    """
+
+    progressed = pyqtSignal(int, int)
+
+    def __init__(self, parent, title, default_name, build_query):
+        super().__init__(parent)
+        self.parent_widget = parent
+        self.title = title
+        self.default_name = default_name
+        self.build_query = build_query
+        self.cancel_event = threading.Event()
+        self.progress = None
+        self.progressed.connect(self.onProgress)
+
+    def start(self):
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self.parent_widget, self.title, f"{self.default_name}.csv", ";;".join(EXPORT_FORMATS.values())
+        )
+        if not file_path:
+            self.deleteLater()
+            return False
+
+        if not os.path.splitext(file_path)[1]:
+            file_format = next(name for name, label in EXPORT_FORMATS.items() if label == selected_filter)
+            file_path = f"{file_path}.{file_format}"
+
+        self.progress = QProgressDialog("Counting rows...", "Cancel", 0, 0, self.parent_widget)
+        self.progress.setWindowTitle(self.title)
+        self.progress.setWindowModality(Qt.WindowModal)
+        self.progress.canceled.connect(self.cancel_event.set)
+        self.progress.show()
+
+        def runExport(db_session):
+            query = self.build_query(db_session)
+            total = query.order_by(None).count()
+            self.progressed.emit(0, total)
+            return export_query(
+                query, file_path, total=total, cancel_event=self.cancel_event,
+                progress_callback=lambda result: self.progressed.emit(result.rows_written, result.total)
+            )
+
+        query_executor.submit(
+            f"export:{self.title}",
+            runExport,
+            on_result=lambda result: self.onFinished(file_path, result),
+            on_error=self.onError
+        )
+        return True
+
+    def onProgress(self, rows_written, total):
+        if self.progress is None or self.cancel_event.is_set():
+            return
+        self.progress.setMaximum(total)
+        self.progress.setValue(rows_written)
+        self.progress.setLabelText(f"Exported {rows_written} of {total} rows")
+
+    def onFinished(self, file_path, result):
+        self.closeProgress()
+        if result.cancelled:
+            QMessageBox.information(self.parent_widget, self.title, "Export cancelled.")
+        else:
+            QMessageBox.information(self.parent_widget, self.title,
+                                    f"Exported {result.rows_written} rows to {file_path} "
+                                    f"in {result.elapsed:.1f}s.")
+        self.deleteLater()
+
+    def onError(self, error):
+        self.closeProgress()
+        QMessageBox.critical(self.parent_widget, "Error", f"Export failed:\n{error}")
+        self.deleteLater()
+
+    def closeProgress(self):
+        if self.progress is not None:
+            # Closing the dialog emits canceled, which must not count as a cancel
+            self.progress.canceled.disconnect(self.cancel_event.set)
+            self.progress.close()
+            self.progress = None
@@ -1,8 +1,42 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGroupBox,
+                            QDateEdit, QPushButton, QMessageBox, QComboBox, QFileDialog, QDialog)
+from PyQt5.QtCore import QDate
+from auth.permissions import current_user_can
+from services.aging_service import AGING_BUCKETS, AgingService
+from controllers.financial_controller import FinancialController
+from services.billing_service import BillingService
+from services.reconciliation_service import ReconciliationService
+from services.statement_service import generate_statements
+from ui.charts import StackedBarChartWidget
+from ui.export_runner import ExportRunner
+from utils.query_executor import query_executor
+
+# Largest balances drawn in the aging chart
+AGING_CHART_ROWS = 15
+
+# Label column shown for each aging dimension; blocks are labelled by their index
+AGING_LABEL_COLUMNS = {'resident': 'name', 'address': 'number', 'charge': 'charge'}
+
+class AgingChartDialog(QDialog):
+    """Stacked aging buckets of the largest balances, kept open and updated in place."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Receivables Aging")
+        layout = QVBoxLayout(self)
+        # matplotlib is imported here, the first time a chart is shown
+        self.chart = StackedBarChartWidget("Outstanding dues by days past due", figsize=(8, 5))
+        layout.addWidget(self.chart)
+
+    def showTable(self, table, dimension):
+        label_column = AGING_LABEL_COLUMNS.get(dimension)
+        labels = table.index if label_column is None else table[label_column].fillna("").astype(str)
+        self.chart.setData(list(labels), {bucket: table[bucket].tolist() for bucket in AGING_BUCKETS})
 
 class FinancialManagementWidget(QWidget):
     def __init__(self):
         super().__init__()
+        self.aging_chart_dialog = None
         self.initUI()
         
     def initUI(self):
@@ -12,5 +46,219 @@ class FinancialManagementWidget(QWidget):
         title.setStyleSheet("font-size: 18px; font-weight: bold; margin: 10px;")
         layout.addWidget(title)
         
-        content = QLabel("Financial Management module will be implemented here.")
-        layout.addWidget(content)
+        # Monthly billing
+        billing_group = QGroupBox("Monthly Billing")
+        billing_layout = QHBoxLayout()
+        
+        self.billing_period = QDateEdit()
+        self.billing_period.setDisplayFormat("MMMM yyyy")
+        self.billing_period.setDate(QDate.currentDate())
+        billing_layout.addWidget(QLabel("Period:"))
+        billing_layout.addWidget(self.billing_period)
+        
+        self.run_billing_btn = QPushButton("Generate Monthly Dues")
+        self.run_billing_btn.clicked.connect(self.runMonthlyBilling)
+        self.run_billing_btn.setEnabled(current_user_can('financial_management', 'can_add'))
+        billing_layout.addWidget(self.run_billing_btn)
+        billing_layout.addStretch()
+        
+        billing_group.setLayout(billing_layout)
+        layout.addWidget(billing_group)
+        
+        # Receivables aging
+        aging_group = QGroupBox("Receivables Aging")
+        aging_layout = QHBoxLayout()
+        
+        self.aging_dimension = QComboBox()
+        for label, dimension in (("Resident", "resident"), ("Address", "address"),
+                                 ("Block", "block"), ("Charge", "charge")):
+            self.aging_dimension.addItem(label, dimension)
+        aging_layout.addWidget(QLabel("Group by:"))
+        aging_layout.addWidget(self.aging_dimension)
+        
+        self.export_aging_btn = QPushButton("Export Aging Report")
+        self.export_aging_btn.clicked.connect(self.exportAgingReport)
+        aging_layout.addWidget(self.export_aging_btn)
+        
+        self.aging_chart_btn = QPushButton("Show Aging Chart")
+        self.aging_chart_btn.clicked.connect(self.showAgingChart)
+        aging_layout.addWidget(self.aging_chart_btn)
+        aging_layout.addStretch()
+        
+        aging_group.setLayout(aging_layout)
+        layout.addWidget(aging_group)
+        
+        # Ledger export
+        ledger_group = QGroupBox("Ledger")
+        ledger_layout = QHBoxLayout()
+        
+        self.ledger_status = QComboBox()
+        self.ledger_status.addItem("All Entries", None)
+        self.ledger_status.addItem("Unpaid", False)
+        self.ledger_status.addItem("Paid", True)
+        ledger_layout.addWidget(QLabel("Show:"))
+        ledger_layout.addWidget(self.ledger_status)
+        
+        export_ledger_btn = QPushButton("Export Ledger")
+        export_ledger_btn.clicked.connect(self.exportLedger)
+        ledger_layout.addWidget(export_ledger_btn)
+        ledger_layout.addStretch()
+        
+        ledger_group.setLayout(ledger_layout)
+        layout.addWidget(ledger_group)
+        
+        # Month-end statements
+        statements_group = QGroupBox("Statements")
+        statements_layout = QHBoxLayout()
+        
+        self.statement_period = QDateEdit()
+        self.statement_period.setDisplayFormat("MMMM yyyy")
+        self.statement_period.setDate(QDate.currentDate())
+        statements_layout.addWidget(QLabel("Period:"))
+        statements_layout.addWidget(self.statement_period)
+        
+        self.generate_statements_btn = QPushButton("Generate Statements")
+        self.generate_statements_btn.clicked.connect(self.generateStatements)
+        statements_layout.addWidget(self.generate_statements_btn)
+        statements_layout.addStretch()
+        
+        statements_group.setLayout(statements_layout)
+        layout.addWidget(statements_group)
+        
+        # Bank reconciliation
+        reconciliation_group = QGroupBox("Bank Reconciliation")
+        reconciliation_layout = QHBoxLayout()
+        
+        self.reconcile_btn = QPushButton("Post Bank Statement File")
+        self.reconcile_btn.clicked.connect(self.reconcileBankFile)
+        self.reconcile_btn.setEnabled(current_user_can('financial_management', 'can_edit'))
+        reconciliation_layout.addWidget(self.reconcile_btn)
+        reconciliation_layout.addStretch()
+        
+        reconciliation_group.setLayout(reconciliation_layout)
+        layout.addWidget(reconciliation_group)
+        
+        layout.addStretch()
+    
+    def runMonthlyBilling(self):
+        period = self.billing_period.date().toPyDate()
+        self.run_billing_btn.setEnabled(False)
+        query_executor.submit(
+            "monthly_billing",
+            lambda db_session: BillingService(db_session).run_monthly_billing(period),
+            on_result=lambda created: self.onBillingComplete(created, period),
+            on_error=self.onBillingFailed
+        )
+    
+    def onBillingComplete(self, created, period):
+        self.run_billing_btn.setEnabled(True)
+        QMessageBox.information(self, "Billing Complete",
+                                f"Created {created} dues for {period.strftime('%B %Y')}.")
+    
+    def onBillingFailed(self, error):
+        self.run_billing_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to generate dues: {error}")
+    
+    def exportAgingReport(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Aging Report", "aging_report.csv",
+                                                   "CSV Files (*.csv)")
+        if not file_path:
+            return
+        
+        dimension = self.aging_dimension.currentData()
+        self.export_aging_btn.setEnabled(False)
+        query_executor.submit(
+            "aging_export",
+            lambda db_session: AgingService(db_session).build_report().to_csv(file_path, dimension),
+            on_result=lambda _: self.onAgingExported(file_path),
+            on_error=self.onAgingExportFailed
+        )
+    
+    def onAgingExported(self, file_path):
+        self.export_aging_btn.setEnabled(True)
+        QMessageBox.information(self, "Export Complete", f"Aging report saved to {file_path}.")
+    
+    def onAgingExportFailed(self, error):
+        self.export_aging_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to export aging report: {error}")
+    
+    def showAgingChart(self):
+        dimension = self.aging_dimension.currentData()
+        self.aging_chart_btn.setEnabled(False)
+        query_executor.submit(
+            "aging_chart",
+            lambda db_session: AgingService(db_session).build_report().by(dimension).head(AGING_CHART_ROWS),
+            on_result=lambda table: self.onAgingChartReady(table, dimension),
+            on_error=self.onAgingChartFailed
+        )
+    
+    def onAgingChartReady(self, table, dimension):
+        self.aging_chart_btn.setEnabled(True)
+        if self.aging_chart_dialog is None:
+            self.aging_chart_dialog = AgingChartDialog(self)
+        self.aging_chart_dialog.showTable(table, dimension)
+        self.aging_chart_dialog.show()
+        self.aging_chart_dialog.raise_()
+    
+    def onAgingChartFailed(self, error):
+        self.aging_chart_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to build aging chart: {error}")
+    
+    def exportLedger(self):
+        filters = {'is_paid': self.ledger_status.currentData()}
+        ExportRunner(
+            self, "Export Ledger", "ledger",
+            lambda db_session: FinancialController(db_session).get_ledger_export_query(filters)
+        ).start()
+    
+    def generateStatements(self):
+        output_dir = QFileDialog.getExistingDirectory(self, "Save Statements To")
+        if not output_dir:
+            return
+        
+        period = self.statement_period.date().toPyDate()
+        self.generate_statements_btn.setEnabled(False)
+        query_executor.submit(
+            "statements",
+            lambda db_session: generate_statements(period, output_dir, db_session=db_session),
+            on_result=lambda written: self.onStatementsGenerated(written, output_dir),
+            on_error=self.onStatementsFailed
+        )
+    
+    def onStatementsGenerated(self, written, output_dir):
+        self.generate_statements_btn.setEnabled(True)
+        QMessageBox.information(self, "Statements Complete", f"Wrote {written} statements to {output_dir}.")
+    
+    def onStatementsFailed(self, error):
+        self.generate_statements_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to generate statements: {error}")
+    
+    def reconcileBankFile(self):
+        bank_file, _ = QFileDialog.getOpenFileName(self, "Open Bank Statement", "", "CSV Files (*.csv)")
+        if not bank_file:
+            return
+        report_path, _ = QFileDialog.getSaveFileName(self, "Save Unmatched Lines", "unmatched_payments.csv",
+                                                     "CSV Files (*.csv)")
+        if not report_path:
+            return
+        
+        self.reconcile_btn.setEnabled(False)
+        query_executor.submit(
+            "reconciliation",
+            lambda db_session: ReconciliationService(db_session).reconcile(bank_file, report_path),
+            on_result=lambda result: self.onReconciled(result, report_path),
+            on_error=self.onReconcileFailed
+        )
+    
+    def onReconciled(self, result, report_path):
+        self.reconcile_btn.setEnabled(True)
+        QMessageBox.information(
+            self, "Reconciliation Complete",
+            f"Read {result.lines_read} lines and marked {result.posted} dues paid "
+            f"({result.matched_by_reference} by reference, {result.matched_by_resident} by resident).\n"
+            f"{result.unmatched} unmatched lines were written to {report_path}."
+        )
+    
+    def onReconcileFailed(self, error):
+        self.reconcile_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to reconcile bank file: {error}")
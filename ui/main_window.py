@@ -1,12 +1,76 @@
+import importlib
+import logging
+import time
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QStackedWidget, QLabel, QFrame)
-from PyQt5.QtCore import Qt, QSize
+                            QStackedWidget, QLabel, QFrame, QPushButton)
+from PyQt5.QtCore import Qt, QSize, QTimer
 from PyQt5.QtGui import QIcon, QFont
+from config import MODULE_WARMUP, MODULE_WARMUP_DELAY
+
+logger = logging.getLogger(__name__)
+
+# Sidebar modules: (title, module path, widget class, permission module or None)
+MODULES = [
+    ("Dashboard", "ui.dashboard", "DashboardWidget", "dashboard"),
+    ("Address Management", "ui.address_management", "AddressManagementWidget", "address_management"),
+    ("Resident Management", "ui.resident_management", "ResidentManagementWidget", "resident_management"),
+    ("Financial Management", "ui.financial_management", "FinancialManagementWidget", "financial_management"),
+    ("Complaint Management", "ui.complaint_management", "ComplaintManagementWidget", "complaint_management"),
+    ("User Management", "ui.user_management", "UserManagementWidget", "user_management"),
+    # Query timings expose statements from every module, so administrators only
+    ("Diagnostics", "ui.diagnostics", "DiagnosticsWidget", "user_management"),
+]
+
+class LazyModuleRegistry:
+    """Keeps a placeholder page per module and builds the real widget on first use."""
+    
+    def __init__(self, stack):
+        self.stack = stack
+        self.entries = []
+        self.widgets = {}
+    
+    def register(self, title, module_path, class_name):
+        placeholder = QLabel(f"Loading {title}...")
+        placeholder.setAlignment(Qt.AlignCenter)
+        self.stack.addWidget(placeholder)
+        self.entries.append((title, module_path, class_name))
+        return len(self.entries) - 1
+    
+    def isBuilt(self, index):
+        return index in self.widgets
+    
+    def build(self, index):
+        if index in self.widgets:
+            return self.widgets[index]
+        
+        title, module_path, class_name = self.entries[index]
+        started = time.perf_counter()
+        widget_class = getattr(importlib.import_module(module_path), class_name)
+        widget = widget_class()
+        logger.info("Built %s in %.0f ms", title, (time.perf_counter() - started) * 1000)
+        
+        # Swap the placeholder for the real widget at the same stack index
+        was_current = self.stack.currentIndex() == index
+        placeholder = self.stack.widget(index)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stack.insertWidget(index, widget)
+        if was_current:
+            self.stack.setCurrentIndex(index)
+        
+        self.widgets[index] = widget
+        return widget
+    
+    def show(self, index):
+        self.build(index)
+        self.stack.setCurrentIndex(index)
 
 class MainWindow(QMainWindow):
-    def __init__(self, user):
+    def __init__(self, user, started_at=None):
         super().__init__()
         self.user = user
+        self.started_at = started_at or time.perf_counter()
+        self.first_paint_done = False
         self.initUI()
         
     def initUI(self):
@@ -27,6 +91,7 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.content_stack, 1)
         
         # Add modules to stack based on user permissions
+        self.modules = LazyModuleRegistry(self.content_stack)
         self.loadModules()
         
         # Set default module to dashboard
@@ -84,55 +149,52 @@ class MainWindow(QMainWindow):
         return sidebar
     
     def loadModules(self):
-        # This would load modules based on user permissions
-        # For now, we'll add placeholder modules
-        
-        # Dashboard
-        from .dashboard import DashboardWidget
-        dashboard = DashboardWidget()
-        self.content_stack.addWidget(dashboard)
-        self.addSidebarButton("Dashboard", 0)
-        
-        # Address Management
-        from .address_management import AddressManagementWidget
-        address_mgmt = AddressManagementWidget()
-        self.content_stack.addWidget(address_mgmt)
-        self.addSidebarButton("Address Management", 1)
-        
-        # Resident Management
-        from .resident_management import ResidentManagementWidget
-        resident_mgmt = ResidentManagementWidget()
-        self.content_stack.addWidget(resident_mgmt)
-        self.addSidebarButton("Resident Management", 2)
-        
-        # Financial Management
-        from .financial_management import FinancialManagementWidget
-        financial_mgmt = FinancialManagementWidget()
-        self.content_stack.addWidget(financial_mgmt)
-        self.addSidebarButton("Financial Management", 3)
-        
-        # Complaint Management
-        from .complaint_management import ComplaintManagementWidget
-        complaint_mgmt = ComplaintManagementWidget()
-        self.content_stack.addWidget(complaint_mgmt)
-        self.addSidebarButton("Complaint Management", 4)
-        
-        # User Management (only for admins)
-        if self.user.has_permission("user_management", "can_view"):
-            from .user_management import UserManagementWidget
-            user_mgmt = UserManagementWidget()
-            self.content_stack.addWidget(user_mgmt)
-            self.addSidebarButton("User Management", 5)
+        # Only placeholders are created here; each widget is built on first use
+        for title, module_path, class_name, permission_module in MODULES:
+            if permission_module and not self.user.has_permission(permission_module, "can_view"):
+                continue
+            index = self.modules.register(title, module_path, class_name)
+            self.addSidebarButton(title, index)
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            logger.info("Startup: first paint after %.0f ms", (time.perf_counter() - self.started_at) * 1000)
+            # Build the default module once the window is already on screen
+            QTimer.singleShot(0, self.showDefaultModule)
+    
+    def showDefaultModule(self):
+        if not self.modules.entries:
+            return
+        self.modules.show(0)
+        logger.info("Startup: %s ready after %.0f ms", self.modules.entries[0][0],
+                    (time.perf_counter() - self.started_at) * 1000)
+        if MODULE_WARMUP:
+            QTimer.singleShot(MODULE_WARMUP_DELAY, self.warmUpNextModule)
+    
+    def warmUpNextModule(self):
+        # One module per event-loop turn so the window stays responsive
+        for index in range(len(self.modules.entries)):
+            if not self.modules.isBuilt(index):
+                self.modules.build(index)
+                QTimer.singleShot(0, self.warmUpNextModule)
+                return
+        logger.info("Startup: all modules built after %.0f ms", (time.perf_counter() - self.started_at) * 1000)
     
     def addSidebarButton(self, text, index):
         btn = QPushButton(text)
-        btn.clicked.connect(lambda: self.content_stack.setCurrentIndex(index))
+        btn.clicked.connect(lambda: self.modules.show(index))
         self.sidebar.layout().insertWidget(len(self.sidebar_buttons) + 2, btn)  # +2 for title and user label
         self.sidebar_buttons.append(btn)
     
     def logout(self):
         # Close current window and show login dialog
         from auth.login import LoginDialog
+        from auth.permissions import permission_resolver
+        from auth.session import session_manager
+        permission_resolver.invalidate(self.user.id)
+        session_manager.logout()
         self.close()
         login_dialog = LoginDialog()
         if login_dialog.exec_():
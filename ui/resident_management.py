@@ -1,16 +1,30 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                            QTableWidgetItem, QPushButton, QLineEdit, QLabel, 
+                            QTableWidgetItem, QTableView, QPushButton, QLineEdit, QLabel, 
                             QComboBox, QGroupBox, QFormLayout, QDialog, QDateEdit,
-                            QMessageBox, QHeaderView, QTabWidget, QFrame)
-from PyQt5.QtCore import Qt, QDate
+                            QMessageBox, QHeaderView, QTabWidget, QFrame, QCheckBox)
+from PyQt5.QtCore import Qt, QDate, QTimer
+from auth.permissions import current_user_can
+from config import LIVE_SEARCH_DEBOUNCE
 from controllers.resident_controller import ResidentController
 from controllers.address_controller import AddressController
+from database.search import supports_full_text_search
+from ui.export_runner import ExportRunner
+from services.statement_service import StatementService
+from ui.table_models import ResidentTableModel, RowTableModel
+from utils.filters import IncrementalFilter, TextMatcher
+from utils.query_executor import query_executor
 
 class ResidentManagementWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.controller = ResidentController()
         self.address_controller = AddressController()
+        # Same matching as the database: word prefixes with the full-text index, substrings without
+        mode = 'prefix' if supports_full_text_search(self.controller.session) else 'substring'
+        self.live_filter = IncrementalFilter({
+            'name': TextMatcher(1, mode),
+            'contact_number': TextMatcher(2, mode)
+        })
         self.initUI()
         self.loadResidents()
         
@@ -52,6 +66,14 @@ class ResidentManagementWidget(QWidget):
         filter_layout.addWidget(QLabel("Address:"))
         filter_layout.addWidget(self.address_filter)
         
+        # Filter as the user types, once typing pauses
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(LIVE_SEARCH_DEBOUNCE)
+        self.filter_timer.timeout.connect(self.applyFilter)
+        for line_edit in (self.name_filter, self.contact_filter, self.address_filter):
+            line_edit.textChanged.connect(self.filter_timer.start)
+        
         # Apply filter button
         apply_filter_btn = QPushButton("Apply Filter")
         apply_filter_btn.clicked.connect(self.applyFilter)
@@ -70,30 +92,45 @@ class ResidentManagementWidget(QWidget):
         
         add_btn = QPushButton("Add Resident")
         add_btn.clicked.connect(self.showAddDialog)
+        add_btn.setEnabled(current_user_can('resident_management', 'can_add'))
         buttons_layout.addWidget(add_btn)
         
         edit_btn = QPushButton("Edit Resident")
         edit_btn.clicked.connect(self.showEditDialog)
+        edit_btn.setEnabled(current_user_can('resident_management', 'can_edit'))
         buttons_layout.addWidget(edit_btn)
         
         delete_btn = QPushButton("Delete Resident")
         delete_btn.clicked.connect(self.deleteResident)
+        delete_btn.setEnabled(current_user_can('resident_management', 'can_delete'))
         buttons_layout.addWidget(delete_btn)
         
         allot_btn = QPushButton("Allot Address")
         allot_btn.clicked.connect(self.showAllotDialog)
+        allot_btn.setEnabled(current_user_can('resident_management', 'can_edit'))
         buttons_layout.addWidget(allot_btn)
         
+        ledger_btn = QPushButton("View Ledger")
+        ledger_btn.clicked.connect(self.showLedgerDialog)
+        ledger_btn.setEnabled(current_user_can('financial_management', 'can_view'))
+        buttons_layout.addWidget(ledger_btn)
+        
+        export_btn = QPushButton("Export")
+        export_btn.clicked.connect(self.exportResidents)
+        buttons_layout.addWidget(export_btn)
+        
         buttons_layout.addStretch()
         residents_layout.addLayout(buttons_layout)
         
-        # Table for residents
-        self.resident_table = QTableWidget()
-        self.resident_table.setColumnCount(7)
-        self.resident_table.setHorizontalHeaderLabels(["ID", "Name", "Contact", "Email", "Emergency Contact", "ID Proof", "Move-in Date"])
+        # Table for residents (rows are paged in lazily by the model)
+        self.resident_model = ResidentTableModel(self.controller, parent=self)
+        self.resident_table = QTableView()
+        self.resident_table.setModel(self.resident_model)
         self.resident_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.resident_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.resident_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.resident_table.verticalHeader().setVisible(False)
+        self.resident_table.setSelectionBehavior(QTableView.SelectRows)
+        self.resident_table.setSelectionMode(QTableView.SingleSelection)
+        self.resident_table.setEditTriggers(QTableView.NoEditTriggers)
         residents_layout.addWidget(self.resident_table)
         
         # Allotment tab
@@ -118,6 +155,10 @@ class ResidentManagementWidget(QWidget):
         allotment_filter_layout.addWidget(QLabel("Block:"))
         allotment_filter_layout.addWidget(self.allotment_block_filter)
         
+        # Free floors instead of allotments
+        self.vacant_floors_filter = QCheckBox("Vacant floors only")
+        allotment_filter_layout.addWidget(self.vacant_floors_filter)
+        
         # Apply allotment filter button
         apply_allotment_filter_btn = QPushButton("Apply Filter")
         apply_allotment_filter_btn.clicked.connect(self.applyAllotmentFilter)
@@ -154,55 +195,81 @@ class ResidentManagementWidget(QWidget):
         for address in addresses:
             self.allotment_address_filter.addItem(f"{address.number}, {address.block.value} Block", address.id)
     
-    def loadResidents(self):
-        residents = self.controller.get_all_residents()
-        self.populateResidentTable(residents)
+    def loadResidents(self, filters=None):
+        filters = dict(filters or {})
+        self.live_filter.forget()
+        # Only the first page is read here; the model pages in the rest as the view scrolls
+        page_size = self.resident_model.page_size
+        query_executor.submit(
+            "residents",
+            lambda db_session: ResidentController(db_session).get_resident_rows(filters, limit=page_size),
+            on_result=lambda rows: self.showResidents(filters, rows),
+            on_error=lambda error: QMessageBox.critical(self, "Error", f"Failed to load residents:\n{error}")
+        )
     
-    def populateResidentTable(self, residents):
-        self.resident_table.setRowCount(0)
-        for row, resident in enumerate(residents):
-            self.resident_table.insertRow(row)
-            self.resident_table.setItem(row, 0, QTableWidgetItem(str(resident.id)))
-            self.resident_table.setItem(row, 1, QTableWidgetItem(resident.name))
-            self.resident_table.setItem(row, 2, QTableWidgetItem(resident.contact_number))
-            self.resident_table.setItem(row, 3, QTableWidgetItem(resident.email))
-            self.resident_table.setItem(row, 4, QTableWidgetItem(resident.emergency_contact))
-            self.resident_table.setItem(row, 5, QTableWidgetItem(resident.id_proof_number))
-            
-            move_in_date = resident.move_in_date.strftime("%Y-%m-%d") if resident.move_in_date else ""
-            self.resident_table.setItem(row, 6, QTableWidgetItem(move_in_date))
+    def showResidents(self, filters, rows):
+        if len(rows) < self.resident_model.page_size:
+            # Every match is in hand, so stricter filters can narrow these rows
+            self.live_filter.remember(filters, rows)
+        self.resident_model.setFilters(filters, rows)
+    
+    def exportResidents(self):
+        # Same criteria as the rows currently shown
+        filters = dict(self.resident_model.filters)
+        ExportRunner(
+            self, "Export Residents", "residents",
+            lambda db_session: ResidentController(db_session).get_resident_export_query(filters)
+        ).start()
+    
+    def selectedResidentId(self):
+        index = self.resident_table.currentIndex()
+        if index.isValid():
+            return self.resident_model.residentId(index.row())
+        return None
     
     def loadAllotments(self):
-        # This would load all address-floor-resident relationships
-        # For simplicity, we'll just load floors with residents
-        from database.models import Floor, Address, Resident
-        
-        floors_with_residents = self.controller.session.query(
-            Floor, Address, Resident
-        ).join(
-            Address, Floor.address_id == Address.id
-        ).join(
-            Resident, Floor.id == Resident.floor_id
-        ).filter(
-            Resident.is_active == True
-        ).all()
+        address_id = self.allotment_address_filter.currentData()
+        block = self.allotment_block_filter.currentText()
+        if block == "All Blocks":
+            block = None
+        
+        if self.vacant_floors_filter.isChecked():
+            self.loadVacantFloors(address_id, block)
+            return
+        
+        # One joined query for every address-floor-resident row
+        allotments = self.controller.get_allotment_rows(address_id, block)
         
         self.allotment_table.setRowCount(0)
-        for row, (floor, address, resident) in enumerate(floors_with_residents):
-            self.allotment_table.insertRow(row)
-            self.allotment_table.setItem(row, 0, QTableWidgetItem(f"{address.number}"))
-            self.allotment_table.setItem(row, 1, QTableWidgetItem(address.block.value))
-            self.allotment_table.setItem(row, 2, QTableWidgetItem(str(floor.floor_number)))
-            self.allotment_table.setItem(row, 3, QTableWidgetItem(resident.name))
+        self.allotment_table.setRowCount(len(allotments))
+        can_remove = current_user_can('resident_management', 'can_edit')
+        for row, (floor_id, address_id, number, block, floor_number, resident_id, name) in enumerate(allotments):
+            self.allotment_table.setItem(row, 0, QTableWidgetItem(number))
+            self.allotment_table.setItem(row, 1, QTableWidgetItem(block))
+            self.allotment_table.setItem(row, 2, QTableWidgetItem(str(floor_number)))
+            self.allotment_table.setItem(row, 3, QTableWidgetItem(name))
             
             # Add remove button
             remove_btn = QPushButton("Remove")
-            remove_btn.setProperty("floor_id", floor.id)
-            remove_btn.setProperty("resident_id", resident.id)
+            remove_btn.setProperty("address_id", address_id)
+            remove_btn.setProperty("resident_id", resident_id)
             remove_btn.clicked.connect(self.removeAllotment)
+            remove_btn.setEnabled(can_remove)
             
             self.allotment_table.setCellWidget(row, 4, remove_btn)
     
+    def loadVacantFloors(self, address_id, block):
+        # Served by the occupancy index, no resident join
+        floors = self.address_controller.get_vacant_floor_rows(address_id, block)
+        
+        self.allotment_table.setRowCount(0)
+        self.allotment_table.setRowCount(len(floors))
+        for row, (floor_id, address_id, number, block, floor_number) in enumerate(floors):
+            self.allotment_table.setItem(row, 0, QTableWidgetItem(number))
+            self.allotment_table.setItem(row, 1, QTableWidgetItem(block))
+            self.allotment_table.setItem(row, 2, QTableWidgetItem(str(floor_number)))
+            self.allotment_table.setItem(row, 3, QTableWidgetItem("Vacant"))
+    
     def applyFilter(self):
         filters = {}
         if self.name_filter.text():
@@ -212,23 +279,30 @@ class ResidentManagementWidget(QWidget):
         if self.address_filter.text():
             filters['address'] = self.address_filter.text()
         
-        filtered_residents = self.controller.filter_residents(filters)
-        self.populateResidentTable(filtered_residents)
+        self.filter_timer.stop()
+        rows = self.live_filter.narrow(filters)
+        if rows is None:
+            self.loadResidents(filters)
+        else:
+            # Stricter than the rows on screen: no query, and any query still running is dropped
+            query_executor.cancel("residents")
+            self.resident_model.setRows(filters, rows, complete=True)
     
     def resetFilter(self):
-        self.name_filter.clear()
-        self.contact_filter.clear()
-        self.address_filter.clear()
+        for line_edit in (self.name_filter, self.contact_filter, self.address_filter):
+            line_edit.blockSignals(True)
+            line_edit.clear()
+            line_edit.blockSignals(False)
+        self.filter_timer.stop()
         self.loadResidents()
     
     def applyAllotmentFilter(self):
-        # This would implement filtering for the allotment table
-        # For simplicity, we'll just reload all allotments
         self.loadAllotments()
     
     def resetAllotmentFilter(self):
         self.allotment_address_filter.setCurrentIndex(0)
         self.allotment_block_filter.setCurrentIndex(0)
+        self.vacant_floors_filter.setChecked(False)
         self.loadAllotments()
     
     def onTabChanged(self, index):
@@ -242,9 +316,8 @@ class ResidentManagementWidget(QWidget):
             self.loadResidents()
     
     def showEditDialog(self):
-        selected_row = self.resident_table.currentRow()
-        if selected_row >= 0:
-            resident_id = int(self.resident_table.item(selected_row, 0).text())
+        resident_id = self.selectedResidentId()
+        if resident_id is not None:
             resident = self.controller.get_resident_by_id(resident_id)
             
             dialog = ResidentDialog(self, resident)
@@ -255,9 +328,8 @@ class ResidentManagementWidget(QWidget):
             QMessageBox.warning(self, "No Selection", "Please select a resident to edit.")
     
     def deleteResident(self):
-        selected_row = self.resident_table.currentRow()
-        if selected_row >= 0:
-            resident_id = int(self.resident_table.item(selected_row, 0).text())
+        resident_id = self.selectedResidentId()
+        if resident_id is not None:
             
             reply = QMessageBox.question(self, "Confirm Delete", 
                                         "Are you sure you want to delete this resident?",
@@ -269,9 +341,8 @@ class ResidentManagementWidget(QWidget):
             QMessageBox.warning(self, "No Selection", "Please select a resident to delete.")
     
     def showAllotDialog(self):
-        selected_row = self.resident_table.currentRow()
-        if selected_row >= 0:
-            resident_id = int(self.resident_table.item(selected_row, 0).text())
+        resident_id = self.selectedResidentId()
+        if resident_id is not None:
             resident = self.controller.get_resident_by_id(resident_id)
             
             dialog = AllotmentDialog(self, resident, self.address_controller)
@@ -285,23 +356,27 @@ class ResidentManagementWidget(QWidget):
         else:
             QMessageBox.warning(self, "No Selection", "Please select a resident to allot an address.")
     
+    def showLedgerDialog(self):
+        index = self.resident_table.currentIndex()
+        resident = self.resident_model.rowData(index.row()) if index.isValid() else None
+        if resident is not None:
+            LedgerDialog(self, resident[0], resident[1]).exec_()
+        else:
+            QMessageBox.warning(self, "No Selection", "Please select a resident to view the ledger.")
+    
     def removeAllotment(self):
         button = self.sender()
         if button:
-            floor_id = button.property("floor_id")
+            address_id = button.property("address_id")
             resident_id = button.property("resident_id")
             
-            if floor_id and resident_id:
+            if address_id and resident_id:
                 reply = QMessageBox.question(self, "Confirm Remove", 
                                             "Are you sure you want to remove this allotment?",
                                             QMessageBox.Yes | QMessageBox.No)
                 if reply == QMessageBox.Yes:
-                    # Get the address associated with the floor
-                    from database.models import Floor
-                    floor = self.controller.session.query(Floor).filter(Floor.id == floor_id).first()
-                    if floor:
-                        self.controller.remove_address_from_resident(resident_id, floor.address_id)
-                        self.loadAllotments()
+                    self.controller.remove_address_from_resident(resident_id, address_id)
+                    self.loadAllotments()
 
 class ResidentDialog(QDialog):
     def __init__(self, parent=None, resident=None):
@@ -383,6 +458,7 @@ class AllotmentDialog(QDialog):
         self.address_controller = address_controller
         self.selected_address_id = None
         self.selected_floor_id = None
+        self.floors_by_address = {}
         self.initUI()
     
     def initUI(self):
@@ -398,9 +474,10 @@ class AllotmentDialog(QDialog):
         address_group = QGroupBox("Select Address")
         address_layout = QVBoxLayout()
         
+        # Both combos exist before onAddressChanged can run, as it fills the floor combo
         self.address_combo = QComboBox()
+        self.floor_combo = QComboBox()
         self.populateAddresses()
-        self.address_combo.currentIndexChanged.connect(self.onAddressChanged)
         address_layout.addWidget(self.address_combo)
         
         address_group.setLayout(address_layout)
@@ -409,13 +486,14 @@ class AllotmentDialog(QDialog):
         # Floor selection
         floor_group = QGroupBox("Select Floor")
         floor_layout = QVBoxLayout()
-        
-        self.floor_combo = QComboBox()
         floor_layout.addWidget(self.floor_combo)
         
         floor_group.setLayout(floor_layout)
         layout.addWidget(floor_group)
         
+        self.address_combo.currentIndexChanged.connect(self.onAddressChanged)
+        self.onAddressChanged(self.address_combo.currentIndex())
+        
         # Buttons
         buttons_layout = QHBoxLayout()
         allot_btn = QPushButton("Allot")
@@ -428,9 +506,10 @@ class AllotmentDialog(QDialog):
         layout.addLayout(buttons_layout)
     
     def populateAddresses(self):
-        addresses = self.address_controller.get_all_addresses()
-        for address in addresses:
-            self.address_combo.addItem(f"{address.number}, {address.block.value} Block", address.id)
+        # Free floors are loaded once with the addresses so changing the combo is query-free
+        self.floors_by_address = self.address_controller.get_free_floors()
+        for address_id, _, number, _, block, _ in self.address_controller.get_address_rows():
+            self.address_combo.addItem(f"{number}, {block} Block", address_id)
     
     def onAddressChanged(self, index):
         if index >= 0:
@@ -439,10 +518,8 @@ class AllotmentDialog(QDialog):
             
             # Populate floors for this address
             self.floor_combo.clear()
-            floors = self.address_controller.get_floors_by_address(address_id)
-            
-            for floor in floors:
-                self.floor_combo.addItem(f"Floor {floor.floor_number}", floor.id)
+            for floor_number, floor_id in self.floors_by_address.get(address_id, []):
+                self.floor_combo.addItem(f"Floor {floor_number}", floor_id)
         else:
             self.selected_address_id = None
             self.floor_combo.clear()
@@ -454,3 +531,62 @@ class AllotmentDialog(QDialog):
         if self.floor_combo.currentIndex() >= 0:
             return self.floor_combo.currentData()
         return None
+
+class LedgerDialog(QDialog):
+    def __init__(self, parent, resident_id, resident_name):
+        super().__init__(parent)
+        self.resident_id = resident_id
+        self.setWindowTitle(f"Ledger - {resident_name}")
+        self.resize(800, 500)
+        self.initUI()
+        self.loadStatement()
+    
+    def initUI(self):
+        layout = QVBoxLayout(self)
+        
+        period_layout = QHBoxLayout()
+        self.period = QDateEdit()
+        self.period.setDisplayFormat("MMMM yyyy")
+        self.period.setDate(QDate.currentDate())
+        self.period.dateChanged.connect(self.loadStatement)
+        period_layout.addWidget(QLabel("Period:"))
+        period_layout.addWidget(self.period)
+        period_layout.addStretch()
+        layout.addLayout(period_layout)
+        
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        
+        self.ledger_model = RowTableModel(["Date", "Record", "Description", "Debit", "Credit", "Balance"], parent=self)
+        ledger_table = QTableView()
+        ledger_table.setModel(self.ledger_model)
+        ledger_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        ledger_table.verticalHeader().setVisible(False)
+        ledger_table.setEditTriggers(QTableView.NoEditTriggers)
+        layout.addWidget(ledger_table)
+        
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
+    
+    def loadStatement(self):
+        period = self.period.date().toPyDate()
+        resident_id = self.resident_id
+        query_executor.submit(
+            "ledger",
+            lambda db_session: StatementService(db_session).build_statement(period, resident_id=resident_id),
+            on_result=self.showStatement,
+            on_error=lambda error: QMessageBox.critical(self, "Error", f"Failed to load ledger:\n{error}")
+        )
+    
+    def showStatement(self, statement):
+        self.summary_label.setText(
+            f"Opening: {statement.opening:.2f}    Charges: {statement.charges:.2f}    "
+            f"Payments: {statement.payments:.2f}    Closing: {statement.closing:.2f}    "
+            f"Paid: {statement.paid:.2f}    Unpaid: {statement.unpaid:.2f}"
+        )
+        self.ledger_model.setRows([
+            (date.strftime("%Y-%m-%d"), record_id, charge, f"{debit:.2f}" if debit else "",
+             f"{credit:.2f}" if credit else "", f"{balance:.2f}")
+            for date, record_id, charge, debit, credit, balance in statement.entries
+        ])
@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+
+class ResidentTableModel(QAbstractTableModel):
+    """Lazy resident table that pages rows in from the database as the view scrolls.
+
+    Rows are fetched in keyset pages (ordered by resident id) and kept as plain
+    tuples. Only the most recently used pages stay in memory; an evicted page is
+    re-read from its starting id the next time the view paints one of its rows.
+    """
+
+    HEADERS = ["ID", "Name", "Contact", "Email", "Emergency Contact", "ID Proof", "Move-in Date"]
+
+    def __init__(self, controller, page_size=200, max_cached_pages=10, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.page_size = page_size
+        self.max_cached_pages = max_cached_pages
+        self.filters = {}
+        self._reset_state()
+
+    def _reset_state(self):
+        # _page_starts[i] is the id page i is fetched after (None for the first page)
+        self._page_starts = [None]
+        self._pages = OrderedDict()
+        self._loaded_rows = 0
+        self._exhausted = False
+
+    def setFilters(self, filters, first_page=None):
+        """Reset the model to ``filters``.
+
+        ``first_page`` may carry rows already fetched off the GUI thread so the
+        reset does not have to query the database again.
+        """
+        self.beginResetModel()
+        self.filters = dict(filters)
+        self._reset_state()
+        self.endResetModel()
+        self.fetchMore(QModelIndex(), first_page)
+
+    def setRows(self, filters, rows, complete):
+        """Reset the model to ``filters`` with ``rows`` already in hand.
+
+        ``rows`` may span several pages. Unless ``complete``, later pages are
+        fetched from the database after the last row as the view scrolls.
+        """
+        self.beginResetModel()
+        self.filters = dict(filters)
+        self._reset_state()
+        pages = [rows[start:start + self.page_size] for start in range(0, len(rows), self.page_size)]
+        for page_index, page in enumerate(pages):
+            if page_index < len(pages) - 1 or not complete:
+                self._page_starts.append(page[-1][0])
+        # Cached last to first so the pages the view shows first are the ones kept
+        for page_index in reversed(range(len(pages))):
+            self._cache_page(page_index, pages[page_index])
+        self._loaded_rows = len(rows)
+        self._exhausted = complete or not rows
+        self.endResetModel()
+
+    def refresh(self):
+        self.setFilters(self.filters)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return QVariant()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex(), rows=None):
+        if parent.isValid() or self._exhausted:
+            return
+
+        page_index = len(self._page_starts) - 1
+        if rows is None:
+            rows = self._load_page(page_index)
+        else:
+            self._cache_page(page_index, rows)
+
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        else:
+            self._page_starts.append(rows[-1][0])
+
+        if rows:
+            self.beginInsertRows(QModelIndex(), self._loaded_rows, self._loaded_rows + len(rows) - 1)
+            self._loaded_rows += len(rows)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+
+        row = self.rowData(index.row())
+        if row is None:
+            return QVariant()
+
+        value = row[index.column()]
+        if value is None:
+            return ""
+        if index.column() == 6:
+            return value.strftime("%Y-%m-%d")
+        return str(value)
+
+    def rowData(self, row):
+        page_index, offset = divmod(row, self.page_size)
+        if row < 0 or page_index >= len(self._page_starts):
+            return None
+
+        rows = self._pages.get(page_index)
+        if rows is None:
+            rows = self._load_page(page_index)
+        else:
+            self._pages.move_to_end(page_index)
+
+        return rows[offset] if offset < len(rows) else None
+
+    def residentId(self, row):
+        resident = self.rowData(row)
+        return resident[0] if resident else None
+
+    def _load_page(self, page_index):
+        rows = self.controller.get_resident_rows(
+            self.filters,
+            after_id=self._page_starts[page_index],
+            limit=self.page_size
+        )
+        self._cache_page(page_index, rows)
+        return rows
+
+    def _cache_page(self, page_index, rows):
+        self._pages[page_index] = rows
+        while len(self._pages) > self.max_cached_pages:
+            self._pages.popitem(last=False)
+
+class RowTableModel(QAbstractTableModel):
+    """Read-only table over a list of plain row tuples.
+
+    Replacing the rows is a single model reset, so the view only builds the
+    cells it paints however many rows there are.
+    """
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.rows = []
+
+    def setRows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowData(self, row):
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return QVariant()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        value = self.rows[index.row()][index.column()]
+        return "" if value is None else str(value)
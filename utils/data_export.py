@@ -0,0 +1,163 @@
+import csv
+import enum
+import itertools
+import os
+import time
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+EXPORT_FORMATS = {
+    'csv': "CSV Files (*.csv)",
+    'xlsx': "Excel Workbooks (*.xlsx)",
+    'parquet': "Parquet Files (*.parquet)",
+}
+
+class ExportResult:
+    """Running totals for a streaming export."""
+
+    def __init__(self, total=None):
+        self.rows_written = 0
+        self.total = total
+        self.cancelled = False
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_written / self.elapsed if self.elapsed else 0.0
+
+def export_query(query, file_path, file_format=None, chunk_size=5000, total=None,
+                 progress_callback=None, cancel_event=None):
+    """Stream the rows of a column query to a CSV, XLSX or Parquet file.
+
+    Rows are fetched ``chunk_size`` at a time with ``yield_per`` and written
+    as they arrive, so memory use does not depend on the number of rows. The
+    format defaults to the file extension. ``progress_callback`` is called with
+    the running ``ExportResult`` after every chunk. Setting ``cancel_event``
+    (a ``threading.Event``) stops the export after the current chunk and
+    removes the partial file.
+    """
+    file_format = (file_format or os.path.splitext(file_path)[1].lstrip('.')).lower()
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+    columns = [(column['name'], column['type']) for column in query.column_descriptions]
+    writer = _WRITERS[file_format](file_path, columns)
+    result = ExportResult(total)
+    enum_columns = [index for index, (_, column_type) in enumerate(columns)
+                    if isinstance(getattr(column_type, 'enum_class', None), type)]
+
+    rows = iter(query.yield_per(chunk_size))
+    try:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                result.cancelled = True
+                break
+
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            if enum_columns:
+                chunk = [_enum_values(row, enum_columns) for row in chunk]
+            writer.write(chunk)
+
+            result.rows_written += len(chunk)
+            result.elapsed = time.perf_counter() - result.started_at
+            if progress_callback:
+                progress_callback(result)
+    except BaseException:
+        writer.close()
+        _remove(file_path)
+        raise
+
+    writer.close()
+    if result.cancelled:
+        _remove(file_path)
+    result.elapsed = time.perf_counter() - result.started_at
+    return result
+
+def _enum_values(row, enum_columns):
+    row = list(row)
+    for index in enum_columns:
+        if isinstance(row[index], enum.Enum):
+            row[index] = row[index].value
+    return row
+
+def _remove(file_path):
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+# Writers
+
+class _CSVWriter:
+    def __init__(self, file_path, columns):
+        self.file = open(file_path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class _XLSXWriter:
+    def __init__(self, file_path, columns):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("Exporting to XLSX requires openpyxl (pip install openpyxl)") from None
+
+        # Write-only workbooks flush rows to disk instead of keeping them in memory
+        self.file_path = file_path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.sheet.append([name for name, _ in columns])
+
+    def write(self, rows):
+        for row in rows:
+            self.sheet.append(tuple(row))
+
+    def close(self):
+        self.workbook.save(self.file_path)
+
+class _ParquetWriter:
+    def __init__(self, file_path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Exporting to Parquet requires pyarrow (pip install pyarrow)") from None
+
+        self.pa = pa
+        self.schema = pa.schema([(name, _arrow_type(pa, column_type)) for name, column_type in columns])
+        # Each chunk becomes one row group
+        self.writer = pq.ParquetWriter(file_path, self.schema)
+
+    def write(self, rows):
+        arrays = [
+            self.pa.array(values, type=field.type)
+            for values, field in zip(zip(*rows), self.schema)
+        ]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+def _arrow_type(pa, column_type):
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp('us')
+    return pa.string()
+
+_WRITERS = {
+    'csv': _CSVWriter,
+    'xlsx': _XLSXWriter,
+    'parquet': _ParquetWriter,
+}
@@ -0,0 +1,207 @@
+import datetime
+import random
+from collections import OrderedDict
+from sqlalchemy import func, select
+from database.counters import rebuild_counters
+from database.occupancy import rebuild_occupancy
+from database.models import (Address, Floor, Resident, Charge, FinancialRecord, Complaint,
+                             Category, Block, ChargeType, ComplaintStatus,
+                             address_resident_association)
+
+FIRST_NAMES = ["Ali", "Ahmed", "Sara", "Fatima", "Usman", "Ayesha", "Bilal", "Hina",
+               "Omar", "Zainab", "Hassan", "Maryam", "Imran", "Sana", "Tariq", "Nadia"]
+LAST_NAMES = ["Khan", "Malik", "Sheikh", "Qureshi", "Butt", "Chaudhry", "Raza", "Siddiqui",
+              "Hussain", "Iqbal", "Mirza", "Javed"]
+COMPLAINT_TITLES = ["Water leakage", "Power outage", "Broken lift", "Noise complaint",
+                    "Garbage collection", "Parking dispute", "Gas smell", "Security gate"]
+
+DEFAULT_CHARGES = [
+    ("Maintenance", 2500.0, ChargeType.MONTHLY),
+    ("Water", 800.0, ChargeType.MONTHLY),
+    ("Security", 600.0, ChargeType.MONTHLY),
+    ("Repair", 4000.0, ChargeType.OCCASIONAL),
+]
+
+def generate_estate(connection, addresses=1000, residents_per_floor=1, months=12,
+                    complaints_per_address=2, seed=42,
+                    reference_date=datetime.datetime(2026, 1, 1), batch_size=10000):
+    """Fill the database with a deterministic synthetic estate.
+
+    Builds ``addresses`` addresses with one to four floors each, about
+    ``residents_per_floor`` residents per occupied floor, the default charges, one
+    due per allotted resident and monthly charge for each of the ``months``
+    months up to ``reference_date`` and about ``complaints_per_address``
+    complaints per address. The same ``seed`` and sizes always produce the same
+    rows. Rows are appended after any existing ids and streamed to the
+    database with executemany in batches of ``batch_size``, so memory use does
+    not grow with the estate size.
+
+    Returns a dict with the number of rows written per table.
+    """
+    rng = random.Random(seed)
+    next_id = {
+        model: (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+        for model in (Address, Floor, Resident, Charge, FinancialRecord, Complaint)
+    }
+
+    # Parents come first so every flush respects foreign keys
+    writers = OrderedDict((table.name, _BatchWriter(connection, table)) for table in (
+        Charge.__table__, Address.__table__, Floor.__table__, Resident.__table__,
+        address_resident_association, FinancialRecord.__table__, Complaint.__table__
+    ))
+
+    def flush(force=False):
+        if force or any(len(writer.rows) >= batch_size for writer in writers.values()):
+            for writer in writers.values():
+                writer.flush()
+
+    # Charges
+    monthly_charges = []
+    for offset, (name, amount, charge_type) in enumerate(DEFAULT_CHARGES):
+        charge = {
+            'id': next_id[Charge] + offset, 'name': name, 'amount': amount,
+            'charge_type': charge_type, 'description': f"{name} charge", 'is_active': True
+        }
+        writers['charges'].add(charge)
+        if charge_type == ChargeType.MONTHLY:
+            monthly_charges.append(charge)
+
+    due_dates = [_add_months(reference_date, month - months + 1) for month in range(months)]
+    categories = list(Category)
+    blocks = list(Block)
+    statuses = list(ComplaintStatus)
+    floor_id = next_id[Floor]
+    resident_id = next_id[Resident]
+    record_id = next_id[FinancialRecord]
+    complaint_id = next_id[Complaint]
+
+    for index in range(addresses):
+        address_id = next_id[Address] + index
+        total_floors = rng.randint(1, 4)
+        writers['addresses'].add({
+            'id': address_id,
+            'category': rng.choices(categories, weights=(80, 5, 5, 10))[0],
+            'number': str(index // len(blocks) + 1),
+            'row': str(rng.randint(1, 40)),
+            'block': blocks[index % len(blocks)],
+            'total_floors': total_floors
+        })
+        address_residents = []
+
+        for floor_number in range(1, total_floors + 1):
+            kind = rng.choices(['owner', 'tenant', 'commercial', 'shop', 'vacant'],
+                               weights=(45, 30, 8, 7, 10))[0]
+            writers['floors'].add({
+                'id': floor_id, 'address_id': address_id, 'floor_number': floor_number,
+                'is_owner': kind == 'owner', 'is_tenant': kind == 'tenant',
+                'is_commercial': kind == 'commercial', 'is_shop': kind == 'shop',
+                'is_vacant': kind == 'vacant',
+                'shop_count': rng.randint(1, 6) if kind == 'shop' else 0
+            })
+
+            occupants = 0 if kind == 'vacant' else rng.randint(max(residents_per_floor - 1, 0),
+                                                               residents_per_floor + 1)
+            for _ in range(occupants):
+                first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                writers['residents'].add({
+                    'id': resident_id,
+                    'name': f"{first_name} {last_name}",
+                    'contact_number': f"03{rng.randint(0, 999999999):09d}",
+                    'email': f"{first_name.lower()}.{last_name.lower()}{resident_id}@example.com",
+                    'emergency_contact': f"03{rng.randint(0, 999999999):09d}",
+                    'id_proof_number': f"{rng.randint(10000, 99999)}-{rng.randint(1000000, 9999999)}-{rng.randint(1, 9)}",
+                    'move_in_date': reference_date - datetime.timedelta(days=rng.randint(30, 3650)),
+                    'is_active': rng.random() > 0.05,
+                    'floor_id': floor_id
+                })
+                writers['address_resident'].add({'address_id': address_id, 'resident_id': resident_id})
+                address_residents.append(resident_id)
+
+                # Monthly dues, older months mostly paid
+                for month, due_date in enumerate(due_dates):
+                    for charge in monthly_charges:
+                        is_paid = rng.random() < (0.95 if month < months - 3 else 0.5)
+                        writers['financial_records'].add({
+                            'id': record_id,
+                            'resident_id': resident_id,
+                            'address_id': address_id,
+                            'charge_id': charge['id'],
+                            'amount': charge['amount'],
+                            'due_date': due_date,
+                            'paid_date': due_date + datetime.timedelta(days=rng.randint(0, 25)) if is_paid else None,
+                            'is_paid': is_paid,
+                            'notes': None
+                        })
+                        record_id += 1
+
+                resident_id += 1
+
+            floor_id += 1
+
+        # Complaints, mostly resolved or closed
+        for _ in range(rng.randint(0, complaints_per_address * 2) if address_residents else 0):
+            created_at = reference_date - datetime.timedelta(minutes=rng.randint(0, months * 30 * 24 * 60))
+            status = rng.choices(statuses, weights=(10, 10, 40, 40))[0]
+            resolved = status in (ComplaintStatus.RESOLVED, ComplaintStatus.CLOSED)
+            writers['complaints'].add({
+                'id': complaint_id,
+                'resident_id': rng.choice(address_residents),
+                'address_id': address_id,
+                'title': rng.choice(COMPLAINT_TITLES),
+                'description': "Reported by resident. Needs attention from the maintenance team.",
+                'status': status,
+                'created_at': created_at,
+                'updated_at': created_at,
+                'resolved_at': created_at + datetime.timedelta(hours=rng.randint(1, 240)) if resolved else None
+            })
+            complaint_id += 1
+
+        flush()
+
+    flush(force=True)
+    # Rows went in on the connection, past the session events that keep the counters
+    rebuild_counters(connection)
+    rebuild_occupancy(connection)
+    return {name: writer.count for name, writer in writers.items()}
+
+class _BatchWriter:
+    def __init__(self, connection, table):
+        self.connection = connection
+        self.table = table
+        self.rows = []
+        self.count = 0
+
+    def add(self, row):
+        self.rows.append(row)
+
+    def flush(self):
+        if self.rows:
+            self.connection.execute(self.table.insert(), self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+def _add_months(date, months):
+    month_index = date.month - 1 + months
+    return date.replace(year=date.year + month_index // 12, month=month_index % 12 + 1, day=1)
+
+def main():
+    import argparse
+    from database.connection import engine
+    from init_db import init_db
+
+    parser = argparse.ArgumentParser(description="Seed the configured database with a synthetic estate.")
+    parser.add_argument("--addresses", type=int, default=1000)
+    parser.add_argument("--residents-per-floor", type=int, default=1)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    init_db()
+    with engine.begin() as connection:
+        counts = generate_estate(connection, addresses=args.addresses,
+                                 residents_per_floor=args.residents_per_floor,
+                                 months=args.months, seed=args.seed)
+    print("Generated:", ", ".join(f"{table}={count}" for table, count in counts.items()))
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,82 @@
+import time
 import pandas as pd
-from controllers.address_controller import AddressController
-
-def import_addresses_from_csv(file_path, controller):
-    """Import addresses from a CSV file."""
-    df = pd.read_csv(file_path)
-    
-    for _, row in df.iterrows():
-        address_data = {
-            'category': row['category'],
-            'number': str(row['number']),
-            'row': str(row['row']),
-            'block': row['block'],
-            'total_floors': int(row['total_floors'])
-        }
-        controller.add_address(address_data)
-    
-    return True
+from database.models import Category, Block
+
+ADDRESS_COLUMNS = ['category', 'number', 'row', 'block', 'total_floors']
+
+class ImportResult:
+    """Running totals for a streaming import."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.rejects = []
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+def import_addresses_from_csv(file_path, controller, chunk_size=5000, progress_callback=None):
+    """Import addresses from a CSV file.
+
+    The file is streamed in chunks of ``chunk_size`` rows. Each chunk is
+    validated as a whole and written in a single transaction; invalid rows are
+    collected in ``ImportResult.rejects`` as ``(line_number, reason)`` pairs.
+    ``progress_callback`` is called with the running ``ImportResult`` after
+    every chunk.
+    """
+    result = ImportResult()
+    reader = pd.read_csv(file_path, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+
+    for chunk in reader:
+        missing = [column for column in ADDRESS_COLUMNS if column not in chunk.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        records, rejects = _prepare_address_chunk(chunk, first_line=result.rows_read + 2)
+        if records:
+            controller.bulk_add_addresses(records)
+
+        result.rows_read += len(chunk)
+        result.rows_imported += len(records)
+        result.rejects.extend(rejects)
+        result.elapsed = time.perf_counter() - result.started_at
+
+        if progress_callback:
+            progress_callback(result)
+
+    return result
+
+def _prepare_address_chunk(chunk, first_line):
+    """Validate a chunk and map it to insertable address records."""
+    chunk = chunk.reset_index(drop=True)
+
+    categories = chunk['category'].str.strip().str.upper().map({c.name: c for c in Category})
+    blocks = chunk['block'].str.strip().str.upper().map({b.name: b for b in Block})
+    total_floors = pd.to_numeric(chunk['total_floors'], errors='coerce')
+    number = chunk['number'].str.strip()
+    row = chunk['row'].str.strip()
+
+    reasons = pd.Series('', index=chunk.index)
+    reasons[row.isna() | (row == '')] = 'missing row'
+    reasons[number.isna() | (number == '')] = 'missing number'
+    reasons[total_floors.isna() | (total_floors < 1) | (total_floors % 1 != 0)] = 'invalid total_floors'
+    reasons[blocks.isna()] = 'invalid block'
+    reasons[categories.isna()] = 'invalid category'
+
+    valid = reasons == ''
+    frame = pd.DataFrame({
+        'category': categories[valid],
+        'number': number[valid],
+        'row': row[valid],
+        'block': blocks[valid],
+        'total_floors': total_floors[valid].astype(int)
+    })
+    records = frame.to_dict('records')
+
+    rejected = reasons[~valid]
+    rejects = [(first_line + index, reason) for index, reason in rejected.items()]
+
+    return records, rejects
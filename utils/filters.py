@@ -1,3 +1,6 @@
+import re
+import unicodedata
+
 class DynamicFilter:
     """Class to handle dynamic filtering of data."""
     
@@ -14,3 +17,120 @@ class DynamicFilter:
                                 if str(getattr(item, field, '')).lower() == str(value).lower()]
         
         return filtered_data
+
+class TextMatcher:
+    """Case-insensitive text filter on one column of plain row tuples.
+    
+    ``substring`` mirrors ``ILIKE '%value%'``; ``prefix`` mirrors the full-text
+    index, where every word of the value must start a word of the column.
+    """
+    
+    def __init__(self, column, mode='substring'):
+        self.column = column
+        self.mode = mode
+    
+    def prepare(self, value):
+        """Fold a column value once so matching is a plain ``in`` check."""
+        text = self.fold(value)
+        if self.mode == 'prefix':
+            return " " + " ".join(_WORD.findall(text))
+        return text
+    
+    def select(self, prepared, value, indexes):
+        """Narrow ``indexes`` to the rows whose prepared column matches ``value``."""
+        value = self.fold(value)
+        needles = [" " + word for word in _WORD.findall(value)] if self.mode == 'prefix' else [value]
+        for needle in needles:
+            indexes = [index for index in indexes if needle in prepared[index]]
+        return indexes
+    
+    def refines(self, old, new):
+        """True if every row matching ``new`` also matches ``old``."""
+        if not old:
+            return True
+        if self.mode == 'prefix':
+            return self.fold(new).startswith(self.fold(old))
+        return self.fold(old) in self.fold(new)
+    
+    def fold(self, value):
+        text = str(value or "").casefold()
+        if self.mode == 'prefix' and not text.isascii():
+            # The full-text tokenizer ignores diacritics, ILIKE does not
+            text = "".join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+        return text
+
+class ExactMatcher:
+    """Equality filter on one column; ``normalize`` maps a filter value to the column value."""
+    
+    def __init__(self, column, normalize=None):
+        self.column = column
+        self.normalize = normalize or (lambda value: value)
+    
+    def prepare(self, value):
+        return value
+    
+    def select(self, prepared, value, indexes):
+        value = self.normalize(value)
+        return [index for index in indexes if prepared[index] == value]
+    
+    def refines(self, old, new):
+        return not old or old == new
+
+class IncrementalFilter:
+    """Answers a stricter version of the previous filters from the previous result.
+    
+    After ``remember(filters, rows)`` with a complete result set, ``narrow``
+    returns the rows for new filters without a query if every changed filter
+    only got stricter (e.g. more characters typed), and None otherwise.
+    Filters without a matcher must stay unchanged to narrow.
+    """
+    
+    def __init__(self, matchers):
+        self.matchers = matchers
+        self.forget()
+    
+    def forget(self):
+        self.filters = None
+        self.rows = None
+        self._prepared = {}
+    
+    def remember(self, filters, rows):
+        self.filters = _active(filters)
+        self.rows = list(rows)
+        self._prepared = {}
+    
+    def narrow(self, filters):
+        if self.rows is None:
+            return None
+        
+        filters = _active(filters)
+        changed = [key for key in set(filters) | set(self.filters) if filters.get(key) != self.filters.get(key)]
+        for key in changed:
+            matcher = self.matchers.get(key)
+            if matcher is None or key not in filters or not matcher.refines(self.filters.get(key), filters[key]):
+                return None
+        
+        indexes = range(len(self.rows))
+        for key in changed:
+            indexes = self.matchers[key].select(self._column(key), filters[key], indexes)
+        
+        if len(indexes) < len(self.rows):
+            # The narrowed result is complete too, so the next keystroke can narrow it again
+            self.rows = [self.rows[index] for index in indexes]
+            self._prepared = {key: [values[index] for index in indexes] for key, values in self._prepared.items()}
+        self.filters = filters
+        return self.rows
+    
+    def _column(self, key):
+        prepared = self._prepared.get(key)
+        if prepared is None:
+            matcher = self.matchers[key]
+            prepared = [matcher.prepare(row[matcher.column]) for row in self.rows]
+            self._prepared[key] = prepared
+        return prepared
+
+# Words as the full-text tokenizer sees them: letters and digits, diacritics removed
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+def _active(filters):
+    return {key: value for key, value in (filters or {}).items() if value}
@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from database.connection import engine
+
+class QueryCounter:
+    """Counts the SQL statements an engine executes while the context is open.
+
+        with QueryCounter() as counter:
+            widget.loadRecentFinancialRecords(...)
+        print(counter.count, counter.statements)
+    """
+
+    def __init__(self, bind=None):
+        self.bind = bind or engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.bind, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(self.bind, "before_cursor_execute", self._record)
+        return False
+
+@contextmanager
+def assert_max_queries(limit, bind=None):
+    """Fail if the block issues more than ``limit`` statements."""
+    with QueryCounter(bind) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(
+            f"  {number}. {' '.join(statement.split())[:200]}"
+            for number, statement in enumerate(counter.statements, 1)
+        )
+        raise AssertionError(f"Expected at most {limit} queries, {counter.count} were executed:\n{listing}")
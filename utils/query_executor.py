@@ -0,0 +1,129 @@
+import threading
+import traceback
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+from database.connection import Session
+
+class _QueryTask(QRunnable):
+    def __init__(self, executor, key, request_id, query_fn):
+        super().__init__()
+        self.executor = executor
+        self.key = key
+        self.request_id = request_id
+        self.query_fn = query_fn
+        self._dbapi_connection = None
+        self._lock = threading.Lock()
+
+    def run(self):
+        result = error = None
+
+        # A newer request for the same key may have arrived while this one was queued
+        if self.executor.is_current(self.key, self.request_id):
+            # Session() is scoped to the worker thread
+            db_session = Session()
+            try:
+                with self._lock:
+                    self._dbapi_connection = db_session.connection().connection.dbapi_connection
+                result = self.query_fn(db_session)
+            except Exception:
+                error = traceback.format_exc()
+                db_session.rollback()
+            finally:
+                # Never interrupt the connection once it is back in the pool
+                with self._lock:
+                    self._dbapi_connection = None
+                # Results must be plain data, so nothing needs to stay attached
+                Session.remove()
+
+        self.executor._taskDone.emit(self.key, self.request_id, result, error)
+
+    def interrupt(self):
+        """Abort the statement this task is running, where the driver supports it."""
+        with self._lock:
+            # sqlite3 has interrupt(), psycopg2 has cancel(); both are safe from another thread
+            abort = getattr(self._dbapi_connection, 'interrupt', None) or getattr(self._dbapi_connection, 'cancel', None)
+            if abort is not None:
+                abort()
+
+class QueryExecutor(QObject):
+    """Runs database reads for the UI on a thread pool.
+
+    Each request is submitted under a key (for example ``"residents"``). Only the
+    newest request per key is delivered: older ones still waiting in the pool are
+    dropped and the statement of one already running is interrupted. ``query_fn`` is
+    called with a session owned by the worker thread and must return plain data
+    (tuples, dicts, numbers), never ORM instances.
+    """
+
+    resultReady = pyqtSignal(str, object)
+    errorOccurred = pyqtSignal(str, str)
+
+    _taskDone = pyqtSignal(str, int, object, object)
+
+    def __init__(self, max_threads=4, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._latest = {}
+        self._callbacks = {}
+        # Tasks are kept alive here until they report back, even when stale
+        self._tasks = {}
+        self._taskDone.connect(self._onTaskDone)
+
+    def submit(self, key, query_fn, on_result=None, on_error=None):
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._latest[key] = request_id
+
+        self._dropQueued(key)
+
+        task = _QueryTask(self, key, request_id, query_fn)
+        task.setAutoDelete(False)
+        self._tasks[request_id] = task
+        self._callbacks[key] = (request_id, on_result, on_error)
+        self.pool.start(task)
+        return request_id
+
+    def cancel(self, key):
+        with self._lock:
+            self._latest.pop(key, None)
+        self._dropQueued(key)
+
+    def _dropQueued(self, key):
+        stale = self._callbacks.pop(key, None)
+        if not stale:
+            return
+        task = self._tasks[stale[0]]
+        if self.pool.tryTake(task):
+            del self._tasks[stale[0]]
+        else:
+            # Already running: its result would be discarded anyway
+            task.interrupt()
+
+    def is_current(self, key, request_id):
+        with self._lock:
+            return self._latest.get(key) == request_id
+
+    @pyqtSlot(str, int, object, object)
+    def _onTaskDone(self, key, request_id, result, error):
+        self._tasks.pop(request_id, None)
+        if not self.is_current(key, request_id):
+            return
+
+        _, on_result, on_error = self._callbacks.pop(key)
+        with self._lock:
+            self._latest.pop(key, None)
+
+        if error is None:
+            if on_result:
+                on_result(result)
+            self.resultReady.emit(key, result)
+        else:
+            if on_error:
+                on_error(error)
+            self.errorOccurred.emit(key, error)
+
+# Shared executor for all screens
+query_executor = QueryExecutor()
@@ -1,15 +1,105 @@
+import base64
 import hashlib
+import hmac
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from config import (PASSWORD_HASH_ALGORITHM, PASSWORD_PBKDF2_ITERATIONS, PASSWORD_SCRYPT_N,
+                    PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
 
-def hash_password(password):
-    """Hash a password for storing."""
+# Hashes written before the self-describing format: 16 byte salt + PBKDF2-SHA256 digest
+LEGACY_SALT_LENGTH = 16
+LEGACY_ITERATIONS = 100000
+
+def hash_password(password, algorithm=None):
+    """Hash a password for storing.
+
+    Returns ``pbkdf2_sha256$<iterations>$<salt>$<hash>`` or
+    ``scrypt$<n>$<r>$<p>$<salt>$<hash>`` (salt and hash base64), so the
+    parameters travel with the hash and can change per deployment.
+    """
+    algorithm = algorithm or PASSWORD_HASH_ALGORITHM
     salt = os.urandom(16)
-    pwdhash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 100000)
-    return salt + pwdhash
+
+    if algorithm == "pbkdf2_sha256":
+        params = [PASSWORD_PBKDF2_ITERATIONS]
+    elif algorithm == "scrypt":
+        params = [PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P]
+    else:
+        raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+
+    pwdhash = _derive(algorithm, params, password, salt)
+    return "$".join([algorithm, *map(str, params), _encode(salt), _encode(pwdhash)])
 
 def check_password(stored_password, provided_password):
     """Verify a stored password against one provided by user"""
-    salt = stored_password[:16]
-    stored_pwdhash = stored_password[16:]
-    pwdhash = hashlib.pbkdf2_hmac('sha256', provided_password.encode('utf-8'), salt, 100000)
-    return pwdhash == stored_pwdhash
+    if isinstance(stored_password, (bytes, memoryview)):
+        stored_password = bytes(stored_password)
+        salt = stored_password[:LEGACY_SALT_LENGTH]
+        stored_pwdhash = stored_password[LEGACY_SALT_LENGTH:]
+        pwdhash = _derive("pbkdf2_sha256", [LEGACY_ITERATIONS], provided_password, salt)
+        return hmac.compare_digest(pwdhash, stored_pwdhash)
+
+    try:
+        algorithm, params, salt, stored_pwdhash = _parse(stored_password)
+        pwdhash = _derive(algorithm, params, provided_password, salt)
+    except ValueError:
+        return False
+    return hmac.compare_digest(pwdhash, stored_pwdhash)
+
+def needs_rehash(stored_password):
+    """True if the hash was not made with the currently configured algorithm and parameters."""
+    if isinstance(stored_password, (bytes, memoryview)):
+        return True
+    try:
+        algorithm, params, _, _ = _parse(stored_password)
+    except ValueError:
+        return True
+
+    if algorithm != PASSWORD_HASH_ALGORITHM:
+        return True
+    if algorithm == "pbkdf2_sha256":
+        return params != [PASSWORD_PBKDF2_ITERATIONS]
+    return params != [PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P]
+
+def hash_passwords(passwords, algorithm=None, workers=None):
+    """Hash many passwords in parallel across processes, preserving order."""
+    passwords = list(passwords)
+    if len(passwords) < 2:
+        return [hash_password(password, algorithm) for password in passwords]
+
+    workers = workers or os.cpu_count() or 1
+    # Spawned rather than forked: user imports run on the UI's worker threads,
+    # and a forked child can inherit a lock another thread was holding
+    with ProcessPoolExecutor(max_workers=min(workers, len(passwords)),
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(executor.map(partial(hash_password, algorithm=algorithm), passwords, chunksize=chunksize))
+
+def _derive(algorithm, params, password, salt):
+    password = password.encode('utf-8')
+    if algorithm == "pbkdf2_sha256":
+        iterations, = params
+        return hashlib.pbkdf2_hmac('sha256', password, salt, iterations)
+    if algorithm == "scrypt":
+        n, r, p = params
+        # Allow the memory the parameters need (128 * n * r bytes) plus headroom
+        return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024)
+    raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+
+def _parse(stored_password):
+    algorithm, *fields = stored_password.split("$")
+    if len(fields) < 3:
+        raise ValueError("Malformed password hash")
+    *params, salt, pwdhash = fields
+    return algorithm, [int(param) for param in params], _decode(salt), _decode(pwdhash)
+
+def _encode(value):
+    return base64.b64encode(value).decode('ascii')
+
+def _decode(value):
+    try:
+        return base64.b64decode(value.encode('ascii'), validate=True)
+    except (ValueError, UnicodeEncodeError) as e:
+        raise ValueError("Malformed password hash") from e